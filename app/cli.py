@@ -3,18 +3,38 @@ CLI management commands for StockRocker.
 
 Usage:
     python -m app.cli seed                   # Seed with sample data + compute rankings
+    python -m app.cli seed-synthetic --companies 20000 --days 750 --seed 42  # Scale-test universe
     python -m app.cli import-stocks          # Fetch data for default stock list
     python -m app.cli import-stocks AAPL MSFT # Fetch specific symbols
+    python -m app.cli import-stocks --record fixtures.json     # ...and save the responses for replay
+    python -m app.cli import-stocks --source http --concurrency 8  # From the local stand-in server
+    python -m app.cli refresh                # Bulk price refresh; full fetch only where fundamentals are due
+    python -m app.cli refresh --max-age-days 30 --skip-rankings
     python -m app.cli compute-rankings       # Recompute all rankings
+    python -m app.cli compute-rankings --profile out.prof      # ...under cProfile
+    python -m app.cli compute-rankings --low-memory            # ...streaming compact columns
+    python -m app.cli export --format parquet --out exports/   # Columnar snapshot export
+    python -m app.cli import-snapshot exports/                 # Bulk-load a snapshot
+    python -m app.cli compact --daily-days 90 --weekly-days 730  # Apply retention policy
+    python -m app.cli partition --hot-days 366                   # Rotate old dates into yearly partitions
+    python -m app.cli report sectors                           # DuckDB analytics reports
+    python -m app.cli report metric pe_ratio_ttm --start 2025-01-01
+    python -m app.cli report rank-history AAPL --strategy magic_formula_trailing
 """
 
 import argparse
+import datetime
 import logging
 import sys
 
+from app.config import settings
 from app.database import create_db_and_tables, get_db
 from app.models import User, Company, FinancialData  # noqa: F401
+from app.services import metrics
 from app.services.data_import import fetch_and_store, compute_rankings, SEED_SYMBOLS
+from app.services.data_sources import SOURCES
+from app.services.profiling import cprofile
+from app.services.tracing import span
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,30 +59,191 @@ def cmd_seed(args):
     logger.info(f"Ranked {n} records")
 
 
+def cmd_seed_synthetic(args):
+    from app.services.synthetic import seed_synthetic
+
+    create_db_and_tables()
+    db = next(get_db())
+
+    try:
+        stats = seed_synthetic(db, companies=args.companies, days=args.days, seed=args.seed, end=args.end)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    logger.info(f"Synthetic seed complete: {stats}")
+
+    if not args.skip_rankings:
+        logger.info("Computing rankings...")
+        n = compute_rankings(db)
+        logger.info(f"Ranked {n} records")
+
+
 def cmd_import(args):
     create_db_and_tables()
     db = next(get_db())
 
+    from app.services.data_sources import get_source
+    from app.services.data_sources.replay import RecordingSource
+
     symbols = args.symbols if args.symbols else None
-    logger.info(f"Importing {len(symbols or SEED_SYMBOLS)} stocks...")
+    if args.concurrency:
+        settings.fetch_concurrency = args.concurrency
+    try:
+        source = get_source(args.source)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    if args.record:
+        source = RecordingSource(source)
+    logger.info(f"Importing {len(symbols or SEED_SYMBOLS)} stocks from {source.name}...")
 
-    stats = fetch_and_store(db, symbols)
-    logger.info(f"Import complete: {stats}")
+    # One trace from fetch to published generation
+    with cprofile(args.profile), span("import-stocks"), source:
+        stats = fetch_and_store(db, symbols, source)
+        logger.info(f"Import complete: {stats}")
+        if args.record:
+            source.save(args.record)
+            logger.info(f"Recorded {len(source.recorded)} responses to {args.record}")
 
-    logger.info("Computing rankings...")
-    n = compute_rankings(db)
+        logger.info("Computing rankings...")
+        n = compute_rankings(db)
     logger.info(f"Ranked {n} records")
 
 
+def cmd_refresh(args):
+    from app.services.data_sources import get_source
+    from app.services.refresh import refresh
+
+    create_db_and_tables()
+    db = next(get_db())
+
+    if args.concurrency:
+        settings.fetch_concurrency = args.concurrency
+    try:
+        source = get_source(args.source)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    with span("refresh-stocks"), source:
+        stats = refresh(db, args.symbols or None, source, max_age_days=args.max_age_days)
+        logger.info(f"Refresh complete: {stats}")
+
+        if not args.skip_rankings:
+            logger.info("Computing rankings...")
+            n = compute_rankings(db)
+            logger.info(f"Ranked {n} records")
+
+
 def cmd_rankings(args):
     create_db_and_tables()
     db = next(get_db())
 
     logger.info("Computing rankings...")
-    n = compute_rankings(db)
+    with cprofile(args.profile):
+        n = compute_rankings(db, low_memory=args.low_memory)
     logger.info(f"Ranked {n} records")
 
 
+def cmd_export(args):
+    from app.services.snapshot_io import export_snapshot
+
+    create_db_and_tables()
+    db = next(get_db())
+
+    logger.info(f"Exporting financial data to {args.out} ({args.format})...")
+    try:
+        stats = export_snapshot(db, args.out, fmt=args.format, start=args.start, end=args.end)
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    logger.info(f"Export complete: {stats}")
+
+
+def cmd_import_snapshot(args):
+    from app.services.snapshot_io import import_snapshot
+
+    create_db_and_tables()
+    db = next(get_db())
+
+    logger.info(f"Importing snapshot from {args.path}...")
+    try:
+        stats = import_snapshot(db, args.path)
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    logger.info(f"Import complete: {stats}")
+
+    if not args.skip_rankings:
+        logger.info("Computing rankings...")
+        n = compute_rankings(db)
+        logger.info(f"Ranked {n} records")
+
+
+def cmd_report(args):
+    import time
+    from app.services import analytics
+
+    t0 = time.perf_counter()
+    try:
+        if args.kind == "sectors":
+            rows = analytics.sector_summary(as_of=args.as_of)
+        elif args.kind == "metric":
+            rows = analytics.metric_distribution(args.name, start=args.start, end=args.end)
+        else:
+            rows = analytics.rank_history(args.name.upper(), args.strategy, start=args.start, end=args.end)
+    except (analytics.AnalyticsUnavailable, ValueError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+    elapsed = time.perf_counter() - t0
+
+    if rows:
+        columns = list(rows[0])
+        print("\t".join(columns))
+        for row in rows:
+            print("\t".join("" if row[c] is None else str(row[c]) for c in columns))
+    logger.info(f"{len(rows)} rows in {elapsed * 1000:.0f} ms")
+
+
+def cmd_compact(args):
+    from app.services.retention import compact
+
+    create_db_and_tables()
+    db = next(get_db())
+
+    logger.info("Compacting financial data...")
+    try:
+        stats = compact(
+            db,
+            daily_days=args.daily_days,
+            weekly_days=args.weekly_days,
+            archive_dir=args.archive_dir,
+            archive=not args.no_archive,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+            full_vacuum=args.full_vacuum,
+        )
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    logger.info(f"Compaction complete: {stats}")
+
+
+def cmd_partition(args):
+    from app.services.partitions import rotate_partitions
+
+    create_db_and_tables()
+    db = next(get_db())
+
+    logger.info("Rotating financial data partitions...")
+    try:
+        stats = rotate_partitions(db, hot_days=args.hot_days)
+    except (RuntimeError, ValueError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+    logger.info(f"Partition rotation complete: {stats}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="StockRocker CLI")
     sub = parser.add_subparsers(dest="command")
@@ -70,19 +251,86 @@ def main():
     p_seed = sub.add_parser("seed", help="Seed database with sample data")
     p_seed.set_defaults(func=cmd_seed)
 
-    p_import = sub.add_parser("import-stocks", help="Fetch stock data from Yahoo Finance")
+    p_synth = sub.add_parser("seed-synthetic", help="Generate a deterministic synthetic universe for scale testing")
+    p_synth.add_argument("--companies", type=int, default=1000, help="Number of companies (default: 1000)")
+    p_synth.add_argument("--days", type=int, default=1, help="Business days of history (default: 1)")
+    p_synth.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    p_synth.add_argument("--end", type=datetime.date.fromisoformat, help="Last record date (default: today; set it for reproducible runs)")
+    p_synth.add_argument("--skip-rankings", action="store_true", help="Don't recompute rankings afterwards")
+    p_synth.set_defaults(func=cmd_seed_synthetic)
+
+    p_import = sub.add_parser("import-stocks", help="Fetch stock data (Yahoo Finance by default)")
     p_import.add_argument("symbols", nargs="*", help="Stock symbols (default: built-in list)")
+    p_import.add_argument("--source", choices=SOURCES, help="Data source (default: DATA_SOURCE)")
+    p_import.add_argument("--concurrency", type=int, help="Parallel fetches (default: FETCH_CONCURRENCY)")
+    p_import.add_argument("--record", metavar="PATH", help="Save fetched responses as a replay fixture")
+    p_import.add_argument("--profile", metavar="OUT.prof", help="Run under cProfile and write pstats here")
     p_import.set_defaults(func=cmd_import)
 
+    p_refresh = sub.add_parser("refresh", help="Refresh prices in bulk and fundamentals when due")
+    p_refresh.add_argument("symbols", nargs="*", help="Stock symbols (default: every company in the database)")
+    p_refresh.add_argument("--source", choices=SOURCES, help="Data source (default: DATA_SOURCE)")
+    p_refresh.add_argument("--concurrency", type=int, help="Parallel requests (default: FETCH_CONCURRENCY)")
+    p_refresh.add_argument("--max-age-days", type=int,
+                           help="Refetch fundamentals older than this (default: FUNDAMENTALS_MAX_AGE_DAYS)")
+    p_refresh.add_argument("--skip-rankings", action="store_true", help="Don't recompute rankings afterwards")
+    p_refresh.set_defaults(func=cmd_refresh)
+
     p_rank = sub.add_parser("compute-rankings", help="Recompute rankings")
+    p_rank.add_argument("--profile", metavar="OUT.prof", help="Run under cProfile and write pstats here")
+    p_rank.add_argument(
+        "--low-memory", action="store_true", default=None,
+        help="Stream metric columns in chunks (default: RANKINGS_LOW_MEMORY)",
+    )
     p_rank.set_defaults(func=cmd_rankings)
 
+    p_export = sub.add_parser("export", help="Export financial data as date-partitioned columnar files")
+    p_export.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    p_export.add_argument("--out", default="exports", help="Output directory (default: exports)")
+    p_export.add_argument("--start", type=datetime.date.fromisoformat, help="First record date (YYYY-MM-DD)")
+    p_export.add_argument("--end", type=datetime.date.fromisoformat, help="Last record date (YYYY-MM-DD)")
+    p_export.set_defaults(func=cmd_export)
+
+    p_import_snap = sub.add_parser("import-snapshot", help="Bulk-load a Parquet/Arrow snapshot")
+    p_import_snap.add_argument("path", help="Snapshot directory or single file")
+    p_import_snap.add_argument("--skip-rankings", action="store_true", help="Don't recompute rankings afterwards")
+    p_import_snap.set_defaults(func=cmd_import_snapshot)
+
+    p_compact = sub.add_parser("compact", help="Thin out old daily snapshots (archive + delete)")
+    p_compact.add_argument("--daily-days", type=int, help="Keep every record date this recent")
+    p_compact.add_argument("--weekly-days", type=int, help="Keep one date per week this recent")
+    p_compact.add_argument("--archive-dir", help="Parquet archive directory")
+    p_compact.add_argument("--no-archive", action="store_true", help="Delete without archiving")
+    p_compact.add_argument("--batch-size", type=int, default=5000, help="Rows deleted per transaction")
+    p_compact.add_argument("--dry-run", action="store_true", help="Only list the dates that would be dropped")
+    p_compact.add_argument("--full-vacuum", action="store_true", help="Run a full VACUUM afterwards")
+    p_compact.set_defaults(func=cmd_compact)
+
+    p_partition = sub.add_parser("partition", help="Move old record dates into yearly partitions")
+    p_partition.add_argument("--hot-days", type=int, help="Record dates kept in the hot financial_data table")
+    p_partition.set_defaults(func=cmd_partition)
+
+    p_report = sub.add_parser("report", help="Run a DuckDB analytics report")
+    p_report.add_argument("kind", choices=["sectors", "metric", "rank-history"])
+    p_report.add_argument("name", nargs="?", help="Metric name (metric) or symbol (rank-history)")
+    p_report.add_argument("--strategy", default="magic_formula_trailing", help="Strategy for rank-history")
+    p_report.add_argument("--as-of", type=datetime.date.fromisoformat, help="Record date for sectors")
+    p_report.add_argument("--start", type=datetime.date.fromisoformat)
+    p_report.add_argument("--end", type=datetime.date.fromisoformat)
+    p_report.set_defaults(func=cmd_report)
+
     args = parser.parse_args()
     if not args.command:
         parser.print_help()
         sys.exit(1)
+    if args.command == "report" and args.kind != "sectors" and not args.name:
+        p_report.error(f"{args.kind} requires a {'metric name' if args.kind == 'metric' else 'symbol'}")
 
-    args.func(args)
+    try:
+        args.func(args)
+    finally:
+        # Job durations/row counts show up on /metrics when METRICS_DIR is shared
+        metrics.retire()
 
 
 if __name__ == "__main__":
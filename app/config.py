@@ -3,10 +3,104 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     app_name: str = "StockRocker"
+    # Debug mode: per-request SQL stats in X-DB-* response headers and
+    # /api/debug/queries
+    debug: bool = False
     database_url: str = "sqlite:////data/stocker.db"
+    # Async driver URL for the non-blocking API read path; derived from
+    # database_url when empty (sqlite -> aiosqlite, postgresql -> psycopg)
+    async_database_url: str = ""
+    # Read-only URL for API reads (e.g. a Postgres replica). On SQLite the
+    # database file is reopened read-only when this is empty.
+    database_read_url: str = ""
+    # Run `alembic upgrade head` in create_db_and_tables() (API startup, CLI
+    # commands); disable when a release step migrates instead
+    migrate_on_startup: bool = True
+
+    # Connection pool (PostgreSQL and other server databases)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # psycopg: prepare a statement server-side after N executions (0 = always)
+    db_prepare_threshold: int = 5
+
+    # SQLite per-connection pragmas
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size: int = -16000  # negative = KiB, so 16 MB per connection
+    sqlite_mmap_size: int = 64 * 1024 * 1024
     secret_key: str = "change-me-in-production"
     token_expire_minutes: int = 20160  # 2 weeks
 
+    # Import write transactions: commit every N rows or after N seconds
+    import_chunk_size: int = 500
+    import_chunk_seconds: float = 2.0
+
+    # Ingest data source (app.services.data_sources): "yfinance", "replay"
+    # (fixture JSON at data_source_fixtures) or "http" (stand-in server)
+    data_source: str = "yfinance"
+    data_source_fixtures: str = ""
+    data_source_url: str = "http://127.0.0.1:8765"
+    # Parallel symbol fetches; throttled/transient failures are retried with backoff
+    fetch_concurrency: int = 1
+    fetch_retries: int = 2
+    fetch_backoff_seconds: float = 0.5
+    # Symbols per bulk quote request (capped by what the source accepts)
+    quote_batch_size: int = 100
+    # Tiered refresh (app.services.refresh): full info is refetched when older
+    # than this or once the company's earnings date has passed; otherwise
+    # only bulk quotes are fetched and price ratios recomputed locally
+    fundamentals_max_age_days: int = 7
+
+    # compute_rankings low-memory mode: read metric columns in chunks of N rows
+    # into compact arrays instead of holding every row (for small VMs)
+    rankings_low_memory: bool = False
+    rankings_chunk_size: int = 5000
+
+    # Embedded DuckDB analytics: "database" attaches the live database
+    # read-only, "parquet" reads snapshot exports from analytics_parquet_dir
+    analytics_source: str = "database"
+    analytics_parquet_dir: str = "exports"
+    analytics_memory_limit: str = "128MB"
+
+    # Retention (python -m app.cli compact): keep every day for N days, then
+    # weekly up to N days, then monthly; dropped dates are archived as Parquet
+    retention_daily_days: int = 90
+    retention_weekly_days: int = 730
+    retention_archive_dir: str = "archive"
+
+    # Date partitioning (python -m app.cli partition): record dates older than
+    # the hot window are rotated into per-year archive partitions
+    partitioning: bool = False
+    partition_hot_days: int = 366
+
+    # SQL instrumentation (app.services.query_stats)
+    sql_slow_statements: int = 5
+    # Identical statements per request at which an N+1 pattern is reported
+    sql_n_plus_one_threshold: int = 10
+
+    # Prometheus metrics: directory shared by all uvicorn workers / CLI jobs for
+    # multiprocess aggregation (empty = single process, in-memory only)
+    metrics_dir: str = ""
+    metrics_flush_seconds: float = 5.0
+
+    # On-demand profiling: requests with a matching X-Profile-Token header are
+    # sampled and stored as folded stacks (empty token = disabled)
+    profiling_token: str = ""
+    profile_dir: str = "profiles"
+    profile_interval_ms: float = 2.0
+
+    # Span tracing (app.services.tracing): "" = off, "console" or "file";
+    # file spans are appended to trace_file as OTLP/JSON lines
+    trace_exporter: str = ""
+    trace_file: str = "traces.jsonl"
+
+    # Seconds before the in-memory ranking snapshot is rebuilt from the database;
+    # also the longest the API serves rankings older than a CLI-published run
+    snapshot_ttl_seconds: int = 60
+
     # Mailgun (optional)
     mailgun_api_key: str = ""
     mailgun_domain: str = ""
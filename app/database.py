@@ -1,34 +1,193 @@
-import os
+"""
+Database engines and session dependencies.
+
+Writes go through ``engine``: on SQLite its pool holds a single connection, so
+every writer in the process (API, lifespan seeding, CLI imports) is serialized
+on one connection. Reads go through ``read_engine`` (and its async twin), a
+separate pool of read-only connections — ``mode=ro`` plus ``query_only`` on
+SQLite, or ``database_read_url`` (e.g. a replica) on Postgres — so readers
+never queue behind a long import and, with WAL, never block it either.
+"""
+
+import hashlib
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 
 from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
+from app.services.query_stats import instrument
+
+
+def _normalize_url(url: str) -> str:
+    """Use the psycopg 3 driver for plain postgres:// / postgresql:// URLs."""
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+def sqlite_read_url(db_path: str) -> str:
+    """URL reopening an SQLite file read-only (``mode=ro``)."""
+    return f"sqlite:///file:{db_path}?mode=ro&uri=true"
+
+
+database_url = _normalize_url(settings.database_url)
+is_sqlite = database_url.startswith("sqlite")
 
 connect_args = {}
-if settings.database_url.startswith("sqlite"):
+write_engine_args = {}
+read_engine_args = {}
+read_url = _normalize_url(settings.database_read_url) or database_url
+if is_sqlite:
     connect_args["check_same_thread"] = False
     # Ensure the database directory exists
     db_path = settings.database_url.replace("sqlite:///", "", 1)
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    if db_path != ":memory:":
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        if not settings.database_read_url:
+            read_url = sqlite_read_url(db_path)
+    write_engine_args = {"pool_size": 1, "max_overflow": 0}
+else:
+    if database_url.startswith("postgresql+psycopg"):
+        connect_args["prepare_threshold"] = settings.db_prepare_threshold
+    write_engine_args = read_engine_args = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+engine = create_engine(database_url, connect_args=connect_args, **write_engine_args)
+read_engine = engine if read_url == database_url else create_engine(
+    read_url, connect_args=connect_args, **read_engine_args,
+)
 
-engine = create_engine(settings.database_url, connect_args=connect_args)
+
+def _async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        # psycopg 3 serves both sync and async connections
+        ("postgresql+psycopg://", "postgresql+psycopg://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+# The async engine only serves API reads, so it targets the read-only URL
+async_engine = create_async_engine(
+    settings.async_database_url or _async_url(read_url),
+    connect_args=connect_args,
+    **read_engine_args,
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only: bool):
+    cursor = dbapi_connection.cursor()
+    if not read_only:
+        # Only takes effect on a brand-new file (before WAL writes the header);
+        # lets retention compaction release pages without a full VACUUM
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    else:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.close()
 
 
 @event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
-    if settings.database_url.startswith("sqlite"):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA journal_mode=WAL")
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+    if is_sqlite:
+        _apply_sqlite_pragmas(dbapi_connection, read_only=False)
+
+
+if read_engine is not engine:
+    @event.listens_for(read_engine, "connect")
+    def set_sqlite_read_pragma(dbapi_connection, connection_record):
+        if is_sqlite:
+            _apply_sqlite_pragmas(dbapi_connection, read_only=True)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def set_sqlite_async_pragma(dbapi_connection, connection_record):
+    if is_sqlite:
+        _apply_sqlite_pragmas(dbapi_connection, read_only=read_engine is not engine)
+
+
+for _engine in {engine, read_engine, async_engine.sync_engine}:
+    instrument(_engine)
+
+
+MIGRATIONS_INI = Path(__file__).resolve().parent.parent / "migrations" / "alembic.ini"
+
+
+@contextmanager
+def _migration_lock():
+    """Serialize startup migrations between the processes of one host."""
+    try:
+        import fcntl
+    except ImportError:  # Windows: best effort
+        yield
+        return
+    name = hashlib.sha1(database_url.encode()).hexdigest()[:12]
+    with open(Path(tempfile.gettempdir()) / f"stocker-migrate-{name}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def run_migrations():
+    """Upgrade the database to the latest Alembic revision (no-op when current)."""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(MIGRATIONS_INI))
+    # Option values go through ConfigParser interpolation: escape "%" (e.g. in
+    # a percent-encoded password)
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    # Keep the application's logging setup
+    config.attributes["configure_logger"] = False
+    with _migration_lock():
+        command.upgrade(config, "head")
 
 
 def create_db_and_tables():
+    # Migrate first: create_all() never adds columns to existing tables
+    if settings.migrate_on_startup and not database_url.endswith(":memory:"):
+        run_migrations()
     SQLModel.metadata.create_all(engine)
+    if settings.partitioning:
+        from app.services.partitions import sync_history_view
+
+        with Session(engine) as db:
+            sync_history_view(db)
 
 
 def get_db():
+    """Session on the writer engine. Use for requests that write."""
     with Session(engine) as session:
         yield session
+
+
+def get_read_db():
+    """Session on the read-only engine."""
+    with Session(read_engine) as session:
+        yield session
+
+
+async def get_async_db():
+    """Async session on the read-only engine."""
+    async with AsyncSession(async_engine) as session:
+        yield session
@@ -1,15 +1,22 @@
+import datetime
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import select
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func
+from sqlmodel import Session, select
 
 from app.config import settings
-from app.database import create_db_and_tables, get_db
-from app.models import User, Company, FinancialData  # noqa: F401 — ensure models registered before create_all
-from app.routers import auth, companies, rankings
+from app.database import create_db_and_tables, engine, read_engine
+from app.models import User, Company, FinancialData, RankingState  # noqa: F401 — ensure models registered before create_all
+from app.routers import analytics, auth, companies, debug, export, rankings
 from app.routers.pages import router as pages_router
+from app.services import metrics
+from app.services.profiling import ProfilingMiddleware
+from app.services.tracing import TracingMiddleware
+from app.services.query_stats import log_repeats, track_queries
 
 logger = logging.getLogger(__name__)
 
@@ -18,19 +25,28 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     create_db_and_tables()
 
-    # Auto-seed if database is empty
-    db = next(get_db())
-    company_count = db.exec(select(Company)).first()
-    if not company_count:
-        logger.info("Empty database detected — seeding with sample data...")
-        from app.services.seed_data import seed_database
-        from app.services.data_import import compute_rankings
-        stats = seed_database(db)
-        logger.info(f"Seeded: {stats}")
-        ranked = compute_rankings(db)
-        logger.info(f"Ranked {ranked} records")
+    # Auto-seed if database is empty. The session is closed afterwards so the
+    # single writer connection goes back to the pool.
+    with Session(engine) as db:
+        company_count = db.exec(select(Company)).first()
+        if not company_count:
+            logger.info("Empty database detected — seeding with sample data...")
+            from app.services.seed_data import seed_database
+            from app.services.data_import import compute_rankings
+            stats = seed_database(db)
+            logger.info(f"Seeded: {stats}")
+            ranked = compute_rankings(db)
+            logger.info(f"Ranked {ranked} records")
+        elif not db.get(RankingState, 1):
+            # Databases created before ranking generations existed
+            from app.services.data_import import compute_rankings
+            logger.info("No published ranking generation — computing rankings...")
+            ranked = compute_rankings(db)
+            logger.info(f"Ranked {ranked} records")
 
+    metrics.start_flusher()
     yield
+    metrics.stop_flusher()
 
 
 app = FastAPI(
@@ -47,6 +63,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
+
+
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    """Count the SQL statements of each request; X-DB-* headers in debug mode."""
+    with track_queries() as stats:
+        response = await call_next(request)
+    log_repeats(stats, f"{request.method} {request.url.path}")
+
+    if settings.debug:
+        slowest = stats.slowest
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+        response.headers["X-DB-Slowest-Ms"] = f"{slowest[0][0] * 1000:.2f}" if slowest else "0.00"
+        response.headers["X-DB-Repeated"] = str(len(stats.repeated()))
+    return response
+
 
 # HTML pages (served at /, /login, /register, /logout)
 app.include_router(pages_router)
@@ -55,8 +91,22 @@ app.include_router(pages_router)
 app.include_router(auth.router)
 app.include_router(companies.router)
 app.include_router(rankings.router)
+app.include_router(export.router)
+app.include_router(analytics.router)
+app.include_router(debug.router)
 
 
 @app.get("/health")
 def health():
     return {"status": "ok", "app": settings.app_name}
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition, aggregated over all workers when METRICS_DIR is set."""
+    with Session(read_engine) as db:
+        latest = db.exec(select(func.max(FinancialData.record_date))).first()
+    if latest is not None:
+        age = datetime.datetime.now() - datetime.datetime.combine(latest, datetime.time())
+        metrics.RECORD_AGE.set(age.total_seconds())
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,9 +1,11 @@
 from app.models.user import User, UserCreate, UserRead
 from app.models.company import Company, CompanyRead
 from app.models.financial_data import FinancialData
+from app.models.ranking import RankingGeneration, RankingRow, RankingState
 
 __all__ = [
     "User", "UserCreate", "UserRead",
     "Company", "CompanyRead",
     "FinancialData",
+    "RankingGeneration", "RankingRow", "RankingState",
 ]
@@ -1,3 +1,4 @@
+import datetime
 from typing import Optional, TYPE_CHECKING
 
 from sqlmodel import SQLModel, Field, Relationship
@@ -9,7 +10,7 @@ if TYPE_CHECKING:
 class CompanyBase(SQLModel):
     symbol: str = Field(max_length=20, unique=True, index=True)
     name: Optional[str] = Field(default=None, max_length=255)
-    sector: Optional[str] = Field(default=None, max_length=100)
+    sector: Optional[str] = Field(default=None, max_length=100, index=True)
     industry: Optional[str] = Field(default=None, max_length=100)
 
 
@@ -17,6 +18,10 @@ class Company(CompanyBase, table=True):
     __tablename__ = "companies"
 
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Tiered refresh bookkeeping (app.services.refresh): when the full info
+    # was last fetched, and the next earnings date it reported
+    fundamentals_fetched_at: Optional[datetime.datetime] = None
+    next_earnings_date: Optional[datetime.date] = None
     financials: list["FinancialData"] = Relationship(back_populates="company")
 
 
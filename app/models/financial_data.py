@@ -1,6 +1,7 @@
 import datetime
 from typing import Optional, TYPE_CHECKING
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -9,6 +10,12 @@ if TYPE_CHECKING:
 
 class FinancialData(SQLModel, table=True):
     __tablename__ = "financial_data"
+    __table_args__ = (
+        # One row per company per day; also serves the (company_id, record_date) lookups
+        Index("uq_financial_data_company_date", "company_id", "record_date", unique=True),
+        # Never reuse ids: rows rotated into archive partitions keep theirs
+        {"sqlite_autoincrement": True},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     company_id: int = Field(foreign_key="companies.id")
@@ -32,6 +39,7 @@ class FinancialData(SQLModel, table=True):
 
     # Calculated ratios
     garp_ratio: Optional[float] = None
+    # Legacy: magic formula scores are published to ranking_rows now
     magic_formula_trailing: Optional[float] = None
     magic_formula_future: Optional[float] = None
 
@@ -49,7 +57,8 @@ class FinancialData(SQLModel, table=True):
     change_year_high_per: Optional[float] = None
     one_yr_target_price: Optional[float] = None
 
-    # Rank columns
+    # Legacy rank columns, no longer written. Rankings are published as
+    # generations in ranking_rows (see app.models.ranking).
     rank_ebitda: Optional[int] = None
     rank_pe_ratio_ttm: Optional[int] = None
     rank_pe_ratio_ftm: Optional[int] = None
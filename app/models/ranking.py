@@ -0,0 +1,60 @@
+import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+
+
+class RankingGeneration(SQLModel, table=True):
+    """One run of compute_rankings over a single record date.
+
+    Rows for a generation are written while it is unpublished; readers only
+    ever see the generation referenced by ``RankingState``.
+    """
+
+    __tablename__ = "ranking_generations"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    record_date: datetime.date = Field(index=True)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    published_at: Optional[datetime.datetime] = None
+    row_count: int = 0
+
+
+class RankingState(SQLModel, table=True):
+    """Single-row pointer to the published ranking generation.
+
+    Publishing a generation is one UPDATE of this row.
+    """
+
+    __tablename__ = "ranking_state"
+
+    id: int = Field(default=1, primary_key=True)
+    generation_id: Optional[int] = Field(default=None, foreign_key="ranking_generations.id")
+
+
+class RankingRow(SQLModel, table=True):
+    """Ranks for one financial_data row within a generation."""
+
+    __tablename__ = "ranking_rows"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    generation_id: int = Field(foreign_key="ranking_generations.id", index=True)
+    # No FK: the row may be rotated into an archive partition (app.services.partitions)
+    financial_data_id: int = Field(index=True)
+    company_id: int = Field(foreign_key="companies.id")
+    symbol: str = Field(max_length=20)
+
+    # Composite scores
+    magic_formula_trailing: Optional[float] = None
+    magic_formula_future: Optional[float] = None
+
+    # Rank columns (one per strategy in app.services.rankings.STRATEGIES)
+    rank_magic_formula_trailing: Optional[int] = None
+    rank_magic_formula_future: Optional[int] = None
+    rank_ebitda: Optional[int] = None
+    rank_pe_ratio_ttm: Optional[int] = None
+    rank_pe_ratio_ftm: Optional[int] = None
+    rank_garp_ratio: Optional[int] = None
+    rank_return_on_assets: Optional[int] = None
+    rank_return_on_equity: Optional[int] = None
+    rank_dividend_yield: Optional[int] = None
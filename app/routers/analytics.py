@@ -0,0 +1,53 @@
+"""
+Historical analytics endpoints, served by the embedded DuckDB engine
+(see app.services.analytics). They never touch the OLTP connection pools.
+"""
+
+import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.models.user import User
+from app.services import analytics
+from app.services.auth import get_current_user
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+def _run(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except analytics.AnalyticsUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/sectors")
+def sector_summary(
+    as_of: datetime.date | None = None,
+    current_user: User = Depends(get_current_user),
+):
+    return _run(analytics.sector_summary, as_of=as_of)
+
+
+@router.get("/metrics/{metric}")
+def metric_distribution(
+    metric: str,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    sector: str | None = None,
+    current_user: User = Depends(get_current_user),
+):
+    return _run(analytics.metric_distribution, metric, start=start, end=end, sector=sector)
+
+
+@router.get("/rank-history/{symbol}")
+def rank_history(
+    symbol: str,
+    strategy: str,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    current_user: User = Depends(get_current_user),
+):
+    return _run(analytics.rank_history, symbol.upper(), strategy, start=start, end=end)
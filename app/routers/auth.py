@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User, UserCreate, UserRead
 from app.services.auth import create_access_token, get_current_user
 
@@ -40,7 +40,7 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: UserCreate, db: Session = Depends(get_db)):
+def login(payload: UserCreate, db: Session = Depends(get_read_db)):
     user = db.exec(select(User).where(User.email == payload.email)).first()
     if not user or not user.verify_password(payload.password):
         raise HTTPException(
@@ -1,46 +1,93 @@
+import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select, or_
+from fastapi.responses import ORJSONResponse
+from sqlmodel import Field, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
-from app.models.company import Company, CompanyRead
-from app.services.auth import get_current_user
+from app.models.company import CompanyRead
+from app.services.auth import get_current_user_async
+from app.services.companies import get_companies_async, get_company_async, list_companies_async
+from app.services.snapshot import get_snapshot_async
 
 router = APIRouter(prefix="/api/companies", tags=["companies"])
 
+MAX_BATCH_SYMBOLS = 200
+
+# List endpoints select plain column tuples and return an ORJSONResponse, so
+# rows are never materialized as ORM objects nor re-validated into CompanyRead.
+
+
+class SymbolBatch(SQLModel):
+    symbols: list[str] = Field(max_length=MAX_BATCH_SYMBOLS)
+
+
+class StrategyRank(SQLModel):
+    rank: int | None
+    percentile: float | None
+    universe: int
+
+
+class CompanyProfile(SQLModel):
+    symbol: str
+    name: str | None
+    sector: str | None
+    industry: str | None
+    record_date: datetime.date | None
+    metrics: dict[str, float | None]
+    rankings: dict[str, StrategyRank]
+
 
 @router.get("/", response_model=list[CompanyRead])
-def list_companies(
+async def list_companies(
     sector: str | None = None,
     search: str | None = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    statement = select(Company)
+    return ORJSONResponse(
+        await list_companies_async(db, sector=sector, search=search, skip=skip, limit=limit)
+    )
 
-    if sector:
-        statement = statement.where(Company.sector == sector)
-    if search:
-        pattern = f"%{search}%"
-        statement = statement.where(
-            or_(Company.symbol.ilike(pattern), Company.name.ilike(pattern))
-        )
 
-    statement = statement.order_by(Company.symbol).offset(skip).limit(limit)
-    return db.exec(statement).all()
+@router.post("/batch", response_model=list[CompanyRead])
+async def get_companies_batch(
+    payload: SymbolBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """Look up many companies in one query. Unknown symbols are omitted;
+    results follow the order of the requested symbols."""
+    symbols = list(dict.fromkeys(s.upper() for s in payload.symbols))
+    return ORJSONResponse(await get_companies_async(db, symbols))
 
 
 @router.get("/{symbol}", response_model=CompanyRead)
-def get_company(
+async def get_company(
     symbol: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    company = db.exec(
-        select(Company).where(Company.symbol == symbol.upper())
-    ).first()
+    company = await get_company_async(db, symbol.upper())
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     return company
+
+
+@router.get("/{symbol}/profile", response_model=CompanyProfile)
+async def get_company_profile(
+    symbol: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    """All metrics and cross-strategy ranks for one company, served from the
+    latest-date snapshot index. A ranking run published by another process
+    (the CLI) shows up after at most SNAPSHOT_TTL_SECONDS (default 60)."""
+    profile = (await get_snapshot_async(db)).profile(symbol.upper())
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Company not found")
+    return profile
@@ -0,0 +1,38 @@
+"""
+Diagnostics. Query stats 404 unless DEBUG is enabled; stored profiles require
+the profiling token (see app.services.profiling).
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.services.profiling import artifact_path, token_matches
+from app.services.query_stats import query_totals
+
+router = APIRouter(prefix="/api/debug", tags=["debug"])
+
+
+def _require_debug():
+    if not settings.debug:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.get("/queries")
+def queries(limit: int = 20):
+    """Process-wide SQL statement totals, heaviest first."""
+    _require_debug()
+    return query_totals(limit)
+
+
+@router.get("/profiles/{name}")
+def profile_artifact(name: str, x_profile_token: Optional[str] = Header(default=None)):
+    """Download a folded-stack profile written by the profiling middleware."""
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=404, detail="Not Found")
+    path = artifact_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
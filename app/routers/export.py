@@ -0,0 +1,84 @@
+"""
+Streaming export endpoints.
+
+Responses are produced by generators that open their own session: the request
+scoped ``get_read_db`` session is closed before a StreamingResponse body is sent.
+"""
+
+import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from app.database import read_engine
+from app.models.user import User
+from app.services.auth import get_current_user
+from app.services.export import (
+    FINANCIAL_COLUMNS, FORMATS, RANKING_COLUMNS, encode, iter_financials, iter_rankings,
+)
+from app.services.rankings import STRATEGIES
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+def _stream(fmt: str, filename: str, columns: tuple, produce):
+    def body():
+        with Session(read_engine) as db:
+            yield from encode(fmt, columns, produce(db))
+
+    return StreamingResponse(
+        body(),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+def _check_range(as_of, start, end):
+    if as_of is not None and (start is not None or end is not None):
+        raise HTTPException(status_code=422, detail="Use either as_of or start/end, not both")
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+
+
+@router.get("/financials")
+def export_financials(
+    format: ExportFormat = "ndjson",
+    as_of: datetime.date | None = None,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    symbols: str | None = Query(None, description="Comma-separated symbols"),
+    current_user: User = Depends(get_current_user),
+):
+    _check_range(as_of, start, end)
+    symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else None
+
+    return _stream(
+        format, "financials", FINANCIAL_COLUMNS,
+        lambda db: iter_financials(db, as_of=as_of, start=start, end=end, symbols=symbol_list),
+    )
+
+
+@router.get("/rankings/{strategy}")
+def export_rankings(
+    strategy: str,
+    format: ExportFormat = "ndjson",
+    as_of: datetime.date | None = None,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    current_user: User = Depends(get_current_user),
+):
+    if strategy not in STRATEGIES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown strategy '{strategy}'. Use /api/rankings/strategies to list available strategies.",
+        )
+    _check_range(as_of, start, end)
+
+    return _stream(
+        format, f"rankings_{strategy}", RANKING_COLUMNS,
+        lambda db: iter_rankings(db, strategy, as_of=as_of, start=start, end=end),
+    )
@@ -12,13 +12,13 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlmodel import Session, select, func
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.company import Company
 from app.models.financial_data import FinancialData
 from app.models.user import User
 from app.services.auth import create_access_token, _serializer
 from app.config import settings
-from app.services.rankings import STRATEGIES, get_rankings
+from app.services.rankings import STRATEGIES, get_rankings_multi
 
 templates = Jinja2Templates(directory="app/templates")
 
@@ -42,7 +42,7 @@ def _get_user_from_cookie(request: Request, db: Session) -> Optional[User]:
 
 
 @router.get("/", response_class=HTMLResponse)
-def home_page(request: Request, db: Session = Depends(get_db)):
+def home_page(request: Request, db: Session = Depends(get_read_db)):
     user = _get_user_from_cookie(request, db)
 
     # Get stats
@@ -56,9 +56,10 @@ def home_page(request: Request, db: Session = Depends(get_db)):
     }
 
     # Build ranking data for each strategy
+    all_rankings = get_rankings_multi(db, list(STRATEGIES), limit=25) if company_count > 0 else {}
     strategy_data = []
     for key, info in STRATEGIES.items():
-        rankings = get_rankings(db, key, limit=25) if company_count > 0 else []
+        rankings = all_rankings.get(key, [])
         strategy_data.append({
             "key": key,
             "name": info["name"],
@@ -75,7 +76,7 @@ def home_page(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/login", response_class=HTMLResponse)
-def login_page(request: Request, db: Session = Depends(get_db)):
+def login_page(request: Request, db: Session = Depends(get_read_db)):
     user = _get_user_from_cookie(request, db)
     if user:
         return RedirectResponse(url="/", status_code=302)
@@ -91,7 +92,7 @@ def login_submit(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     user = db.exec(select(User).where(User.email == email)).first()
     if not user or not user.verify_password(password):
@@ -112,7 +113,7 @@ def login_submit(
 
 
 @router.get("/register", response_class=HTMLResponse)
-def register_page(request: Request, db: Session = Depends(get_db)):
+def register_page(request: Request, db: Session = Depends(get_read_db)):
     user = _get_user_from_cookie(request, db)
     if user:
         return RedirectResponse(url="/", status_code=302)
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import SQLModel, Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
-from app.services.auth import get_current_user
-from app.services.rankings import STRATEGIES, get_rankings
+from app.services.auth import get_current_user_async
+from app.services.rankings import STRATEGIES
+from app.services.snapshot import get_snapshot_async
 
 
 class StrategyInfo(SQLModel):
@@ -27,27 +29,63 @@ class RankingEntry(SQLModel):
 
 router = APIRouter(prefix="/api/rankings", tags=["rankings"])
 
+# Ranking endpoints return pre-encoded JSON from the snapshot cache as a raw
+# Response, which skips per-row RankingEntry validation; response_model still
+# documents the shape in the OpenAPI schema.
+
+_STALENESS_NOTE = (
+    "Served from the in-memory ranking snapshot: a ranking run published by another "
+    "process (the CLI) shows up after at most SNAPSHOT_TTL_SECONDS (default 60)."
+)
+
+
+def _unknown_strategy(strategy: str) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail=f"Unknown strategy '{strategy}'. Use /api/rankings/strategies to list available strategies.",
+    )
+
+
+@router.get("", response_model=dict[str, list[RankingEntry]], description=_STALENESS_NOTE)
+async def get_ranking_batch(
+    strategies: str = Query(..., description="Comma-separated strategy keys"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+):
+    keys = list(dict.fromkeys(s.strip() for s in strategies.split(",") if s.strip()))
+    if not keys:
+        raise HTTPException(status_code=422, detail="At least one strategy is required")
+    for key in keys:
+        if key not in STRATEGIES:
+            raise _unknown_strategy(key)
+
+    snapshot = await get_snapshot_async(db)
+    body = b"{" + b",".join(
+        b'"%s":%s' % (key.encode(), snapshot.rankings_json(key, limit)) for key in keys
+    ) + b"}"
+    return Response(content=body, media_type="application/json")
+
 
 @router.get("/strategies", response_model=list[StrategyInfo])
-def list_strategies(current_user: User = Depends(get_current_user)):
+async def list_strategies(current_user: User = Depends(get_current_user_async)):
     return [
         StrategyInfo(key=key, name=info["name"], description=info["description"])
         for key, info in STRATEGIES.items()
     ]
 
 
-@router.get("/{strategy}", response_model=list[RankingEntry])
-def get_ranking(
+@router.get("/{strategy}", response_model=list[RankingEntry], description=_STALENESS_NOTE)
+async def get_ranking(
     strategy: str,
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     if strategy not in STRATEGIES:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Unknown strategy '{strategy}'. Use /api/rankings/strategies to list available strategies.",
-        )
+        raise _unknown_strategy(strategy)
 
-    results = get_rankings(db, strategy, limit=limit)
-    return results
+    return Response(
+        content=(await get_snapshot_async(db)).rankings_json(strategy, limit),
+        media_type="application/json",
+    )
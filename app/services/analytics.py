@@ -0,0 +1,254 @@
+"""
+Analytics over financial_data history with an embedded DuckDB engine.
+
+Heavy aggregate queries (sector summaries, metric distributions over time,
+rank history) run vectorized in DuckDB instead of on the row-oriented OLTP
+database. DuckDB reads either:
+
+- ``analytics_source = "database"``: the live database, attached read-only
+  (SQLite via DuckDB's sqlite extension, Postgres via its postgres extension), or
+- ``analytics_source = "parquet"``: the snapshot files written by
+  ``python -m app.cli export`` under ``analytics_parquet_dir``.
+
+Both sources expose the same ``financials`` view (financial_data joined with
+company name/sector/industry). The ``rankings`` view (published ranking
+generation per record date) is only available from the database.
+
+Requires ``duckdb`` (in requirements.txt; imported only when used). The
+database extensions are only LOADed here, never downloaded at query time:
+install them ahead of time (the Dockerfile does it at build time) with
+``python -m app.services.analytics``.
+"""
+
+import datetime
+import threading
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Float
+
+from app.config import settings
+from app.models.financial_data import FinancialData
+from app.services.partitions import history_table_name
+from app.services.rankings import STRATEGIES
+
+NUMERIC_METRICS = tuple(
+    name for name, column in FinancialData.__table__.columns.items()
+    if isinstance(column.type, Float)
+)
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """DuckDB or the configured data source can't be used."""
+
+
+_connection = None
+_has_rankings = False
+_lock = threading.Lock()
+
+# DuckDB extensions needed by analytics_source = "database"
+EXTENSIONS = ("sqlite", "postgres")
+
+
+def _attach_database(con) -> None:
+    url = settings.database_url
+    if url.startswith("sqlite"):
+        path = url.replace("sqlite:///", "", 1)
+        con.execute("LOAD sqlite")
+        con.execute(f"ATTACH '{path}' AS stocker (TYPE sqlite, READ_ONLY)")
+    elif url.startswith(("postgres://", "postgresql")):
+        dsn = "postgresql://" + url.split("://", 1)[1]
+        con.execute("LOAD postgres")
+        con.execute(f"ATTACH '{dsn}' AS stocker (TYPE postgres, READ_ONLY)")
+    else:
+        raise AnalyticsUnavailable(f"Unsupported database for analytics: {url.split(':', 1)[0]}")
+
+    con.execute(f"""
+        CREATE VIEW financials AS
+        SELECT f.*, c.name, c.sector, c.industry
+        FROM stocker.{history_table_name()} f
+        JOIN stocker.companies c ON c.id = f.company_id
+    """)
+    con.execute("""
+        CREATE VIEW rankings AS
+        SELECT g.record_date, r.*
+        FROM stocker.ranking_rows r
+        JOIN stocker.ranking_generations g ON g.id = r.generation_id
+        WHERE g.id IN (
+            SELECT max(id) FROM stocker.ranking_generations
+            WHERE published_at IS NOT NULL
+            GROUP BY record_date
+        )
+    """)
+
+
+def _attach_parquet(con) -> None:
+    root = Path(settings.analytics_parquet_dir)
+    if not any(root.rglob("*.parquet")):
+        raise AnalyticsUnavailable(f"No Parquet snapshots found under {root}")
+    con.execute(
+        f"CREATE VIEW financials AS "
+        f"SELECT * FROM read_parquet('{root.as_posix()}/**/*.parquet', union_by_name = true)"
+    )
+
+
+def _connect():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise AnalyticsUnavailable("duckdb is required for analytics (pip install duckdb)") from e
+
+    # A missing extension is an error rather than a download from a request handler
+    con = duckdb.connect(config={
+        "memory_limit": settings.analytics_memory_limit,
+        "autoinstall_known_extensions": False,
+    })
+    try:
+        if settings.analytics_source == "parquet":
+            _attach_parquet(con)
+        else:
+            _attach_database(con)
+    except duckdb.Error as e:
+        con.close()
+        raise AnalyticsUnavailable(f"Could not open analytics source: {e}") from e
+    except AnalyticsUnavailable:
+        con.close()
+        raise
+    return con
+
+
+def _ensure_connection():
+    global _connection, _has_rankings
+    with _lock:
+        if _connection is None:
+            _connection = _connect()
+            _has_rankings = settings.analytics_source != "parquet"
+        return _connection
+
+
+def _cursor():
+    """A DuckDB cursor on the shared connection (cursors are safe per thread)."""
+    return _ensure_connection().cursor()
+
+
+def reset() -> None:
+    """Drop the shared connection, e.g. after new Parquet exports were written."""
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+        _connection = None
+
+
+def _query(sql: str, params: list) -> list[dict]:
+    cur = _cursor()
+    try:
+        result = cur.execute(sql, params)
+        columns = [d[0] for d in result.description]
+        return [dict(zip(columns, row)) for row in result.fetchall()]
+    finally:
+        cur.close()
+
+
+def _date_range(start, end, column="record_date"):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append(f"{column} <= ?")
+        params.append(end)
+    return clauses, params
+
+
+def sector_summary(as_of: Optional[datetime.date] = None) -> list[dict]:
+    """Per-sector company count and median/mean valuation metrics for one date
+    (the latest date by default)."""
+    date_clause = "record_date = ?" if as_of else "record_date = (SELECT max(record_date) FROM financials)"
+    return _query(f"""
+        SELECT sector,
+               count(*) AS companies,
+               median(pe_ratio_ttm) FILTER (WHERE pe_ratio_ttm > 0) AS median_pe_ratio_ttm,
+               median(pe_ratio_ftm) FILTER (WHERE pe_ratio_ftm > 0) AS median_pe_ratio_ftm,
+               avg(return_on_assets) AS avg_return_on_assets,
+               avg(return_on_equity) AS avg_return_on_equity,
+               avg(dividend_yield) AS avg_dividend_yield,
+               sum(market_cap) AS total_market_cap
+        FROM financials
+        WHERE {date_clause}
+        GROUP BY sector
+        ORDER BY total_market_cap DESC NULLS LAST
+    """, [as_of] if as_of else [])
+
+
+def metric_distribution(
+    metric: str,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    sector: Optional[str] = None,
+) -> list[dict]:
+    """Cross-sectional distribution of a metric for every record date."""
+    if metric not in NUMERIC_METRICS:
+        raise ValueError(f"Unknown metric '{metric}'")
+    clauses, params = _date_range(start, end)
+    clauses.append(f"{metric} IS NOT NULL")
+    if sector:
+        clauses.append("sector = ?")
+        params.append(sector)
+    return _query(f"""
+        SELECT record_date,
+               count(*) AS companies,
+               quantile_cont({metric}, 0.25) AS p25,
+               median({metric}) AS median,
+               quantile_cont({metric}, 0.75) AS p75,
+               avg({metric}) AS mean
+        FROM financials
+        WHERE {" AND ".join(clauses)}
+        GROUP BY record_date
+        ORDER BY record_date
+    """, params)
+
+
+def rank_history(
+    symbol: str,
+    strategy: str,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> list[dict]:
+    """A symbol's rank in a strategy for every ranked record date."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'")
+    _ensure_connection()
+    if not _has_rankings:
+        raise AnalyticsUnavailable("Rank history requires analytics_source = 'database'")
+
+    clauses, params = _date_range(start, end)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return _query(f"""
+        WITH ranked AS (
+            SELECT record_date, symbol, rank_{strategy} AS rank,
+                   count(rank_{strategy}) OVER (PARTITION BY record_date) AS universe
+            FROM rankings
+            {where}
+        )
+        SELECT record_date, rank, universe
+        FROM ranked
+        WHERE symbol = ?
+        ORDER BY record_date
+    """, params + [symbol])
+
+
+def install_extensions() -> None:
+    """Download the database extensions into DuckDB's local extension directory."""
+    import duckdb
+
+    con = duckdb.connect()
+    try:
+        for name in EXTENSIONS:
+            con.execute(f"INSTALL {name}")
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    install_extensions()
@@ -4,9 +4,10 @@ from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.database import get_async_db, get_read_db
 from app.models.user import User
 
 security = HTTPBearer()
@@ -18,26 +19,47 @@ def create_access_token(user: User) -> str:
     return _serializer.dumps({"sub": str(user.id), "email": user.email})
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    token = credentials.credentials
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    # A new instance per raise: re-raising a shared one grows its __traceback__
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid or expired token",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _user_id_from_token(token: str) -> int:
     try:
         max_age = settings.token_expire_minutes * 60
         payload = _serializer.loads(token, max_age=max_age)
         user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except (BadSignature, SignatureExpired):
-        raise credentials_exception
+        raise _credentials_exception()
+    return int(user_id)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_read_db),
+) -> User:
+    user_id = _user_id_from_token(credentials.credentials)
+
+    user = db.exec(select(User).where(User.id == user_id)).first()
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """Async variant of ``get_current_user`` for async routes."""
+    user_id = _user_id_from_token(credentials.credentials)
 
-    user = db.exec(select(User).where(User.id == int(user_id))).first()
+    user = (await db.exec(select(User).where(User.id == user_id))).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
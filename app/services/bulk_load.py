@@ -0,0 +1,182 @@
+"""
+Bulk upsert of financial_data rows.
+
+On PostgreSQL rows are streamed with ``COPY ... FROM STDIN`` into a temporary
+staging table and merged into ``financial_data`` with two set-based statements
+(UPDATE matching rows, INSERT the rest). Other backends (SQLite) look up the
+rows a chunk replaces, then UPDATE them by id and INSERT the rest with Core
+executemany, one bounded transaction per chunk. Both paths keep the ids of
+replaced rows, which ranking_rows reference.
+
+Rows are dicts keyed by FinancialData column name and must include
+``company_id``, ``symbol`` and ``record_date``; ``id`` is ignored. When a
+chunk repeats a (company_id, record_date) key, the last row wins.
+"""
+
+import datetime
+import logging
+from typing import Iterable, Iterator
+
+from sqlalchemy import bindparam, text, update
+from sqlmodel import Session, select
+
+from app.models.financial_data import FinancialData
+from app.services.write_scheduler import WriteScheduler
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 50_000
+LOOKUP_CHUNK_SIZE = 500
+
+COLUMNS = tuple(name for name in FinancialData.__table__.columns.keys() if name != "id")
+KEY_COLUMNS = ("company_id", "record_date")
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _dedupe(chunk: list[dict]) -> list[dict]:
+    """Keep the last row for each (company_id, record_date) of the chunk."""
+    latest = {(row["company_id"], row["record_date"]): row for row in chunk}
+    return chunk if len(latest) == len(chunk) else list(latest.values())
+
+
+def bulk_upsert_financials(db: Session, rows: Iterable[dict], chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+    """Insert or replace rows keyed on (company_id, record_date).
+
+    Returns stats dict.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return _copy_merge(db, rows, chunk_size)
+    return _update_insert(db, rows, chunk_size)
+
+
+# -- PostgreSQL: COPY into staging + set-based merge ---------------------------
+
+_STAGING = "financial_data_staging"
+
+
+def _copy_rows(cursor, rows: list[dict]) -> None:
+    statement = f"COPY {_STAGING} ({', '.join(COLUMNS)}) FROM STDIN"
+    if hasattr(cursor, "copy"):  # psycopg 3
+        with cursor.copy(statement) as copy:
+            for row in rows:
+                copy.write_row(tuple(row.get(c) for c in COLUMNS))
+        return
+
+    # psycopg2: stream text-format COPY through a file-like buffer
+    import io
+
+    def fmt(value):
+        return r"\N" if value is None else str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(fmt(row.get(c)) for c in COLUMNS))
+        buf.write("\n")
+    buf.seek(0)
+    cursor.copy_expert(statement, buf)
+
+
+def _copy_merge(db: Session, rows: Iterable[dict], chunk_size: int) -> dict:
+    stats = {"rows": 0, "inserted": 0, "updated": 0, "chunks": 0}
+    assignments = ", ".join(f"{c} = s.{c}" for c in COLUMNS if c not in KEY_COLUMNS)
+    match = " AND ".join(f"f.{c} = s.{c}" for c in KEY_COLUMNS)
+    column_list = ", ".join(COLUMNS)
+
+    for chunk in _chunks(rows, chunk_size):
+        stats["rows"] += len(chunk)
+        # A key twice in the staging table would make the UPDATE pick one
+        # arbitrarily and the INSERT add both
+        chunk = _dedupe(chunk)
+        connection = db.connection()
+        connection.exec_driver_sql(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING} "
+            f"(LIKE financial_data INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        dbapi_connection = connection.connection.dbapi_connection
+        with dbapi_connection.cursor() as cursor:
+            _copy_rows(cursor, chunk)
+
+        updated = db.exec(text(
+            f"UPDATE financial_data f SET {assignments} FROM {_STAGING} s WHERE {match}"
+        )).rowcount
+        inserted = db.exec(text(
+            f"INSERT INTO financial_data ({column_list}) "
+            f"SELECT {', '.join('s.' + c for c in COLUMNS)} FROM {_STAGING} s "
+            f"WHERE NOT EXISTS (SELECT 1 FROM financial_data f WHERE {match})"
+        )).rowcount
+        db.commit()
+
+        stats["updated"] += updated
+        stats["inserted"] += inserted
+        stats["chunks"] += 1
+    return stats
+
+
+# -- Generic: update matching rows + executemany insert -------------------------
+
+def _existing_statement(record_date: datetime.date, company_ids: list[int]):
+    return select(FinancialData.id, FinancialData.company_id).where(
+        FinancialData.record_date == record_date,
+        FinancialData.company_id.in_(company_ids),
+    )
+
+
+def _existing_ids(db: Session, rows: list[dict]) -> dict[tuple, int]:
+    """Map (company_id, record_date) -> id for rows of the chunk already stored."""
+    by_date: dict = {}
+    for row in rows:
+        by_date.setdefault(row["record_date"], []).append(row["company_id"])
+
+    existing = {}
+    for record_date, ids in by_date.items():
+        for i in range(0, len(ids), LOOKUP_CHUNK_SIZE):
+            for fd_id, company_id in db.exec(
+                _existing_statement(record_date, ids[i:i + LOOKUP_CHUNK_SIZE])
+            ):
+                existing[(company_id, record_date)] = fd_id
+    return existing
+
+
+def _update_insert(db: Session, rows: Iterable[dict], chunk_size: int) -> dict:
+    stats = {"rows": 0, "inserted": 0, "updated": 0, "chunks": 0}
+    table = FinancialData.__table__
+    update_statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values({c: bindparam(c) for c in COLUMNS if c not in KEY_COLUMNS})
+    )
+    writer = WriteScheduler(db, chunk_size=chunk_size, name="bulk_upsert_financials")
+
+    for chunk in _chunks(rows, chunk_size):
+        stats["rows"] += len(chunk)
+        # Duplicate keys both missing from the table would both be inserted
+        chunk = _dedupe(chunk)
+        existing = _existing_ids(db, chunk)
+        updates, inserts = [], []
+        for row in chunk:
+            values = {c: row.get(c) for c in COLUMNS}
+            fd_id = existing.get((row["company_id"], row["record_date"]))
+            if fd_id is None:
+                inserts.append(values)
+            else:
+                values["_id"] = fd_id
+                updates.append(values)
+
+        writer.execute_many(update_statement, updates)
+        writer.insert_many(table, inserts)
+
+        stats["updated"] += len(updates)
+        stats["inserted"] += len(inserts)
+        stats["chunks"] += 1
+    stats["writes"] = writer.metrics()
+    return stats
@@ -0,0 +1,83 @@
+"""
+Company lookup queries, in sync and async flavours.
+
+Queries select plain column tuples rather than ORM objects; results are
+returned as dicts shaped like ``CompanyRead``.
+"""
+
+from typing import Optional
+
+from sqlmodel import Session, select, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.company import Company
+
+COMPANY_FIELDS = ("id", "symbol", "name", "sector", "industry")
+_company_columns = [getattr(Company, f) for f in COMPANY_FIELDS]
+
+
+def _company_rows(rows) -> list[dict]:
+    return [dict(zip(COMPANY_FIELDS, r)) for r in rows]
+
+
+def _list_statement(sector: Optional[str], search: Optional[str], skip: int, limit: int):
+    statement = select(*_company_columns)
+
+    if sector:
+        statement = statement.where(Company.sector == sector)
+    if search:
+        pattern = f"%{search}%"
+        statement = statement.where(
+            or_(Company.symbol.ilike(pattern), Company.name.ilike(pattern))
+        )
+
+    return statement.order_by(Company.symbol).offset(skip).limit(limit)
+
+
+def _symbol_statement(symbols: list[str]):
+    return select(*_company_columns).where(Company.symbol.in_(symbols))
+
+
+def _in_request_order(rows, symbols: list[str]) -> list[dict]:
+    found = {row["symbol"]: row for row in _company_rows(rows)}
+    return [found[s] for s in symbols if s in found]
+
+
+def list_companies(
+    db: Session, sector: Optional[str] = None, search: Optional[str] = None,
+    skip: int = 0, limit: int = 50,
+) -> list[dict]:
+    return _company_rows(db.exec(_list_statement(sector, search, skip, limit)).all())
+
+
+async def list_companies_async(
+    db: AsyncSession, sector: Optional[str] = None, search: Optional[str] = None,
+    skip: int = 0, limit: int = 50,
+) -> list[dict]:
+    return _company_rows((await db.exec(_list_statement(sector, search, skip, limit))).all())
+
+
+def get_companies(db: Session, symbols: list[str]) -> list[dict]:
+    """Look up many symbols in one query, preserving the requested order.
+
+    Unknown symbols are omitted.
+    """
+    if not symbols:
+        return []
+    return _in_request_order(db.exec(_symbol_statement(symbols)).all(), symbols)
+
+
+async def get_companies_async(db: AsyncSession, symbols: list[str]) -> list[dict]:
+    if not symbols:
+        return []
+    return _in_request_order((await db.exec(_symbol_statement(symbols))).all(), symbols)
+
+
+def get_company(db: Session, symbol: str) -> Optional[dict]:
+    rows = get_companies(db, [symbol])
+    return rows[0] if rows else None
+
+
+async def get_company_async(db: AsyncSession, symbol: str) -> Optional[dict]:
+    rows = await get_companies_async(db, [symbol])
+    return rows[0] if rows else None
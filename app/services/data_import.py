@@ -1,19 +1,32 @@
 """
-Stock data import service using yfinance.
+Stock data import service.
 
-Fetches financial metrics for publicly traded companies and populates
-the database with current data and computed rankings.
+Fetches financial metrics for publicly traded companies from a data source
+(yfinance by default, see ``app.services.data_sources``) and populates the
+database with current data and computed rankings.
 """
 
 import datetime
 import logging
+import math
+import time
+from array import array
+from itertools import chain
 from typing import Optional
 
-import yfinance as yf
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
+from app.config import settings
 from app.models.company import Company
 from app.models.financial_data import FinancialData
+from app.models.ranking import RankingGeneration, RankingRow, RankingState
+from app.services.data_sources import DataSource, fetch_infos, get_source
+from app.services.metrics import record_job
+from app.services.rankings import RANK_COLUMNS
+from app.services.snapshot import invalidate_snapshot
+from app.services.tracing import current_span, span, traced
+from app.services.write_scheduler import WriteScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -51,132 +64,350 @@ SEED_SYMBOLS = [
 EXCLUDED_SECTORS = {"Financial Services", "Energy", "Utilities"}
 
 
-def fetch_and_store(db: Session, symbols: Optional[list[str]] = None) -> dict:
+def percent_change(price: Optional[float], reference: Optional[float]) -> Optional[float]:
+    """``price`` relative to ``reference`` in percent (e.g. above the 52-week low)."""
+    if price is None or not reference:
+        return None
+    return round((price - reference) / reference * 100, 2)
+
+
+def earnings_date(info: dict) -> Optional[datetime.date]:
+    """Next (or latest) earnings date of an info dict, from Yahoo's epoch seconds."""
+    for key in ("earningsTimestampStart", "earningsTimestamp"):
+        value = info.get(key)
+        if isinstance(value, (int, float)) and value > 0:
+            return datetime.date.fromtimestamp(value)
+    return None
+
+
+@traced("fetch_and_store")
+def fetch_and_store(
+    db: Session, symbols: Optional[list[str]] = None, source: Optional[DataSource] = None
+) -> dict:
     """Fetch financial data for symbols and store in the database.
 
-    Returns a summary dict with counts of companies processed, succeeded, failed.
+    ``source`` defaults to ``get_source()`` (``settings.data_source``), which
+    is closed afterwards. Returns a summary dict with counts of companies
+    processed, succeeded, failed.
     """
     if symbols is None:
         symbols = SEED_SYMBOLS
+    owns_source = source is None
+    if owns_source:
+        source = get_source()
 
     # De-duplicate
     symbols = list(dict.fromkeys(symbols))
 
     stats = {"total": len(symbols), "succeeded": 0, "failed": 0, "skipped": 0}
+    start = time.perf_counter()
     today = datetime.date.today()
+    writer = WriteScheduler(db, name="fetch_and_store")
 
-    for i, symbol in enumerate(symbols):
-        try:
-            logger.info(f"[{i+1}/{len(symbols)}] Fetching {symbol}...")
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-
-            if not info or info.get("regularMarketPrice") is None:
-                logger.warning(f"  No data for {symbol}, skipping")
-                stats["skipped"] += 1
-                continue
-
-            # Upsert company
-            company = db.exec(
-                select(Company).where(Company.symbol == symbol)
-            ).first()
-            if not company:
-                company = Company(
-                    symbol=symbol,
-                    name=info.get("shortName") or info.get("longName"),
-                    sector=info.get("sector"),
-                    industry=info.get("industry"),
-                )
-                db.add(company)
-                db.commit()
-                db.refresh(company)
-            else:
-                company.name = info.get("shortName") or info.get("longName") or company.name
-                company.sector = info.get("sector") or company.sector
-                company.industry = info.get("industry") or company.industry
-                db.add(company)
-                db.commit()
-                db.refresh(company)
-
-            # Extract metrics
-            ask = info.get("currentPrice") or info.get("regularMarketPrice")
-            book_value = info.get("bookValue")
-            market_cap = info.get("marketCap")
-            ebitda = info.get("ebitda")
-            pe_ratio_ttm = info.get("trailingPE")
-            pe_ratio_ftm = info.get("forwardPE")
-            eps_current_year = info.get("epsCurrentYear")
-            eps_next_year = info.get("epsForward")
-            peg_ratio = info.get("pegRatio")
-            return_on_assets = info.get("returnOnAssets")
-            return_on_equity = info.get("returnOnEquity")
-            dividend_yield = info.get("dividendYield")
-            net_income = info.get("netIncomeToCommon")
-            total_assets = info.get("totalAssets")
-
-            # Calculate derived metrics
-            garp_ratio = None
-            if pe_ratio_ttm and peg_ratio and peg_ratio > 0:
-                garp_ratio = pe_ratio_ttm / peg_ratio
-
-            magic_formula_trailing = None  # Calculated during ranking
-            magic_formula_future = None
-
-            # Convert percentages (yfinance returns decimals like 0.15 for 15%)
-            if return_on_assets is not None:
-                return_on_assets = round(return_on_assets * 100, 2)
-            if return_on_equity is not None:
-                return_on_equity = round(return_on_equity * 100, 2)
-            if dividend_yield is not None:
-                dividend_yield = round(dividend_yield * 100, 2)
-
-            # Check for existing record for today
-            existing = db.exec(
-                select(FinancialData).where(
-                    FinancialData.company_id == company.id,
-                    FinancialData.record_date == today,
-                )
-            ).first()
-
-            if existing:
-                # Update existing record
-                fd = existing
-            else:
-                fd = FinancialData(company_id=company.id, symbol=symbol, record_date=today)
-
-            fd.ask = ask
-            fd.book_value = book_value
-            fd.market_cap = market_cap
-            fd.ebitda = ebitda
-            fd.pe_ratio_ttm = pe_ratio_ttm
-            fd.pe_ratio_ftm = pe_ratio_ftm
-            fd.eps_estimate_current_year = eps_current_year
-            fd.eps_estimate_next_year = eps_next_year
-            fd.peg_ratio = peg_ratio
-            fd.garp_ratio = garp_ratio
-            fd.return_on_assets = return_on_assets
-            fd.return_on_equity = return_on_equity
-            fd.dividend_yield = dividend_yield
-            fd.net_income = net_income
-            fd.total_assets = total_assets
-
-            db.add(fd)
-            db.commit()
-            stats["succeeded"] += 1
+    # No write transaction is open while the source fetches (see WriteScheduler.batches)
+    for symbol, info, error in chain.from_iterable(writer.batches(fetch_infos(source, symbols))):
+        if error is not None:
+            logger.error(f"  Error fetching {symbol}: {error}")
+            stats["failed"] += 1
+            continue
+
+        if not info or info.get("regularMarketPrice") is None:
+            logger.warning(f"  No data for {symbol}, skipping")
+            stats["skipped"] += 1
+            continue
 
+        try:
+            # One SAVEPOINT per symbol: a failure undoes this symbol's writes,
+            # not the earlier rows of the pending chunk
+            with writer.savepoint():
+                # Upsert company
+                company = db.exec(
+                    select(Company).where(Company.symbol == symbol)
+                ).first()
+                if not company:
+                    company = Company(
+                        symbol=symbol,
+                        name=info.get("shortName") or info.get("longName"),
+                        sector=info.get("sector"),
+                        industry=info.get("industry"),
+                    )
+                    db.add(company)
+                    db.flush()  # assign company.id without committing the chunk
+                else:
+                    company.name = info.get("shortName") or info.get("longName") or company.name
+                    company.sector = info.get("sector") or company.sector
+                    company.industry = info.get("industry") or company.industry
+                    db.add(company)
+
+                # Extract metrics
+                ask = info.get("currentPrice") or info.get("regularMarketPrice")
+                book_value = info.get("bookValue")
+                market_cap = info.get("marketCap")
+                ebitda = info.get("ebitda")
+                pe_ratio_ttm = info.get("trailingPE")
+                pe_ratio_ftm = info.get("forwardPE")
+                eps_current_year = info.get("epsCurrentYear")
+                eps_next_year = info.get("epsForward")
+                peg_ratio = info.get("pegRatio")
+                year_low = info.get("fiftyTwoWeekLow")
+                year_high = info.get("fiftyTwoWeekHigh")
+                return_on_assets = info.get("returnOnAssets")
+                return_on_equity = info.get("returnOnEquity")
+                dividend_yield = info.get("dividendYield")
+                net_income = info.get("netIncomeToCommon")
+                total_assets = info.get("totalAssets")
+
+                # Calculate derived metrics
+                garp_ratio = None
+                if pe_ratio_ttm and peg_ratio and peg_ratio > 0:
+                    garp_ratio = pe_ratio_ttm / peg_ratio
+
+                magic_formula_trailing = None  # Calculated during ranking
+                magic_formula_future = None
+
+                # Convert percentages (yfinance returns decimals like 0.15 for 15%)
+                if return_on_assets is not None:
+                    return_on_assets = round(return_on_assets * 100, 2)
+                if return_on_equity is not None:
+                    return_on_equity = round(return_on_equity * 100, 2)
+                if dividend_yield is not None:
+                    dividend_yield = round(dividend_yield * 100, 2)
+                change_year_low = percent_change(ask, year_low)
+                change_year_high = percent_change(ask, year_high)
+
+                # Check for existing record for today
+                existing = db.exec(
+                    select(FinancialData).where(
+                        FinancialData.company_id == company.id,
+                        FinancialData.record_date == today,
+                    )
+                ).first()
+
+                if existing:
+                    # Update existing record
+                    fd = existing
+                else:
+                    fd = FinancialData(company_id=company.id, symbol=symbol, record_date=today)
+
+                fd.ask = ask
+                fd.book_value = book_value
+                fd.market_cap = market_cap
+                fd.ebitda = ebitda
+                fd.pe_ratio_ttm = pe_ratio_ttm
+                fd.pe_ratio_ftm = pe_ratio_ftm
+                fd.eps_estimate_current_year = eps_current_year
+                fd.eps_estimate_next_year = eps_next_year
+                fd.peg_ratio = peg_ratio
+                fd.garp_ratio = garp_ratio
+                fd.return_on_assets = return_on_assets
+                fd.return_on_equity = return_on_equity
+                fd.dividend_yield = dividend_yield
+                fd.net_income = net_income
+                fd.total_assets = total_assets
+                fd.change_year_low_per = change_year_low
+                fd.change_year_high_per = change_year_high
+
+                company.fundamentals_fetched_at = datetime.datetime.now()
+                company.next_earnings_date = earnings_date(info)
+                db.add(fd)
         except Exception as e:
-            logger.error(f"  Error fetching {symbol}: {e}")
+            logger.error(f"  Error storing {symbol}: {e}")
             stats["failed"] += 1
-            db.rollback()
+            continue
 
+        writer.add(fd)
+        stats["succeeded"] += 1
+
+    writer.checkpoint()
+    stats["writes"] = writer.metrics()
+    stats["source"] = source.metrics()
+    if owns_source:
+        source.close()
+    invalidate_snapshot()
+    record_job("import", time.perf_counter() - start, stats["succeeded"])
+    current_span().set_attributes({
+        "stocker.symbols": stats["total"],
+        "stocker.succeeded": stats["succeeded"],
+        "stocker.record_date": today.isoformat(),
+        "stocker.committed_at": time.time(),
+    })
     return stats
 
 
-def compute_rankings(db: Session) -> int:
-    """Compute rank columns for all financial data records.
+# Ranking definitions: (metric_attr, rank_attr, ascending)
+# ascending=True means lower values get lower (better) rank. Every rank_attr
+# is a RankingRow column; peg_ratio is display-only (it feeds garp_ratio).
+RANK_CONFIGS = [
+    ("ebitda", "rank_ebitda", False),
+    ("pe_ratio_ttm", "rank_pe_ratio_ttm", True),
+    ("pe_ratio_ftm", "rank_pe_ratio_ftm", True),
+    ("garp_ratio", "rank_garp_ratio", True),
+    ("return_on_assets", "rank_return_on_assets", False),
+    ("return_on_equity", "rank_return_on_equity", False),
+    ("dividend_yield", "rank_dividend_yield", False),
+]
+
+
+def _rank(values: dict[int, float], ascending: bool) -> dict[int, int]:
+    """Map id -> 1-based rank for positive values."""
+    scored = [(key, val) for key, val in values.items() if val is not None and val > 0]
+    scored.sort(key=lambda x: x[1], reverse=not ascending)
+    return {key: rank for rank, (key, _) in enumerate(scored, 1)}
+
+
+# Magic Formula composites: (score_attr, pe_rank_attr); lower score = better
+MAGIC_FORMULA_CONFIGS = [
+    ("magic_formula_trailing", "rank_pe_ratio_ttm"),
+    ("magic_formula_future", "rank_pe_ratio_ftm"),
+]
+
+
+def _ranking_inputs(record_date: datetime.date):
+    """Ids, sector and metric columns of one record date, in id order."""
+    return (
+        select(
+            FinancialData.id,
+            FinancialData.company_id,
+            FinancialData.symbol,
+            Company.sector,
+            *[getattr(FinancialData, m) for m, _, _ in RANK_CONFIGS],
+        )
+        .join(Company, FinancialData.company_id == Company.id)
+        .where(FinancialData.record_date == record_date)
+        .order_by(FinancialData.id)
+    )
+
+
+def _rank_records(records) -> tuple[dict[str, dict[int, int]], dict[str, dict[int, int]]]:
+    """Ranks and Magic Formula scores keyed by financial_data id."""
+    ranks: dict[str, dict[int, int]] = {}
+    for metric_attr, rank_attr, ascending in RANK_CONFIGS:
+        with span("rank_metric", **{"stocker.metric": metric_attr}):
+            ranks[rank_attr] = _rank({r.id: getattr(r, metric_attr) for r in records}, ascending)
+
+    # Magic Formula rankings (composite of PE rank + ROA rank)
+    # Exclude Finance, Energy, Utilities sectors
+    eligible = [r for r in records if r.sector not in EXCLUDED_SECTORS]
+    roa = ranks["rank_return_on_assets"]
+    mf_scores: dict[str, dict[int, int]] = {}
+    for mf_attr, pe_rank_attr in MAGIC_FORMULA_CONFIGS:
+        with span("rank_metric", **{"stocker.metric": mf_attr}):
+            pe = ranks[pe_rank_attr]
+            mf_scores[mf_attr] = {
+                r.id: pe[r.id] + roa[r.id]
+                for r in eligible
+                if r.id in pe and r.id in roa
+            }
+            # Lower composite score = better
+            ranks[f"rank_{mf_attr}"] = _rank(mf_scores[mf_attr], ascending=True)
+    return ranks, mf_scores
+
+
+class _RankColumns:
+    """Ranking inputs of one record date as compact parallel arrays.
+
+    Position i of every array belongs to the same financial_data row. Missing
+    metrics are stored as NaN, which fails the ``> 0`` test like None does.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.company_ids = array("q")
+        self.symbols: list[str] = []
+        self.eligible = bytearray()
+        self.metrics = {metric_attr: array("d") for metric_attr, _, _ in RANK_CONFIGS}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _load_rank_columns(db: Session, record_date: datetime.date, chunk_size: int) -> _RankColumns:
+    """Read the ranking inputs in keyset-paginated chunks of ``chunk_size`` rows."""
+    columns = _RankColumns()
+    metric_arrays = [(m, columns.metrics[m]) for m, _, _ in RANK_CONFIGS]
+    last_id = 0
+    while True:
+        chunk = db.exec(
+            _ranking_inputs(record_date).where(FinancialData.id > last_id).limit(chunk_size)
+        ).all()
+        if not chunk:
+            return columns
+        for r in chunk:
+            columns.ids.append(r.id)
+            columns.company_ids.append(r.company_id)
+            columns.symbols.append(r.symbol)
+            columns.eligible.append(r.sector not in EXCLUDED_SECTORS)
+            for metric_attr, values in metric_arrays:
+                value = getattr(r, metric_attr)
+                values.append(math.nan if value is None else value)
+        last_id = chunk[-1].id
+
+
+def _rank_positions(values, ascending: bool) -> array:
+    """Positional counterpart of ``_rank``: 1-based rank per position, 0 if unranked."""
+    ranks = array("l", [0]) * len(values)
+    order = sorted(
+        (i for i in range(len(values)) if values[i] > 0),
+        key=values.__getitem__,
+        reverse=not ascending,
+    )
+    for rank, i in enumerate(order, 1):
+        ranks[i] = rank
+    return ranks
+
+
+def _rank_columns(columns: _RankColumns) -> tuple[dict[str, array], dict[str, array]]:
+    """Ranks and Magic Formula scores (0 = none) for compact ranking inputs."""
+    ranks: dict[str, array] = {}
+    for metric_attr, rank_attr, ascending in RANK_CONFIGS:
+        with span("rank_metric", **{"stocker.metric": metric_attr}):
+            ranks[rank_attr] = _rank_positions(columns.metrics[metric_attr], ascending)
+
+    roa = ranks["rank_return_on_assets"]
+    scores: dict[str, array] = {}
+    for mf_attr, pe_rank_attr in MAGIC_FORMULA_CONFIGS:
+        with span("rank_metric", **{"stocker.metric": mf_attr}):
+            pe = ranks[pe_rank_attr]
+            score = array("l", [0]) * len(columns)
+            for i in range(len(columns)):
+                if columns.eligible[i] and pe[i] and roa[i]:
+                    score[i] = pe[i] + roa[i]
+            scores[mf_attr] = score
+            ranks[f"rank_{mf_attr}"] = _rank_positions(score, ascending=True)
+    return ranks, scores
+
+
+def _compact_ranking_rows(columns: _RankColumns, ranks: dict, scores: dict, generation_id: int):
+    rank_arrays = [(rank_attr, ranks.get(rank_attr)) for rank_attr in RANK_COLUMNS]
+    for i in range(len(columns)):
+        row = {
+            "generation_id": generation_id,
+            "financial_data_id": columns.ids[i],
+            "company_id": columns.company_ids[i],
+            "symbol": columns.symbols[i],
+        }
+        for mf_attr, score in scores.items():
+            row[mf_attr] = score[i] or None
+        for rank_attr, values in rank_arrays:
+            row[rank_attr] = (values[i] or None) if values is not None else None
+        yield row
+
+
+@traced("compute_rankings")
+def compute_rankings(db: Session, low_memory: Optional[bool] = None) -> int:
+    """Compute rankings for the latest record date as a new generation.
+
+    Ranks are written to ``ranking_rows`` under an unpublished
+    ``RankingGeneration`` while readers keep serving the current one; the new
+    generation is then published with a single update of ``ranking_state``.
+
+    With ``low_memory`` (default ``settings.rankings_low_memory``) the inputs
+    are read in chunks into compact arrays and rows are written as they are
+    generated, so memory stays at a few hundred bytes per company.
 
     Returns the number of records ranked.
     """
+    start = time.perf_counter()
     # Get the latest record_date
     from sqlalchemy import func
     latest_date = db.exec(
@@ -186,78 +417,101 @@ def compute_rankings(db: Session) -> int:
     if not latest_date:
         return 0
 
-    # Get all records for the latest date, joined with company for sector filtering
-    records = db.exec(
-        select(FinancialData, Company)
-        .join(Company, FinancialData.company_id == Company.id)
-        .where(FinancialData.record_date == latest_date)
-    ).all()
+    low_memory = settings.rankings_low_memory if low_memory is None else low_memory
+    if low_memory:
+        columns = _load_rank_columns(db, latest_date, settings.rankings_chunk_size)
+        count = len(columns)
+        if not count:
+            return 0
+        ranks, scores = _rank_columns(columns)
+
+        def ranking_rows(generation_id: int):
+            return _compact_ranking_rows(columns, ranks, scores, generation_id)
+    else:
+        # Get all records for the latest date, joined with company for sector filtering
+        records = db.exec(_ranking_inputs(latest_date)).all()
+        count = len(records)
+        if not records:
+            return 0
+        ranks, mf_scores = _rank_records(records)
+
+        def ranking_rows(generation_id: int):
+            for r in records:
+                row = {
+                    "generation_id": generation_id,
+                    "financial_data_id": r.id,
+                    "company_id": r.company_id,
+                    "symbol": r.symbol,
+                }
+                for mf_attr, score in mf_scores.items():
+                    row[mf_attr] = score.get(r.id)
+                for rank_attr in RANK_COLUMNS:
+                    row[rank_attr] = ranks.get(rank_attr, {}).get(r.id)
+                yield row
+
+    generation = RankingGeneration(record_date=latest_date, row_count=count)
+    db.add(generation)
+    db.commit()
+    db.refresh(generation)
+
+    writer = WriteScheduler(db, name="compute_rankings")
+    writer.insert_iter(RankingRow.__table__, ranking_rows(generation.id))
+
+    publish_generation(db, generation.id)
+    prune_generations(db)
+    writer.checkpoint()
+    logger.info(f"Ranking generation {generation.id} published: {writer.metrics()}")
+    record_job("rankings", time.perf_counter() - start, count)
+    current_span().set_attributes({
+        "stocker.generation_id": generation.id,
+        "stocker.record_date": latest_date.isoformat(),
+        "stocker.rows": count,
+        "stocker.published_at": time.time(),
+    })
+    return count
+
+
+def publish_generation(db: Session, generation_id: int) -> None:
+    """Atomically make ``generation_id`` the generation readers see."""
+    state = db.get(RankingState, 1) or RankingState(id=1)
+    state.generation_id = generation_id
+    generation = db.get(RankingGeneration, generation_id)
+    generation.published_at = datetime.datetime.utcnow()
+    db.add(state)
+    db.add(generation)
+    db.commit()
+    invalidate_snapshot()
 
-    if not records:
-        return 0
 
-    # Ranking definitions: (metric_attr, rank_attr, ascending, sector_filter)
-    # ascending=True means lower values get lower (better) rank
-    rank_configs = [
-        ("ebitda", "rank_ebitda", False, None),
-        ("pe_ratio_ttm", "rank_pe_ratio_ttm", True, None),
-        ("pe_ratio_ftm", "rank_pe_ratio_ftm", True, None),
-        ("peg_ratio", "rank_peg_ratio", True, None),
-        ("garp_ratio", "rank_garp_ratio", True, None),
-        ("return_on_assets", "rank_return_on_assets", False, None),
-        ("return_on_equity", "rank_return_on_equity", False, None),
-        ("dividend_yield", "rank_dividend_yield", False, None),
-    ]
-
-    for metric_attr, rank_attr, ascending, _ in rank_configs:
-        # Collect (fd, value) pairs where value is not None and positive for ratios
-        scored = []
-        for fd, company in records:
-            val = getattr(fd, metric_attr)
-            if val is not None and val > 0:
-                scored.append((fd, val))
-
-        # Sort
-        scored.sort(key=lambda x: x[1], reverse=not ascending)
-
-        # Assign ranks
-        for rank, (fd, _) in enumerate(scored, 1):
-            setattr(fd, rank_attr, rank)
-            db.add(fd)
+def _stale_generations_statement(current: int):
+    """Generations before ``current`` other than the newest published one per date."""
+    from sqlalchemy import func
+
+    keep = select(func.max(RankingGeneration.id)).where(
+        RankingGeneration.published_at.isnot(None)
+    ).group_by(RankingGeneration.record_date)
+    return select(RankingGeneration.id).where(
+        RankingGeneration.id < current,
+        RankingGeneration.id.not_in(keep),
+    )
 
-    # Magic Formula rankings (composite of PE rank + ROA rank)
-    # Exclude Finance, Energy, Utilities sectors
-    for fd, company in records:
-        if company.sector in EXCLUDED_SECTORS:
-            fd.rank_magic_formula_trailing = None
-            fd.rank_magic_formula_future = None
-            db.add(fd)
-            continue
 
-        if fd.rank_pe_ratio_ttm and fd.rank_return_on_assets:
-            fd.magic_formula_trailing = fd.rank_pe_ratio_ttm + fd.rank_return_on_assets
-        if fd.rank_pe_ratio_ftm and fd.rank_return_on_assets:
-            fd.magic_formula_future = fd.rank_pe_ratio_ftm + fd.rank_return_on_assets
-
-        db.add(fd)
-
-    # Now rank the magic formula composite scores
-    for mf_attr, mf_rank_attr in [
-        ("magic_formula_trailing", "rank_magic_formula_trailing"),
-        ("magic_formula_future", "rank_magic_formula_future"),
-    ]:
-        scored = []
-        for fd, company in records:
-            if company.sector in EXCLUDED_SECTORS:
-                continue
-            val = getattr(fd, mf_attr)
-            if val is not None and val > 0:
-                scored.append((fd, val))
-
-        scored.sort(key=lambda x: x[1])  # Lower composite score = better
-        for rank, (fd, _) in enumerate(scored, 1):
-            setattr(fd, mf_rank_attr, rank)
-            db.add(fd)
+def prune_generations(db: Session) -> int:
+    """Delete generations nobody can read any more.
+
+    Keeps the newest published generation for every record date (ranking
+    history) and anything newer than the current one (a run in progress).
+    Returns the number of generations deleted.
+    """
+    current = db.exec(select(RankingState.generation_id).where(RankingState.id == 1)).first()
+    if current is None:
+        return 0
+
+    stale = db.exec(_stale_generations_statement(current)).all()
+    if not stale:
+        return 0
 
+    db.exec(delete(RankingRow.__table__).where(RankingRow.generation_id.in_(stale)))
+    db.exec(delete(RankingGeneration.__table__).where(RankingGeneration.id.in_(stale)))
     db.commit()
-    return len(records)
+    return len(stale)
@@ -0,0 +1,59 @@
+"""
+Pluggable data sources for ``fetch_and_store``.
+
+- ``yfinance``: live Yahoo Finance (``YFinanceSource``),
+- ``replay``: recorded fixtures (``DATA_SOURCE_FIXTURES``) or the synthetic universe,
+- ``http``: the local stand-in server (``stub_server``) at ``DATA_SOURCE_URL``.
+"""
+
+from typing import Optional
+
+from app.config import settings
+from app.services.data_sources.base import (
+    QUOTE_KEYS,
+    DataSource,
+    DataSourceError,
+    ThrottledError,
+    TransientError,
+    fetch_infos,
+    fetch_quotes,
+    quote_from_info,
+    with_retries,
+)
+
+SOURCES = ("yfinance", "replay", "http")
+
+
+def get_source(name: Optional[str] = None) -> DataSource:
+    """Build the configured data source (``settings.data_source`` by default)."""
+    name = name or settings.data_source
+    if name == "yfinance":
+        from app.services.data_sources.yfinance_source import YFinanceSource
+
+        return YFinanceSource()
+    if name == "replay":
+        from app.services.data_sources.replay import ReplaySource
+
+        if not settings.data_source_fixtures:
+            raise ValueError("The replay source needs DATA_SOURCE_FIXTURES")
+        return ReplaySource.from_file(settings.data_source_fixtures)
+    if name == "http":
+        from app.services.data_sources.http_source import HTTPSource
+
+        return HTTPSource(settings.data_source_url)
+    raise ValueError(f"Unknown data source {name!r}; use one of {', '.join(SOURCES)}")
+
+
+__all__ = [
+    "QUOTE_KEYS",
+    "DataSource",
+    "DataSourceError",
+    "SOURCES",
+    "ThrottledError",
+    "TransientError",
+    "fetch_infos",
+    "fetch_quotes",
+    "get_source",
+    "quote_from_info",
+    "with_retries",
+]
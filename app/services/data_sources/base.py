@@ -0,0 +1,212 @@
+"""
+Data-source interface for ingestion.
+
+A ``DataSource`` returns Yahoo Finance style ``info`` dicts (``trailingPE``,
+``returnOnAssets`` as a fraction, ...) for one symbol at a time; that is the
+shape ``fetch_and_store`` maps onto financial_data. ``fetch_infos`` drives a
+source over many symbols with bounded concurrency and retries.
+
+Quotes (``QUOTE_KEYS``: price, market cap, 52-week range) change intraday and
+are cheap: sources with a bulk endpoint set ``quote_batch_size`` and return
+many per request from ``fetch_quote_batch``. ``fetch_quotes`` batches symbols
+accordingly; sources without one fall back to a per-symbol ``info`` request.
+
+Errors: ``DataSourceError`` is permanent for the symbol, ``TransientError``
+(timeouts, 5xx) and ``ThrottledError`` (rate limits) are retried with
+exponential backoff, or after the server's ``retry_after`` when it sends one.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+from app.config import settings
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Price fields of an info dict, refreshable in bulk
+QUOTE_KEYS = ("regularMarketPrice", "currentPrice", "marketCap", "fiftyTwoWeekLow", "fiftyTwoWeekHigh")
+
+
+class DataSourceError(Exception):
+    """The source could not provide data for a symbol."""
+
+
+class TransientError(DataSourceError):
+    """A failure worth retrying (timeout, connection error, server error)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ThrottledError(TransientError):
+    """The source is rate limiting us."""
+
+
+class DataSource:
+    """Provider of per-symbol ``info`` dicts. Subclasses implement ``_fetch_info``."""
+
+    name = "base"
+    # Most symbols fetch_quote_batch accepts per call; 1 = no bulk quote endpoint
+    quote_batch_size = 1
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def fetch_info(self, symbol: str) -> Optional[dict]:
+        """Info dict for ``symbol``, or None if the source doesn't know it."""
+        self._count("requests")
+        return self._fetch_info(symbol)
+
+    def _fetch_info(self, symbol: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def fetch_quote_batch(self, symbols: list[str]) -> dict[str, dict]:
+        """Quotes for ``symbols`` in one request: ``{symbol: quote}``, unknown symbols left out."""
+        self._count("requests")
+        return self._fetch_quote_batch(symbols)
+
+    def _fetch_quote_batch(self, symbols: list[str]) -> dict[str, dict]:
+        # No bulk endpoint: quote_batch_size is 1, so this is one info request
+        quotes = {}
+        for symbol in symbols:
+            info = self._fetch_info(symbol)
+            if info:
+                quotes[symbol] = quote_from_info(info)
+        return quotes
+
+    def metrics(self) -> dict:
+        return {
+            "source": self.name,
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+        }
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "DataSource":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def quote_from_info(info: dict) -> dict:
+    """The ``QUOTE_KEYS`` subset of an info dict."""
+    quote = {key: info.get(key) for key in QUOTE_KEYS}
+    quote["symbol"] = info.get("symbol")
+    return quote
+
+
+def with_retries(source: DataSource, fn, retries: Optional[int] = None, backoff: Optional[float] = None):
+    """Call ``fn()``, retrying transient failures with exponential backoff."""
+    retries = settings.fetch_retries if retries is None else retries
+    backoff = settings.fetch_backoff_seconds if backoff is None else backoff
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except TransientError as e:
+            if isinstance(e, ThrottledError):
+                source._count("throttled")
+            if attempt >= retries:
+                raise
+            delay = e.retry_after if e.retry_after is not None else backoff * 2 ** attempt
+            source._count("retries")
+            time.sleep(delay)
+            attempt += 1
+
+
+def _ordered_map(fn, items: list, concurrency: int) -> Iterator:
+    """``map(fn, items)`` on a thread pool of ``concurrency``, yielding in order.
+
+    Submits at most a few batches ahead of the consumer so memory stays bounded.
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    window = concurrency * 4
+    pending = deque()
+    with ThreadPoolExecutor(concurrency, thread_name_prefix="fetch") as pool:
+        for item in items:
+            # Run in a copy of the caller's context so spans nest under its span
+            pending.append(pool.submit(contextvars.copy_context().run, fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def fetch_infos(
+    source: DataSource,
+    symbols: list[str],
+    concurrency: Optional[int] = None,
+) -> Iterator[tuple[str, Optional[dict], Optional[Exception]]]:
+    """Yield ``(symbol, info, error)`` in symbol order.
+
+    With ``concurrency`` > 1 symbols are fetched by a thread pool.
+    """
+    concurrency = settings.fetch_concurrency if concurrency is None else concurrency
+
+    def fetch(item):
+        i, symbol = item
+        logger.info(f"[{i+1}/{len(symbols)}] Fetching {symbol}...")
+        try:
+            with span("fetch", **{"stocker.symbol": symbol, "stocker.source": source.name}) as fetch_span:
+                info = with_retries(source, lambda: source.fetch_info(symbol))
+                fetch_span.set_attribute("stocker.fetched_at", time.time())
+            return symbol, info, None
+        except Exception as e:
+            return symbol, None, e
+
+    yield from _ordered_map(fetch, list(enumerate(symbols)), concurrency)
+
+
+def fetch_quotes(
+    source: DataSource,
+    symbols: list[str],
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Iterator[tuple[str, Optional[dict], Optional[Exception]]]:
+    """Yield ``(symbol, quote, error)`` in symbol order, like ``fetch_infos``.
+
+    Symbols are requested ``batch_size`` at a time (``settings.quote_batch_size``,
+    capped by the source's ``quote_batch_size``). A failed batch fails all of
+    its symbols; a symbol missing from its batch's response gets quote None.
+    """
+    batch_size = settings.quote_batch_size if batch_size is None else batch_size
+    batch_size = max(1, min(batch_size, source.quote_batch_size))
+    concurrency = settings.fetch_concurrency if concurrency is None else concurrency
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+    def fetch(item):
+        i, batch = item
+        logger.info(f"[{i+1}/{len(batches)}] Fetching quotes for {len(batch)} symbols...")
+        try:
+            with span("fetch_quotes", **{"stocker.symbols": len(batch), "stocker.source": source.name}) as fetch_span:
+                quotes = with_retries(source, lambda: source.fetch_quote_batch(batch))
+                fetch_span.set_attribute("stocker.fetched_at", time.time())
+            return batch, quotes, None
+        except Exception as e:
+            return batch, {}, e
+
+    for batch, quotes, error in _ordered_map(fetch, list(enumerate(batches)), concurrency):
+        for symbol in batch:
+            yield symbol, quotes.get(symbol), error
@@ -0,0 +1,56 @@
+"""Client for the local stand-in quote server (``stub_server``) or anything serving its API.
+
+- ``GET /v1/info/{symbol}``: info dict, 404 for an unknown symbol,
+- ``GET /v1/quote?symbols=A,B,...``: ``{"quotes": {symbol: quote}}`` for up
+  to ``MAX_QUOTE_SYMBOLS`` symbols; unknown symbols are left out.
+"""
+
+from typing import Optional
+
+import httpx
+
+from app.services.data_sources.base import DataSource, DataSourceError, ThrottledError, TransientError
+
+MAX_QUOTE_SYMBOLS = 100
+
+
+class HTTPSource(DataSource):
+    """Info and bulk quote requests against ``base_url``."""
+
+    name = "http"
+    quote_batch_size = MAX_QUOTE_SYMBOLS
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(base_url=self.base_url, timeout=timeout)
+
+    def _get(self, path: str, **params) -> Optional[httpx.Response]:
+        try:
+            response = self._client.get(path, params=params or None)
+        except httpx.TimeoutException as e:
+            raise TransientError(f"Timeout: {e}") from e
+        except httpx.TransportError as e:
+            raise TransientError(f"{type(e).__name__}: {e}") from e
+
+        if response.status_code == 404:
+            return None
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            raise ThrottledError("Throttled (HTTP 429)", float(retry_after) if retry_after else None)
+        if response.status_code >= 500:
+            raise TransientError(f"HTTP {response.status_code}")
+        if response.status_code != 200:
+            raise DataSourceError(f"HTTP {response.status_code}")
+        return response
+
+    def _fetch_info(self, symbol: str) -> Optional[dict]:
+        response = self._get(f"/v1/info/{symbol}")
+        return response.json() if response is not None else None
+
+    def _fetch_quote_batch(self, symbols: list[str]) -> dict[str, dict]:
+        response = self._get("/v1/quote", symbols=",".join(symbols))
+        return response.json()["quotes"] if response is not None else {}
+
+    def close(self) -> None:
+        self._client.close()
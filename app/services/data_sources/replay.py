@@ -0,0 +1,125 @@
+"""
+Offline data sources: recorded fixtures and the synthetic universe.
+
+A fixture file is a JSON object mapping symbols to ``info`` dicts, as written
+by ``RecordingSource`` (``python -m app.cli import-stocks --record PATH``).
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Optional
+
+from app.services.data_sources.base import DataSource, quote_from_info
+
+# Columns stored in percent whose Yahoo counterparts are fractions
+_PERCENT_KEYS = {"return_on_assets": "returnOnAssets", "return_on_equity": "returnOnEquity",
+                 "dividend_yield": "dividendYield"}
+_INFO_KEYS = {
+    "book_value": "bookValue",
+    "market_cap": "marketCap",
+    "ebitda": "ebitda",
+    "pe_ratio_ttm": "trailingPE",
+    "pe_ratio_ftm": "forwardPE",
+    "eps_estimate_current_year": "epsCurrentYear",
+    "eps_estimate_next_year": "epsForward",
+    "peg_ratio": "pegRatio",
+    "net_income": "netIncomeToCommon",
+    "total_assets": "totalAssets",
+}
+
+
+def info_from_row(row: dict, company: dict) -> dict:
+    """Yahoo-style info dict for a financial_data row dict and its company."""
+    info = {
+        "symbol": row["symbol"],
+        "shortName": company.get("name"),
+        "sector": company.get("sector"),
+        "industry": company.get("industry"),
+        "regularMarketPrice": row.get("ask"),
+        "currentPrice": row.get("ask"),
+    }
+    for column, key in _INFO_KEYS.items():
+        info[key] = row.get(column)
+    for column, key in _PERCENT_KEYS.items():
+        value = row.get(column)
+        info[key] = value / 100 if value is not None else None
+    # 52-week range back from the stored "% above low / below high"
+    price = row.get("ask")
+    for column, key in (("change_year_low_per", "fiftyTwoWeekLow"), ("change_year_high_per", "fiftyTwoWeekHigh")):
+        value = row.get(column)
+        info[key] = round(price / (1 + value / 100), 2) if price and value is not None and value > -100 else None
+    return info
+
+
+def synthetic_infos(companies: int, seed: int = 42) -> dict[str, dict]:
+    """Info dicts for today's row of the synthetic universe (app.services.synthetic)."""
+    from app.services.synthetic import business_days, generate_companies, generate_financials
+
+    company_rows = generate_companies(companies, seed)
+    ids = [(i + 1, c["symbol"], c["sector"]) for i, c in enumerate(company_rows)]
+    by_symbol = {c["symbol"]: c for c in company_rows}
+    return {
+        row["symbol"]: info_from_row(row, by_symbol[row["symbol"]])
+        for row in generate_financials(ids, business_days(1), seed)
+    }
+
+
+class ReplaySource(DataSource):
+    """Serves ``info`` dicts from memory: a fixture file or a synthetic universe."""
+
+    name = "replay"
+    quote_batch_size = 100
+
+    def __init__(self, infos: dict[str, dict]):
+        super().__init__()
+        self.infos = infos
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "ReplaySource":
+        return cls(json.loads(Path(path).read_text()))
+
+    @classmethod
+    def synthetic(cls, companies: int, seed: int = 42) -> "ReplaySource":
+        return cls(synthetic_infos(companies, seed))
+
+    def _fetch_info(self, symbol: str) -> Optional[dict]:
+        return self.infos.get(symbol)
+
+    def _fetch_quote_batch(self, symbols: list[str]) -> dict[str, dict]:
+        return {s: quote_from_info(self.infos[s]) for s in symbols if s in self.infos}
+
+
+class RecordingSource(DataSource):
+    """Wraps another source and keeps every info dict it returns for ``save()``."""
+
+    def __init__(self, inner: DataSource):
+        super().__init__()
+        self.inner = inner
+        self.name = inner.name
+        self.quote_batch_size = inner.quote_batch_size
+        self.recorded: dict[str, dict] = {}
+        self._record_lock = threading.Lock()
+
+    def fetch_info(self, symbol: str) -> Optional[dict]:
+        info = self.inner.fetch_info(symbol)
+        if info:
+            with self._record_lock:
+                self.recorded[symbol] = info
+        return info
+
+    def fetch_quote_batch(self, symbols: list[str]) -> dict[str, dict]:
+        # Quotes are not recorded: fixtures hold full info dicts
+        return self.inner.fetch_quote_batch(symbols)
+
+    def metrics(self) -> dict:
+        # Retries are counted on the wrapper fetch_infos was given
+        return {**self.inner.metrics(), "retries": self.retries, "throttled": self.throttled}
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.recorded, indent=1, sort_keys=True, default=str))
+
+    def close(self) -> None:
+        self.inner.close()
@@ -0,0 +1,217 @@
+"""
+Local stand-in for a quote provider, for offline ingest tests and benchmarks.
+
+Serves ``info`` dicts (from a fixture file or the synthetic universe) over the
+API ``HTTPSource`` speaks (per-symbol info and bulk quotes), with configurable
+behaviour:
+
+- ``latency_ms`` +/- ``jitter_ms`` per response,
+- ``error_rate``: share of requests answered with HTTP 503,
+- ``rate_limit``: requests per second (token bucket holding ``burst`` tokens);
+  excess requests get HTTP 429 with a fractional-seconds ``Retry-After``.
+
+Each HTTP request counts once against the rate limit, however many symbols a
+quote request carries. ``GET /stats`` returns request/error/throttle counts.
+
+Usage:
+    python -m app.services.data_sources.stub_server --companies 5000 --latency-ms 50 --rate-limit 100
+    DATA_SOURCE=http DATA_SOURCE_URL=http://127.0.0.1:8765 python -m app.cli import-stocks SYN000000 ...
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from app.services.data_sources.base import quote_from_info
+from app.services.data_sources.http_source import MAX_QUOTE_SYMBOLS
+
+logger = logging.getLogger(__name__)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> Optional[float]:
+        """Take a token; returns None on success or the seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+
+class StubQuoteServer:
+    """Threaded HTTP server serving ``infos``; ``start()`` runs it in the background."""
+
+    def __init__(
+        self,
+        infos: dict[str, dict],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        burst: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.infos = infos
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.bucket = _TokenBucket(rate_limit, burst or max(rate_limit, 1.0)) if rate_limit > 0 else None
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "not_found": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self.stats[field] += 1
+
+    def _random(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+            def _send(self, status: int, body, headers: Optional[dict] = None) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path
+                if path == "/stats":
+                    with server._lock:
+                        self._send(200, dict(server.stats))
+                    return
+                server._count("requests")
+
+                if server.bucket is not None:
+                    wait = server.bucket.take()
+                    if wait is not None:
+                        server._count("throttled")
+                        self._send(429, {"detail": "Too Many Requests"}, {"Retry-After": f"{wait:.3f}"})
+                        return
+
+                delay = server.latency_ms + (server._random() * 2 - 1) * server.jitter_ms
+                if delay > 0:
+                    time.sleep(delay / 1000)
+                if server.error_rate and server._random() < server.error_rate:
+                    server._count("errors")
+                    self._send(503, {"detail": "Service Unavailable"})
+                    return
+                self._route(path, parse_qs(url.query))
+
+            def _route(self, path: str, query: dict) -> None:
+                if path.startswith("/v1/info/"):
+                    info = server.infos.get(unquote(path[len("/v1/info/"):]))
+                    if info is None:
+                        server._count("not_found")
+                        self._send(404, {"detail": "Unknown symbol"})
+                    else:
+                        self._send(200, info)
+                    return
+                if path == "/v1/quote":
+                    symbols = [s for s in ",".join(query.get("symbols", [])).split(",") if s]
+                    if not symbols or len(symbols) > MAX_QUOTE_SYMBOLS:
+                        self._send(400, {"detail": f"Pass 1 to {MAX_QUOTE_SYMBOLS} symbols"})
+                        return
+                    quotes = {s: quote_from_info(server.infos[s]) for s in symbols if s in server.infos}
+                    self._send(200, {"quotes": quotes})
+                    return
+                self._send(404, {"detail": "Not found"})
+
+        return Handler
+
+    def start(self) -> "StubQuoteServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-quote-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "StubQuoteServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    from app.services.data_sources.replay import synthetic_infos
+
+    parser = argparse.ArgumentParser(description="Local stand-in quote server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="Fixture JSON ({symbol: info}); default: synthetic universe")
+    parser.add_argument("--companies", type=int, default=1000, help="Synthetic universe size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests per second (0 = unlimited)")
+    parser.add_argument("--burst", type=float, help="Token bucket size (default: one second of rate limit)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", datefmt="%H:%M:%S")
+    if args.fixtures:
+        with open(args.fixtures) as f:
+            infos = json.load(f)
+    else:
+        infos = synthetic_infos(args.companies, args.seed)
+
+    server = StubQuoteServer(
+        infos, args.host, args.port, args.latency_ms, args.jitter_ms,
+        args.error_rate, args.rate_limit, args.burst, args.seed,
+    )
+    logger.info(f"Serving {len(infos)} symbols on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
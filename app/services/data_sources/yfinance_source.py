@@ -0,0 +1,70 @@
+"""Live Yahoo Finance data through the yfinance package (imported lazily).
+
+Info dicts come from ``Ticker.info``, one request per symbol. Quotes are
+fetched in bulk with ``yf.download`` (one year of daily bars for a whole
+batch): the last close is the price and the bars give the 52-week range.
+Market cap is not part of the download, so quotes leave it None.
+"""
+
+import math
+from typing import Optional
+
+from app.services.data_sources.base import DataSource, DataSourceError, ThrottledError
+
+
+def _error(e: Exception) -> DataSourceError:
+    # yfinance raises plain exceptions (or YFRateLimitError) on HTTP 429
+    if "Too Many Requests" in str(e) or "RateLimit" in type(e).__name__:
+        return ThrottledError(str(e))
+    return DataSourceError(f"{type(e).__name__}: {e}")
+
+
+class YFinanceSource(DataSource):
+    name = "yfinance"
+    quote_batch_size = 100
+
+    def __init__(self):
+        super().__init__()
+        import yfinance
+
+        self._yf = yfinance
+
+    def _fetch_info(self, symbol: str) -> Optional[dict]:
+        try:
+            return self._yf.Ticker(symbol).info
+        except Exception as e:
+            raise _error(e) from e
+
+    def _fetch_quote_batch(self, symbols: list[str]) -> dict[str, dict]:
+        try:
+            bars = self._yf.download(
+                symbols, period="1y", interval="1d", group_by="ticker",
+                auto_adjust=False, progress=False, threads=False,
+            )
+        except Exception as e:
+            raise _error(e) from e
+        if bars is None or bars.empty:
+            return {}
+
+        quotes = {}
+        for symbol in symbols:
+            if bars.columns.nlevels > 1:
+                if symbol not in bars.columns.get_level_values(0):
+                    continue
+                symbol_bars = bars[symbol]
+            else:
+                symbol_bars = bars
+            closes = symbol_bars["Close"].dropna()
+            if closes.empty:
+                continue
+            price = float(closes.iloc[-1])
+            low, high = float(symbol_bars["Low"].min()), float(symbol_bars["High"].max())
+            quotes[symbol] = {
+                "symbol": symbol,
+                "regularMarketPrice": price,
+                "currentPrice": price,
+                "marketCap": None,
+                "fiftyTwoWeekLow": low if not math.isnan(low) else None,
+                "fiftyTwoWeekHigh": high if not math.isnan(high) else None,
+            }
+        return quotes
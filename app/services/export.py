@@ -0,0 +1,168 @@
+"""
+Streaming export of financial history and rankings.
+
+Rows are pulled from a server-side cursor in ``EXPORT_BATCH_SIZE`` chunks and
+encoded incrementally as NDJSON or CSV, so memory use stays constant no matter
+how much history is exported.
+"""
+
+import csv
+import datetime
+import io
+import json
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+from app.models.ranking import RankingGeneration, RankingRow
+from app.services.partitions import financial_history
+from app.services.rankings import _ranking_columns, current_generation_id
+
+EXPORT_BATCH_SIZE = 1000
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Without the legacy rank/score columns, which are never written any more:
+# rankings are exported from the published generation (iter_rankings)
+FINANCIAL_COLUMNS = tuple(
+    name for name in FinancialData.__table__.columns.keys()
+    if name not in {"id", "magic_formula_trailing", "magic_formula_future"}
+    and not name.startswith("rank_")
+)
+RANKING_COLUMNS = (
+    "record_date", "symbol", "name", "rank", "score",
+    "pe_ratio_ttm", "pe_ratio_ftm", "garp_ratio", "peg_ratio", "return_on_assets",
+)
+
+
+def _date_filters(statement, financials, as_of, start, end):
+    if as_of is not None:
+        statement = statement.where(financials.record_date == as_of)
+    if start is not None:
+        statement = statement.where(financials.record_date >= start)
+    if end is not None:
+        statement = statement.where(financials.record_date <= end)
+    return statement
+
+
+def _financials_statement(as_of, start, end, symbols):
+    financials = financial_history()
+    statement = select(*[getattr(financials, c) for c in FINANCIAL_COLUMNS])
+    statement = _date_filters(statement, financials, as_of, start, end)
+    if symbols:
+        statement = statement.where(financials.symbol.in_(symbols))
+    return statement.order_by(financials.record_date, financials.symbol)
+
+
+def iter_financials(
+    db: Session,
+    as_of: Optional[datetime.date] = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    symbols: Optional[list[str]] = None,
+) -> Iterator[tuple]:
+    """Yield FinancialData rows (as tuples of ``FINANCIAL_COLUMNS``)."""
+    statement = _financials_statement(as_of, start, end, symbols)
+    result = db.exec(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for partition in result.partitions():
+        yield from (tuple(r) for r in partition)
+
+
+def iter_rankings(
+    db: Session,
+    strategy: str,
+    as_of: Optional[datetime.date] = None,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> Iterator[tuple]:
+    """Yield ranking rows (as tuples of ``RANKING_COLUMNS``).
+
+    Without any date filter, only the published generation is exported;
+    otherwise the newest published generation of each matching record date.
+    """
+    if as_of is None and start is None and end is None:
+        # The published generation always lives in the hot table
+        financials = FinancialData
+        generations = select(current_generation_id())
+    else:
+        financials = financial_history()
+        generations = select(func.max(RankingGeneration.id)).where(
+            RankingGeneration.published_at.isnot(None)
+        ).group_by(RankingGeneration.record_date)
+
+    columns = _ranking_columns(strategy, financials)
+    if columns is None:
+        return
+    rank_attr, score_attr = columns
+
+    statement = (
+        select(
+            financials.record_date,
+            Company.symbol,
+            Company.name,
+            rank_attr,
+            score_attr,
+            financials.pe_ratio_ttm,
+            financials.pe_ratio_ftm,
+            financials.garp_ratio,
+            financials.peg_ratio,
+            financials.return_on_assets,
+        )
+        .join(RankingRow, Company.id == RankingRow.company_id)
+        .join(financials, RankingRow.financial_data_id == financials.id)
+        .where(
+            RankingRow.generation_id.in_(generations),
+            rank_attr.isnot(None),
+            rank_attr > 0,
+        )
+    )
+    statement = _date_filters(statement, financials, as_of, start, end)
+    statement = statement.order_by(financials.record_date, rank_attr)
+
+    result = db.exec(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for partition in result.partitions():
+        yield from (tuple(r) for r in partition)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_ndjson(columns: tuple, rows: Iterable[tuple]) -> Iterator[bytes]:
+    buf = []
+    for row in rows:
+        buf.append(json.dumps(dict(zip(columns, row)), default=_json_default))
+        if len(buf) >= EXPORT_BATCH_SIZE:
+            yield ("\n".join(buf) + "\n").encode()
+            buf.clear()
+    if buf:
+        yield ("\n".join(buf) + "\n").encode()
+
+
+def encode_csv(columns: tuple, rows: Iterable[tuple]) -> Iterator[bytes]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+        if n >= EXPORT_BATCH_SIZE:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+            n = 0
+    yield out.getvalue().encode()
+
+
+def encode(fmt: str, columns: tuple, rows: Iterable[tuple]) -> Iterator[bytes]:
+    if fmt == "csv":
+        return encode_csv(columns, rows)
+    return encode_ndjson(columns, rows)
@@ -0,0 +1,492 @@
+"""
+Prometheus-style metrics without external dependencies.
+
+Counters, gauges and histograms live in process memory; an update is a dict
+lookup plus a few additions under a per-metric lock that is never held for
+I/O. ``render()`` produces the Prometheus text exposition format served at
+``/metrics``.
+
+Multiple uvicorn workers: set ``METRICS_DIR`` to a directory shared by all
+workers (and CLI jobs). Every worker periodically writes its samples to
+``<METRICS_DIR>/<pid>.json``; the worker that answers a scrape merges all
+files. Counters and histograms are summed; gauges are merged per their
+``mode``:
+
+- ``livesum``: sum over running processes (in-flight requests, pool checkouts),
+- ``last``: the most recently set value wins (job durations, data freshness).
+
+When a process exits (worker shutdown, end of a CLI job) it is retired: its
+``last`` gauges are folded into ``last.json`` and its own file is removed, so
+the directory doesn't grow and dead workers' counters are not summed forever.
+Counters drop by an exited worker's share, which Prometheus treats as a
+counter reset. Workers also retire files left by dead processes (a crash, or
+the previous run before a restart) when they start.
+"""
+
+import bisect
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_SEP = "\x1f"
+
+# Holds the "last" gauges of retired processes
+LAST_FILE = "last.json"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def _dump(self) -> dict:
+        with self._lock:
+            samples = {_SEP.join(k): (list(v) if isinstance(v, list) else v) for k, v in self._values.items()}
+        return {"type": self.kind, "help": self.documentation, "labels": self.labelnames, "samples": samples}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set(self, value: float, *labels: str) -> None:
+        """For collectors mirroring a process-wide total kept elsewhere."""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), mode: str = "livesum"):
+        super().__init__(name, documentation, labelnames)
+        self.mode = mode
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, *labels: str) -> None:
+        self.inc(-amount, *labels)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            # "last" gauges carry their timestamp so files can be merged
+            self._values[labels] = [value, time.time()] if self.mode == "last" else value
+
+    def _dump(self) -> dict:
+        dump = super()._dump()
+        dump["mode"] = self.mode
+        return dump
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # per-bucket counts (non-cumulative, +Inf last), then sum
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[i] += 1
+            state[-1] += value
+
+    def _dump(self) -> dict:
+        dump = super()._dump()
+        dump["buckets"] = self.buckets
+        return dump
+
+
+_registry: dict[str, _Metric] = {}
+_collectors: list[Callable[[], None]] = []
+
+
+def _register(metric):
+    existing = _registry.get(metric.name)
+    if existing is not None:
+        return existing
+    _registry[metric.name] = metric
+    return metric
+
+
+def counter(name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+    return _register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: tuple = (), mode: str = "livesum") -> Gauge:
+    return _register(Gauge(name, documentation, labelnames, mode))
+
+
+def histogram(name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_collector(fn: Callable[[], None]) -> None:
+    """Run ``fn`` before samples are exported (to refresh pull-style gauges)."""
+    if fn not in _collectors:
+        _collectors.append(fn)
+
+
+# -- Application metrics ----------------------------------------------------------
+
+REQUESTS = counter("http_requests_total", "HTTP requests", ("method", "route", "status"))
+REQUEST_LATENCY = histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+IN_FLIGHT = gauge("http_requests_in_flight", "HTTP requests being served", ("method", "route"))
+
+SNAPSHOT_READS = counter("ranking_snapshot_reads_total", "Ranking snapshot reads", ("result",))
+SNAPSHOT_BUILD = histogram("ranking_snapshot_build_seconds", "Ranking snapshot rebuild time")
+
+JOB_DURATION = gauge("job_last_duration_seconds", "Duration of the last run", ("job",), mode="last")
+JOB_ROWS = gauge("job_last_rows", "Rows written by the last run", ("job",), mode="last")
+JOB_FINISHED = gauge("job_last_finished_timestamp_seconds", "End of the last run", ("job",), mode="last")
+
+DB_POOL = gauge("db_pool_connections", "Connection pool state", ("engine", "state"))
+DB_QUERIES = counter("db_queries_total", "SQL statements executed")
+DB_QUERY_SECONDS = counter("db_query_seconds_total", "Time spent in SQL statements")
+RECORD_AGE = gauge(
+    "financial_data_latest_record_age_seconds", "Age of the newest financial_data record_date", mode="last"
+)
+
+
+def record_job(job: str, seconds: float, rows: int) -> None:
+    JOB_DURATION.set(seconds, job)
+    JOB_ROWS.set(rows, job)
+    JOB_FINISHED.set(time.time(), job)
+
+
+def _collect_database() -> None:
+    from app.database import async_engine, engine, read_engine
+    from app.services.query_stats import query_totals
+
+    pools = (("writer", engine.pool), ("reader", read_engine.pool), ("async", async_engine.sync_engine.pool))
+    for label, pool in pools:
+        for state in ("size", "checkedout", "overflow", "checkedin"):
+            fn = getattr(pool, state, None)
+            if callable(fn):
+                DB_POOL.set(fn(), label, state)
+
+    totals = query_totals(limit=0)
+    DB_QUERIES.set(totals["queries"])
+    DB_QUERY_SECONDS.set(totals["db_seconds"])
+
+
+register_collector(_collect_database)
+
+
+# -- Export / multiprocess aggregation --------------------------------------------
+
+def _snapshot() -> dict:
+    for fn in _collectors:
+        try:
+            fn()
+        except Exception:
+            logger.exception("Metrics collector failed")
+    return {name: metric._dump() for name, metric in _registry.items()}
+
+
+def _own_file() -> Optional[Path]:
+    if not settings.metrics_dir:
+        return None
+    return Path(settings.metrics_dir) / f"{os.getpid()}.json"
+
+
+def _write(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def flush() -> None:
+    """Write this process's samples to METRICS_DIR (no-op when unset)."""
+    path = _own_file()
+    if path is None:
+        return
+    _write(path, {"pid": os.getpid(), "metrics": _snapshot()})
+
+
+@contextmanager
+def _dir_lock(directory: Path):
+    """Serialize read-modify-write of LAST_FILE between processes."""
+    directory.mkdir(parents=True, exist_ok=True)
+    try:
+        import fcntl
+    except ImportError:  # Windows: best effort
+        yield
+        return
+    with open(directory / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _retire_dump(directory: Path, dump: dict) -> None:
+    """Fold the "last" gauges of an exited process into LAST_FILE (lock held)."""
+    last = {
+        name: metric for name, metric in dump.items()
+        if metric["type"] == "gauge" and metric.get("mode") == "last"
+    }
+    if not last:
+        return
+    path = directory / LAST_FILE
+    merged: dict = {}
+    try:
+        _merge(merged, json.loads(path.read_text())["metrics"], alive=False)
+    except (OSError, ValueError, KeyError):
+        pass
+    _merge(merged, last, alive=False)
+    _write(path, {"pid": None, "metrics": merged})
+
+
+def retire() -> None:
+    """Called when this process exits: keep its "last" gauges, remove its file."""
+    own = _own_file()
+    if own is None:
+        return
+    with _dir_lock(own.parent):
+        _retire_dump(own.parent, _snapshot())
+        own.unlink(missing_ok=True)
+
+
+def prune() -> int:
+    """Retire the files of processes that are no longer running. Returns how many."""
+    if not settings.metrics_dir:
+        return 0
+    directory = Path(settings.metrics_dir)
+    pruned = 0
+    with _dir_lock(directory):
+        for path in directory.glob("*.json"):
+            if path.name == LAST_FILE:
+                continue
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if _alive(data["pid"]):
+                continue
+            _retire_dump(directory, data["metrics"])
+            path.unlink(missing_ok=True)
+            pruned += 1
+    return pruned
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(into: dict, dump: dict, alive: bool) -> None:
+    for name, metric in dump.items():
+        target = into.setdefault(name, {**metric, "samples": {}})
+        samples = target["samples"]
+        mode = metric.get("mode")
+        for key, value in metric["samples"].items():
+            if metric["type"] == "gauge" and mode == "last":
+                if key not in samples or value[1] > samples[key][1]:
+                    samples[key] = value
+            elif metric["type"] == "gauge" and not alive:
+                continue
+            elif metric["type"] == "histogram":
+                current = samples.get(key)
+                samples[key] = value if current is None else [a + b for a, b in zip(current, value)]
+            else:
+                samples[key] = samples.get(key, 0.0) + value
+
+
+def collect() -> dict:
+    """Samples of this process merged with every other process's file."""
+    merged: dict = {}
+    _merge(merged, _snapshot(), alive=True)
+    own = _own_file()
+    if own is None:
+        return merged
+
+    for path in Path(settings.metrics_dir).glob("*.json"):
+        if path == own:
+            continue
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        _merge(merged, data["metrics"], alive=_alive(data["pid"]))
+    return merged
+
+
+def _labels(names: tuple, key: str, extra: str = "") -> str:
+    values = key.split(_SEP) if key else []
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render(merged: Optional[dict] = None) -> str:
+    """Prometheus text exposition (format 0.0.4)."""
+    merged = collect() if merged is None else merged
+    lines = []
+    for name, metric in sorted(merged.items()):
+        if not metric["samples"]:
+            continue
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = tuple(metric["labels"])
+        for key, value in sorted(metric["samples"].items()):
+            if metric["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip(list(metric["buckets"]) + ["+Inf"], value[:-1]):
+                    cumulative += count
+                    le = f'le="{_number(float(bound))}"'
+                    lines.append(f"{name}_bucket{_labels(names, key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_labels(names, key)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(names, key)} {cumulative}")
+            else:
+                sample = value[0] if isinstance(value, list) else value
+                lines.append(f"{name}{_labels(names, key)} {_number(sample)}")
+
+    hits = merged.get(SNAPSHOT_READS.name, {}).get("samples", {})
+    total = sum(hits.values())
+    if total:
+        lines.append("# HELP ranking_snapshot_hit_ratio Share of ranking reads served from the snapshot")
+        lines.append("# TYPE ranking_snapshot_hit_ratio gauge")
+        lines.append(f"ranking_snapshot_hit_ratio {_number(hits.get('hit', 0) / total)}")
+    return "\n".join(lines) + "\n"
+
+
+class _Flusher(threading.Thread):
+    def __init__(self, interval: float):
+        super().__init__(name="metrics-flusher", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                flush()
+            except OSError:
+                logger.exception("Could not write metrics file")
+
+
+_flusher: Optional[_Flusher] = None
+
+
+def start_flusher() -> None:
+    """Periodically flush samples when METRICS_DIR is set (one thread per worker)."""
+    global _flusher
+    if not settings.metrics_dir or _flusher is not None:
+        return
+    pruned = prune()
+    if pruned:
+        logger.info(f"Retired {pruned} metrics files of exited processes")
+    _flusher = _Flusher(settings.metrics_flush_seconds)
+    _flusher.start()
+
+
+def stop_flusher() -> None:
+    global _flusher
+    if _flusher is not None:
+        _flusher.stopped.set()
+        _flusher = None
+    retire()
+
+
+# -- Request instrumentation ----------------------------------------------------
+
+@functools.lru_cache(maxsize=4096)
+def _match_route(app, method: str, path: str, root_path: str) -> str:
+    """Path template of the route serving ``method path`` (routes are fixed at startup)."""
+    from starlette.routing import Match
+
+    scope = {"type": "http", "method": method, "path": path, "root_path": root_path}
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-route latency histogram, request counter and in-flight gauge.
+
+    Routes are labelled by their path template (``/api/companies/{symbol}``) so
+    label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route(scope) -> str:
+        route = scope.get("route")  # set by FastAPI once the request was routed
+        if route is not None:
+            return route.path
+        return _match_route(scope.get("app"), scope["method"], scope["path"], scope.get("root_path", ""))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route(scope)
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        IN_FLIGHT.inc(1, method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.observe(time.perf_counter() - start, method, route)
+            REQUESTS.inc(1, method, route, status[0])
+            IN_FLIGHT.dec(1, method, route)
@@ -0,0 +1,222 @@
+"""
+Date partitioning of financial_data.
+
+``financial_data`` stays the hot table: it holds the most recent
+``PARTITION_HOT_DAYS`` of record dates, so ``max(record_date)``, ranking
+computation, imports and the published rankings never look at old history.
+Older record dates are rotated into per-year archive partitions:
+
+- SQLite: one plain table per year (``financial_data_y2024``, ...),
+- PostgreSQL: ``financial_data_archive``, a native ``PARTITION BY RANGE
+  (record_date)`` table whose yearly partitions use the same names.
+
+The ``financial_data_all`` view is the UNION ALL of the hot table and the
+archive. History readers (exports, snapshots, analytics, retention) select
+from ``financial_history()``, which is the view when partitioning is enabled
+and plain ``FinancialData`` otherwise. Rows keep their ids when rotated.
+"""
+
+import datetime
+import logging
+import re
+from typing import Optional
+
+from sqlalchemy import Column, Index, MetaData, Table, func, inspect, text
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import column, table
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.models.financial_data import FinancialData
+
+logger = logging.getLogger(__name__)
+
+HOT_TABLE = FinancialData.__tablename__
+HISTORY_VIEW = "financial_data_all"
+ARCHIVE_TABLE = "financial_data_archive"
+PARTITION_PATTERN = re.compile(r"^financial_data_y(\d{4})$")
+
+COLUMNS = tuple(FinancialData.__table__.columns.keys())
+
+_history_table = Table(
+    HISTORY_VIEW,
+    MetaData(),
+    *[Column(c.name, c.type, primary_key=c.primary_key) for c in FinancialData.__table__.columns],
+)
+FinancialHistory = aliased(FinancialData, _history_table, adapt_on_names=True)
+
+
+def financial_history():
+    """Entity to select financial history from (hot table + archive)."""
+    return FinancialHistory if settings.partitioning else FinancialData
+
+
+def history_table_name() -> str:
+    return HISTORY_VIEW if settings.partitioning else HOT_TABLE
+
+
+def partition_name(year: int) -> str:
+    return f"financial_data_y{year}"
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def list_partitions(db: Session) -> list[int]:
+    """Years that have an archive partition."""
+    names = inspect(db.connection()).get_table_names()
+    return sorted(int(m.group(1)) for m in map(PARTITION_PATTERN.match, names) if m)
+
+
+def partition_table(db: Session, record_date: datetime.date):
+    """Core table an archived record date is written to, or None if absent."""
+    if record_date.year not in list_partitions(db):
+        return None
+    name = ARCHIVE_TABLE if _is_postgres(db) else partition_name(record_date.year)
+    return table(name, *[column(c) for c in COLUMNS])
+
+
+def _ensure_archive(db: Session) -> None:
+    db.exec(text(
+        f"CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} "
+        f"(LIKE {HOT_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (record_date)"
+    ))
+    db.exec(text(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{ARCHIVE_TABLE}_company_date "
+        f"ON {ARCHIVE_TABLE} (company_id, record_date)"
+    ))
+
+
+def ensure_partition(db: Session, year: int) -> None:
+    name = partition_name(year)
+    if _is_postgres(db):
+        _ensure_archive(db)
+        db.exec(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {ARCHIVE_TABLE} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+    else:
+        # Archived rows are immutable, so no FKs; ids are copied from the hot table
+        partition = Table(
+            name,
+            MetaData(),
+            *[Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False)
+              for c in FinancialData.__table__.columns],
+        )
+        Index(f"uq_{name}_company_date", partition.c.company_id, partition.c.record_date, unique=True)
+        Index(f"ix_{name}_symbol", partition.c.symbol)
+        partition.create(db.connection(), checkfirst=True)
+    db.commit()
+
+
+def sync_history_view(db: Session) -> None:
+    """(Re)create the financial_data_all view over the current partitions."""
+    columns = ", ".join(COLUMNS)
+    if _is_postgres(db):
+        _ensure_archive(db)
+        sources = [HOT_TABLE, ARCHIVE_TABLE]
+        db.exec(text(
+            f"CREATE OR REPLACE VIEW {HISTORY_VIEW} AS "
+            + " UNION ALL ".join(f"SELECT {columns} FROM {s}" for s in sources)
+        ))
+    else:
+        sources = [HOT_TABLE] + [partition_name(y) for y in list_partitions(db)]
+        db.exec(text(f"DROP VIEW IF EXISTS {HISTORY_VIEW}"))
+        db.exec(text(
+            f"CREATE VIEW {HISTORY_VIEW} AS "
+            + " UNION ALL ".join(f"SELECT {columns} FROM {s}" for s in sources)
+        ))
+    db.commit()
+
+
+def _legacy_ranking_fk(db: Session) -> bool:
+    """Whether ranking_rows still has the old FK into financial_data (SQLite)."""
+    if _is_postgres(db):
+        return False
+    rows = db.exec(text("PRAGMA foreign_key_list(ranking_rows)")).all()
+    return any(r[2] == HOT_TABLE for r in rows)
+
+
+def _reuses_ids(db: Session) -> bool:
+    """Whether the hot table was created without AUTOINCREMENT (older SQLite files)."""
+    if _is_postgres(db):
+        return False
+    sql = db.exec(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), params={"name": HOT_TABLE}).one()[0]
+    return "AUTOINCREMENT" not in sql.upper()
+
+
+def _rotate_date(db: Session, record_date: datetime.date, pinned_id: Optional[int]) -> int:
+    target = ARCHIVE_TABLE if _is_postgres(db) else partition_name(record_date.year)
+    columns = ", ".join(COLUMNS)
+    params = {"d": record_date, "pinned": pinned_id if pinned_id is not None else -1}
+    rows = f"FROM {HOT_TABLE} WHERE record_date = :d AND id != :pinned"
+
+    # Re-imported dates replace whatever was archived for the same companies
+    db.exec(text(
+        f"DELETE FROM {target} WHERE record_date = :d AND company_id IN (SELECT company_id {rows})"
+    ), params=params)
+    moved = db.exec(text(
+        f"INSERT INTO {target} ({columns}) SELECT {columns} {rows}"
+    ), params=params).rowcount
+    db.exec(text(f"DELETE {rows}"), params=params)
+    db.commit()
+    return moved
+
+
+def rotate_partitions(db: Session, hot_days: Optional[int] = None) -> dict:
+    """Move record dates older than the hot window into yearly partitions.
+
+    One transaction per record date. Returns stats dict.
+    """
+    if not settings.partitioning:
+        # Readers would no longer see rotated rows
+        raise RuntimeError("Partitioning is disabled (set PARTITIONING=true)")
+    hot_days = settings.partition_hot_days if hot_days is None else hot_days
+    if hot_days < 1:
+        raise ValueError("hot_days must be at least 1")
+
+    stats = {"dates": 0, "rows": 0, "partitions": []}
+    latest = db.exec(select(func.max(FinancialData.record_date))).first()
+    if latest is None:
+        sync_history_view(db)
+        return stats
+
+    cutoff = latest - datetime.timedelta(days=hot_days)
+    dates = db.exec(
+        select(FinancialData.record_date)
+        .where(FinancialData.record_date < cutoff)
+        .group_by(FinancialData.record_date)
+        .order_by(FinancialData.record_date)
+    ).all()
+
+    for year in sorted({d.year for d in dates}):
+        ensure_partition(db, year)
+    sync_history_view(db)
+
+    # Archived rows may still be referenced by old ranking generations; databases
+    # created before partitioning declared that FK, so relax it for the move
+    relax_fk = bool(dates) and _legacy_ranking_fk(db)
+    # Without AUTOINCREMENT SQLite hands out max(id) + 1, so the highest-id row
+    # stays hot until a newer one exists; otherwise archived ids could be reused
+    pinned_id = None
+    if dates and _reuses_ids(db):
+        pinned_id = db.exec(select(func.max(FinancialData.id))).one()
+    if relax_fk:
+        db.commit()
+        db.exec(text("PRAGMA foreign_keys=OFF"))
+    try:
+        for record_date in dates:
+            stats["rows"] += _rotate_date(db, record_date, pinned_id)
+            stats["dates"] += 1
+    finally:
+        if relax_fk:
+            db.commit()
+            db.exec(text("PRAGMA foreign_keys=ON"))
+
+    stats["partitions"] = list_partitions(db)
+    if dates:
+        logger.info(f"Rotated {stats['rows']} rows over {stats['dates']} dates (cutoff {cutoff})")
+    return stats
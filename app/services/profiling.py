@@ -0,0 +1,161 @@
+"""
+On-demand profiling.
+
+Requests: when ``PROFILING_TOKEN`` is set, a request carrying the same value
+in an ``X-Profile-Token`` header is profiled by a stack sampler. The sampler
+walks every thread's stack every ``PROFILE_INTERVAL_MS``, so sync endpoints
+running in the threadpool are covered as well as the event loop. Idle threads
+(blocked in selectors/queue/threading waits) are skipped. Samples are stored as
+folded stacks in ``PROFILE_DIR``. This is the input format of flamegraph.pl and
+speedscope. The file name is returned in the ``X-Profile-Artifact`` header and
+can be downloaded from ``/api/debug/profiles/{name}`` with the same token.
+Names carry the worker pid and a per-process counter, so concurrent profiled
+requests get separate files. Concurrent requests show up in the same samples,
+though, so profile a quiet instance.
+
+CLI: ``python -m app.cli compute-rankings --profile out.prof`` runs the job
+under cProfile and writes a pstats file (``python -m pstats out.prof``).
+"""
+
+import cProfile
+import hmac
+import itertools
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import anyio
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = b"x-profile-token"
+ARTIFACT_HEADER = b"x-profile-artifact"
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+_artifact_counter = itertools.count(1)
+
+
+def token_matches(candidate: Optional[str]) -> bool:
+    """Constant-time check of a profiling token; always False when profiling is off."""
+    if not settings.profiling_token or not candidate:
+        return False
+    return hmac.compare_digest(candidate.encode(), settings.profiling_token.encode())
+
+
+class StackSampler:
+    """Samples the stacks of all other threads into folded-stack counts."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = (settings.profile_interval_ms / 1000) if interval is None else interval
+        self.samples: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stopped.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _artifact_name(method: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    sequence = next(_artifact_counter)
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{sequence}-{method.lower()}-{slug[:80]}.folded"
+
+
+def artifact_path(name: str) -> Optional[Path]:
+    """Resolve a stored artifact by name, refusing anything outside PROFILE_DIR."""
+    root = Path(settings.profile_dir).resolve()
+    path = (root / name).resolve()
+    if path.parent != root or not path.is_file():
+        return None
+    return path
+
+
+def _finish(sampler: StackSampler, path: Path) -> int:
+    """Stop the sampler and write its folded stacks; returns the sample count."""
+    sampler.stop()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(sampler.folded())
+    return sum(sampler.samples.values())
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that carry a valid ``X-Profile-Token``."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.profiling_token:
+            await self.app(scope, receive, send)
+            return
+
+        token = dict(scope["headers"]).get(TOKEN_HEADER)
+        if not token_matches(token.decode("latin-1") if token else None):
+            await self.app(scope, receive, send)
+            return
+
+        name = _artifact_name(scope["method"], scope["path"])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(ARTIFACT_HEADER, name.encode())]
+            await send(message)
+
+        sampler = StackSampler().start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Joining the sampler thread and writing the file would block the event loop
+            path = Path(settings.profile_dir) / name
+            samples = await anyio.to_thread.run_sync(_finish, sampler, path)
+            logger.info(f"Profiled {scope['method']} {scope['path']} in {elapsed:.3f}s: {samples} samples -> {path}")
+
+
+@contextmanager
+def cprofile(path: Optional[str]) -> Iterator[None]:
+    """Run the block under cProfile and dump pstats to ``path`` (no-op when None)."""
+    if not path:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(path)
+        logger.info(f"Profile written to {path} (inspect with: python -m pstats {path})")
@@ -0,0 +1,180 @@
+"""
+SQL statement instrumentation.
+
+Cursor-execute hooks on every engine time each statement and record it in:
+
+- the ``QueryStats`` of the current unit of work (a request, a CLI command, a
+  test), tracked through a context variable set by ``track_queries()``;
+- process-wide totals per statement, surfaced by ``query_totals()``.
+
+``QueryStats.repeated()`` is the N+1 detector: it lists identical statements
+(same SQL text, any parameters) executed at least ``threshold`` times within
+the unit of work, e.g. one ``SELECT ... WHERE symbol = ?`` per symbol.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneDetected(AssertionError):
+    """Raised by ``track_queries(fail_on_repeats=True)``."""
+
+
+class QueryStats:
+    """Statements executed within one unit of work."""
+
+    def __init__(self, slow_limit: Optional[int] = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+        self.slow_limit = settings.sql_slow_statements if slow_limit is None else slow_limit
+        self._slowest: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.statements[statement] += 1
+            entry = (seconds, statement)
+            if len(self._slowest) < self.slow_limit:
+                heapq.heappush(self._slowest, entry)
+            elif self._slowest and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self) -> list[tuple[float, str]]:
+        """Up to ``slow_limit`` (seconds, statement) pairs, slowest first."""
+        return sorted(self._slowest, reverse=True)
+
+    def repeated(self, threshold: Optional[int] = None) -> dict[str, int]:
+        """Statements executed at least ``threshold`` times (N+1 candidates)."""
+        threshold = settings.sql_n_plus_one_threshold if threshold is None else threshold
+        return {s: n for s, n in self.statements.items() if n >= threshold}
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.count,
+            "db_seconds": round(self.seconds, 6),
+            "slowest": [{"seconds": round(s, 6), "statement": sql} for s, sql in self.slowest],
+            "repeated": self.repeated(),
+        }
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(
+    fail_on_repeats: bool = False, threshold: Optional[int] = None
+) -> Iterator[QueryStats]:
+    """Collect the statements executed inside the block.
+
+    With ``fail_on_repeats`` an N+1 pattern raises ``NPlusOneDetected`` on exit.
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+    repeated = stats.repeated(threshold)
+    if fail_on_repeats and repeated:
+        lines = "\n".join(f"  {n}x {sql}" for sql, n in repeated.items())
+        raise NPlusOneDetected(f"Repeated statements:\n{lines}")
+
+
+def log_repeats(stats: QueryStats, label: str) -> None:
+    """Warn about N+1 candidates of a finished unit of work."""
+    for sql, n in stats.repeated().items():
+        logger.warning(f"Possible N+1 in {label}: {n}x {' '.join(sql.split())[:200]}")
+
+
+# -- Process-wide totals ---------------------------------------------------------
+
+# Distinct statements tracked individually; the rest are pooled under OTHER
+MAX_STATEMENTS = 1000
+OTHER = "<other>"
+
+_totals_lock = threading.Lock()
+_totals: dict[str, list] = {}  # statement -> [count, seconds, max_seconds]
+
+
+def _record_total(statement: str, seconds: float) -> None:
+    with _totals_lock:
+        if statement not in _totals and len(_totals) >= MAX_STATEMENTS:
+            statement = OTHER
+        entry = _totals.get(statement)
+        if entry is None:
+            _totals[statement] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+
+def query_totals(limit: int = 20) -> dict:
+    """Process-wide statement totals, heaviest (by total time) first."""
+    with _totals_lock:
+        items = [(sql, list(v)) for sql, v in _totals.items()]
+    items.sort(key=lambda item: item[1][1], reverse=True)
+    return {
+        "queries": sum(v[0] for _, v in items),
+        "db_seconds": round(sum(v[1] for _, v in items), 6),
+        "statements": [
+            {
+                "statement": sql,
+                "count": count,
+                "seconds": round(seconds, 6),
+                "max_seconds": round(max_seconds, 6),
+            }
+            for sql, (count, seconds, max_seconds) in items[:limit]
+        ],
+    }
+
+
+def reset_totals() -> None:
+    with _totals_lock:
+        _totals.clear()
+
+
+# -- Engine hooks ----------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    _record_total(statement, seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+
+
+def instrument(engine) -> None:
+    """Attach the timing hooks to a (sync) engine; idempotent."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
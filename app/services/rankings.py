@@ -4,10 +4,11 @@ Stock ranking strategies ported from v1/calc_financials.py and v1/alg.py.
 Each strategy returns a ranked list of companies based on financial metrics.
 """
 
-from sqlmodel import Session, select, col
+from sqlmodel import Session, select, col, or_
 
 from app.models.company import Company
 from app.models.financial_data import FinancialData
+from app.models.ranking import RankingRow, RankingState
 
 EXCLUDED_SECTORS = {"Finance", "Energy", "Miscellaneous"}
 
@@ -67,17 +68,56 @@ class RankingResult:
         self.return_on_assets = return_on_assets
 
 
-def get_rankings(db: Session, strategy: str, limit: int = 100) -> list[dict]:
-    """Get ranked companies for a given strategy."""
+RANK_COLUMNS = tuple(f"rank_{s}" for s in STRATEGIES)
+
+
+def current_generation_id():
+    """Scalar subquery for the published ranking generation."""
+    return (
+        select(RankingState.generation_id)
+        .where(RankingState.id == 1)
+        .scalar_subquery()
+    )
+
+
+def _ranking_columns(strategy: str, financials=FinancialData):
+    """Return the (rank, score) columns backing a strategy, or None if unknown.
+
+    ``financials`` is the FinancialData entity (or history alias) scores are read from.
+    """
     rank_col = f"rank_{strategy}"
 
-    if not hasattr(FinancialData, rank_col):
-        return []
+    if not hasattr(RankingRow, rank_col):
+        return None
 
-    rank_attr = getattr(FinancialData, rank_col)
-    score_attr = getattr(FinancialData, strategy, FinancialData.ebitda)
+    rank_attr = getattr(RankingRow, rank_col)
+    score_attr = getattr(RankingRow, strategy, None)
+    if score_attr is None:
+        score_attr = getattr(financials, strategy, financials.ebitda)
+    return rank_attr, score_attr
 
-    statement = (
+
+def _row_to_dict(r, rank, score) -> dict:
+    return {
+        "symbol": r.symbol,
+        "name": r.name,
+        "rank": rank,
+        "score": score,
+        "pe_ratio_ttm": r.pe_ratio_ttm,
+        "pe_ratio_ftm": r.pe_ratio_ftm,
+        "garp_ratio": r.garp_ratio,
+        "peg_ratio": r.peg_ratio,
+        "return_on_assets": r.return_on_assets,
+    }
+
+
+def _rankings_statement(strategy: str, limit: int):
+    columns = _ranking_columns(strategy)
+    if columns is None:
+        return None
+    rank_attr, score_attr = columns
+
+    return (
         select(
             Company.symbol,
             Company.name,
@@ -89,25 +129,87 @@ def get_rankings(db: Session, strategy: str, limit: int = 100) -> list[dict]:
             FinancialData.peg_ratio,
             FinancialData.return_on_assets,
         )
-        .join(FinancialData, Company.id == FinancialData.company_id)
-        .where(rank_attr.isnot(None), rank_attr > 0)
+        .join(RankingRow, Company.id == RankingRow.company_id)
+        .join(FinancialData, RankingRow.financial_data_id == FinancialData.id)
+        .where(
+            RankingRow.generation_id == current_generation_id(),
+            rank_attr.isnot(None),
+            rank_attr > 0,
+        )
         .order_by(rank_attr.asc())
         .limit(limit)
     )
 
+
+def get_rankings(db: Session, strategy: str, limit: int = 100) -> list[dict]:
+    """Get ranked companies for a given strategy."""
+    statement = _rankings_statement(strategy, limit)
+    if statement is None:
+        return []
+
     rows = db.exec(statement).all()
 
-    return [
-        {
-            "symbol": r.symbol,
-            "name": r.name,
-            "rank": r.rank,
-            "score": r.score,
-            "pe_ratio_ttm": r.pe_ratio_ttm,
-            "pe_ratio_ftm": r.pe_ratio_ftm,
-            "garp_ratio": r.garp_ratio,
-            "peg_ratio": r.peg_ratio,
-            "return_on_assets": r.return_on_assets,
-        }
-        for r in rows
+    return [_row_to_dict(r, r.rank, r.score) for r in rows]
+
+
+def _rankings_multi_statement(known: dict, limit: int):
+    rank_attrs = {s: cols[0] for s, cols in known.items()}
+    score_attrs = {s: cols[1] for s, cols in known.items()}
+
+    columns = [
+        Company.symbol,
+        Company.name,
+        FinancialData.pe_ratio_ttm,
+        FinancialData.pe_ratio_ftm,
+        FinancialData.garp_ratio,
+        FinancialData.peg_ratio,
+        FinancialData.return_on_assets,
     ]
+    for s in known:
+        columns.append(rank_attrs[s].label(f"rank__{s}"))
+        columns.append(score_attrs[s].label(f"score__{s}"))
+
+    return (
+        select(*columns)
+        .join(RankingRow, Company.id == RankingRow.company_id)
+        .join(FinancialData, RankingRow.financial_data_id == FinancialData.id)
+        .where(
+            RankingRow.generation_id == current_generation_id(),
+            or_(*[
+                (rank_attr > 0) & (rank_attr <= limit)
+                for rank_attr in rank_attrs.values()
+            ]),
+        )
+    )
+
+
+def _split_multi(rows, result: dict, known: dict, limit: int) -> dict[str, list[dict]]:
+    for s in known:
+        rank_key, score_key = f"rank__{s}", f"score__{s}"
+        entries = [
+            (getattr(r, rank_key), r, getattr(r, score_key))
+            for r in rows
+            if getattr(r, rank_key) is not None and 0 < getattr(r, rank_key) <= limit
+        ]
+        entries.sort(key=lambda e: e[0])
+        result[s] = [_row_to_dict(r, rank, score) for rank, r, score in entries[:limit]]
+
+    return result
+
+
+def get_rankings_multi(db: Session, strategies: list[str], limit: int = 100) -> dict[str, list[dict]]:
+    """Get ranked companies for several strategies in a single query.
+
+    Selects every row that sits inside the top ``limit`` of at least one of the
+    requested strategies, then splits them per strategy in Python. Unknown
+    strategies map to an empty list, mirroring ``get_rankings``.
+    """
+    result: dict[str, list[dict]] = {s: [] for s in strategies}
+    known = {s: cols for s in strategies if (cols := _ranking_columns(s)) is not None}
+    if not known:
+        return result
+
+    rows = db.exec(_rankings_multi_statement(known, limit)).all()
+
+    return _split_multi(rows, result, known, limit)
+
@@ -0,0 +1,208 @@
+"""
+Tiered refresh: cheap price updates often, fundamentals on a slower cadence.
+
+Price fields (ask, market cap, 52-week change) move all day; fundamentals
+(EBITDA, net income, total assets, book value, estimates) change quarterly.
+``refresh`` fetches the full ``info`` only for companies whose fundamentals
+are due -- never fetched, older than ``FUNDAMENTALS_MAX_AGE_DAYS``, or with
+an earnings date that passed since the last fetch -- and moves every other
+company to today's price from bulk quotes (``fetch_quotes``, about 100
+symbols per request).
+
+Price-derived ratios are recomputed locally from the new price and the stored
+fundamentals, as v1's ``calc_pe_ratio_ftm`` did:
+
+- forward P/E = price / next-year EPS estimate,
+- trailing P/E, PEG and market cap scale with the price (trailing EPS,
+  growth and share count are unchanged between fundamentals fetches), and
+  dividend yield inversely; GARP (P/E over PEG) doesn't depend on price,
+- % above the 52-week low / below the high use the quote's range, or the
+  stored range widened to include the new price.
+"""
+
+import datetime
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+from app.services.data_import import SEED_SYMBOLS, fetch_and_store, percent_change
+from app.services.data_sources import DataSource, fetch_quotes, get_source
+from app.services.metrics import record_job
+from app.services.snapshot import invalidate_snapshot
+from app.services.tracing import current_span, traced
+from app.services.write_scheduler import WriteScheduler
+
+logger = logging.getLogger(__name__)
+
+# Columns proportional to the price while fundamentals are unchanged
+PRICE_SCALED_COLUMNS = ("market_cap", "pe_ratio_ttm", "peg_ratio")
+
+# Not carried over to a new day's row: ranks are recomputed by compute_rankings
+_NOT_COPIED = {"id", "record_date"} | {
+    name for name in FinancialData.__table__.columns.keys() if name.startswith("rank_")
+}
+
+
+def fundamentals_due(
+    fetched_at: Optional[datetime.datetime],
+    next_earnings: Optional[datetime.date],
+    today: datetime.date,
+    max_age_days: int,
+) -> bool:
+    """Whether a company's full info should be refetched."""
+    if fetched_at is None:
+        return True
+    fetched = fetched_at.date()
+    if (today - fetched).days >= max_age_days:
+        return True
+    # Results are out by the day after the earnings date
+    return next_earnings is not None and fetched <= next_earnings < today
+
+
+def _year_range_change(price: float, previous: FinancialData, quote: dict, key: str, column: str, pick):
+    reference = quote.get(key)
+    if reference is None:
+        # Recover the stored extreme from its percent change, then include today's price
+        old = getattr(previous, column)
+        if old is None or not previous.ask or old <= -100:
+            return None
+        reference = pick(previous.ask / (1 + old / 100), price)
+    return percent_change(price, reference)
+
+
+def reprice(previous: FinancialData, quote: dict) -> dict:
+    """Price-dependent columns of ``previous`` at the quote's price."""
+    price = quote.get("currentPrice") or quote.get("regularMarketPrice")
+    ratio = price / previous.ask if previous.ask else None
+
+    values = {"ask": price}
+    for column in PRICE_SCALED_COLUMNS:
+        value = getattr(previous, column)
+        values[column] = value * ratio if value is not None and ratio else value
+    if quote.get("marketCap") is not None:
+        values["market_cap"] = quote["marketCap"]
+
+    eps_next_year = previous.eps_estimate_next_year
+    if eps_next_year:
+        values["pe_ratio_ftm"] = price / eps_next_year
+    elif previous.pe_ratio_ftm is not None and ratio:
+        values["pe_ratio_ftm"] = previous.pe_ratio_ftm * ratio
+
+    if previous.dividend_yield is not None and ratio:
+        values["dividend_yield"] = round(previous.dividend_yield / ratio, 2)
+
+    values["change_year_low_per"] = _year_range_change(
+        price, previous, quote, "fiftyTwoWeekLow", "change_year_low_per", min)
+    values["change_year_high_per"] = _year_range_change(
+        price, previous, quote, "fiftyTwoWeekHigh", "change_year_high_per", max)
+    return values
+
+
+def _latest_rows(db: Session, symbols: list[str], today: datetime.date) -> dict[str, FinancialData]:
+    """Most recent financial_data row up to ``today`` for each symbol."""
+    latest = (
+        select(FinancialData.company_id, func.max(FinancialData.record_date).label("record_date"))
+        .where(FinancialData.symbol.in_(symbols), FinancialData.record_date <= today)
+        .group_by(FinancialData.company_id)
+        .subquery()
+    )
+    rows = db.exec(
+        select(FinancialData).join(
+            latest,
+            (FinancialData.company_id == latest.c.company_id)
+            & (FinancialData.record_date == latest.c.record_date),
+        )
+    ).all()
+    return {row.symbol: row for row in rows}
+
+
+@traced("refresh")
+def refresh(
+    db: Session,
+    symbols: Optional[list[str]] = None,
+    source: Optional[DataSource] = None,
+    max_age_days: Optional[int] = None,
+) -> dict:
+    """Refresh prices of every company and fundamentals of those due.
+
+    ``symbols`` defaults to every company in the database (``SEED_SYMBOLS``
+    when it is empty). Symbols without a stored row get a full fetch. Returns
+    a summary dict with counts for both tiers.
+    """
+    max_age_days = settings.fundamentals_max_age_days if max_age_days is None else max_age_days
+    owns_source = source is None
+    if owns_source:
+        source = get_source()
+
+    try:
+        today = datetime.date.today()
+        companies = {
+            symbol: (fetched_at, next_earnings)
+            for symbol, fetched_at, next_earnings in db.exec(
+                select(Company.symbol, Company.fundamentals_fetched_at, Company.next_earnings_date)
+            )
+        }
+        if symbols is None:
+            symbols = sorted(companies) or SEED_SYMBOLS
+        symbols = list(dict.fromkeys(symbols))
+
+        due = [s for s in symbols if s not in companies or fundamentals_due(*companies[s], today, max_age_days)]
+        due_set = set(due)
+        price_symbols = [s for s in symbols if s not in due_set]
+        logger.info(f"Refreshing {len(symbols)} symbols: {len(price_symbols)} prices, {len(due)} fundamentals")
+
+        stats = {"total": len(symbols), "prices": {"updated": 0, "failed": 0, "skipped": 0}}
+        start = time.perf_counter()
+        writer = WriteScheduler(db, name="refresh")
+
+        # No write transaction is open while quotes are fetched (see WriteScheduler.batches)
+        for chunk in writer.batches(fetch_quotes(source, price_symbols)):
+            previous_rows = _latest_rows(db, [symbol for symbol, _, _ in chunk], today)
+            for symbol, quote, error in chunk:
+                if error is not None:
+                    logger.error(f"  Error fetching quote for {symbol}: {error}")
+                    stats["prices"]["failed"] += 1
+                    continue
+                previous = previous_rows.get(symbol)
+                if previous is None:
+                    # Nothing to carry forward: needs the full info
+                    due.append(symbol)
+                    continue
+                if not quote or (quote.get("currentPrice") or quote.get("regularMarketPrice")) is None:
+                    logger.warning(f"  No quote for {symbol}, skipping")
+                    stats["prices"]["skipped"] += 1
+                    continue
+
+                if previous.record_date == today:
+                    fd = previous
+                else:
+                    fd = FinancialData(**previous.model_dump(exclude=_NOT_COPIED), record_date=today)
+                for column, value in reprice(previous, quote).items():
+                    setattr(fd, column, value)
+                writer.add(fd)
+                stats["prices"]["updated"] += 1
+
+        writer.checkpoint()
+        stats["writes"] = writer.metrics()
+        invalidate_snapshot()
+
+        stats["fundamentals"] = fetch_and_store(db, due, source) if due else {"total": 0}
+        stats["source"] = source.metrics()
+    finally:
+        if owns_source:
+            source.close()
+
+    record_job("refresh", time.perf_counter() - start, stats["prices"]["updated"])
+    current_span().set_attributes({
+        "stocker.symbols": stats["total"],
+        "stocker.prices_updated": stats["prices"]["updated"],
+        "stocker.fundamentals_fetched": stats["fundamentals"].get("succeeded", 0),
+        "stocker.record_date": today.isoformat(),
+    })
+    return stats
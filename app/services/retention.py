@@ -0,0 +1,175 @@
+"""
+Retention policy and compaction for daily financial_data snapshots.
+
+Record dates are thinned out with age:
+
+- newer than ``daily_days``: every date is kept,
+- newer than ``weekly_days``: the last record date of each ISO week is kept,
+- older: the last record date of each month is kept.
+
+Rows for dropped dates are first archived as Parquet (same layout as
+``python -m app.cli export``, so they can be re-imported with
+``import-snapshot`` or queried by the DuckDB analytics path), then deleted in
+small batches together with any ranking rows that reference them. Afterwards
+the freed pages are reclaimed incrementally and statistics refreshed.
+"""
+
+import datetime
+import logging
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import delete, text
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.models.financial_data import FinancialData
+from app.models.ranking import RankingGeneration, RankingRow, RankingState
+from app.services.partitions import financial_history, partition_table
+from app.services.snapshot import invalidate_snapshot
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 5_000
+
+
+def dates_to_drop(
+    dates: list[datetime.date],
+    today: datetime.date,
+    daily_days: int,
+    weekly_days: int,
+) -> list[datetime.date]:
+    """Apply the retention policy to a list of record dates."""
+    keep = set()
+    last_of_week: dict[tuple, datetime.date] = {}
+    last_of_month: dict[tuple, datetime.date] = {}
+
+    for d in dates:
+        age = (today - d).days
+        if age < daily_days:
+            keep.add(d)
+        elif age < weekly_days:
+            key = d.isocalendar()[:2]
+            last_of_week[key] = max(d, last_of_week.get(key, d))
+        else:
+            key = (d.year, d.month)
+            last_of_month[key] = max(d, last_of_month.get(key, d))
+
+    keep.update(last_of_week.values())
+    keep.update(last_of_month.values())
+    return sorted(d for d in dates if d not in keep)
+
+
+def _delete_rows(db: Session, financials, record_date: datetime.date, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        ids = db.exec(
+            select(financials.c.id)
+            .where(financials.c.record_date == record_date)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.exec(delete(RankingRow.__table__).where(RankingRow.financial_data_id.in_(ids)))
+        db.exec(delete(financials).where(financials.c.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+    return deleted
+
+
+def _delete_date(db: Session, record_date: datetime.date, batch_size: int) -> int:
+    """Delete one record date's rows (and their ranking rows) in batches."""
+    deleted = _delete_rows(db, FinancialData.__table__, record_date, batch_size)
+    if settings.partitioning:
+        archived = partition_table(db, record_date)
+        if archived is not None:
+            deleted += _delete_rows(db, archived, record_date, batch_size)
+
+    current = db.exec(select(RankingState.generation_id).where(RankingState.id == 1)).first()
+    statement = delete(RankingGeneration.__table__).where(RankingGeneration.record_date == record_date)
+    if current is not None:
+        statement = statement.where(RankingGeneration.id != current)
+    db.exec(statement)
+    db.commit()
+    return deleted
+
+
+def reclaim_space(db: Session, max_pages: int = 10_000, full_vacuum: bool = False) -> dict:
+    """Return freed pages to the filesystem and refresh planner statistics."""
+    stats = {"vacuum": None}
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        db.commit()
+        auto_vacuum = db.exec(text("PRAGMA auto_vacuum")).one()[0]
+        if full_vacuum:
+            db.exec(text("VACUUM"))
+            stats["vacuum"] = "full"
+        elif auto_vacuum == 2:  # INCREMENTAL
+            # pysqlite steps a row-less PRAGMA only once (one page); executescript
+            # runs it to completion
+            raw = db.connection().connection.driver_connection
+            raw.executescript(f"PRAGMA incremental_vacuum({int(max_pages)});")
+            stats["vacuum"] = "incremental"
+        else:
+            logger.warning(
+                "auto_vacuum is not INCREMENTAL for this database; freed pages are "
+                "reused but not released. Run with --full-vacuum once to switch."
+            )
+        stats["freelist_pages"] = db.exec(text("PRAGMA freelist_count")).one()[0]
+        db.exec(text("PRAGMA optimize"))
+    else:
+        # Postgres autovacuum reclaims dead tuples; just refresh statistics
+        db.exec(text("ANALYZE financial_data"))
+        db.exec(text("ANALYZE ranking_rows"))
+    db.commit()
+    return stats
+
+
+def compact(
+    db: Session,
+    daily_days: Optional[int] = None,
+    weekly_days: Optional[int] = None,
+    archive_dir: Optional[str | Path] = None,
+    archive: bool = True,
+    batch_size: int = DELETE_BATCH_SIZE,
+    dry_run: bool = False,
+    full_vacuum: bool = False,
+) -> dict:
+    """Apply the retention policy. Returns stats dict."""
+    daily_days = settings.retention_daily_days if daily_days is None else daily_days
+    weekly_days = settings.retention_weekly_days if weekly_days is None else weekly_days
+    archive_dir = Path(archive_dir or settings.retention_archive_dir)
+
+    financials = financial_history()
+    dates = [
+        d for d in db.exec(
+            select(financials.record_date)
+            .where(financials.record_date.isnot(None))
+            .group_by(financials.record_date)
+        ).all()
+    ]
+    stats = {"dates": len(dates), "dropped_dates": 0, "archived_rows": 0, "deleted_rows": 0}
+    if not dates:
+        return stats
+
+    # Same source as the dates: the hot table may be empty while partitions aren't
+    drop = dates_to_drop(dates, max(dates), daily_days, weekly_days)
+    stats["dropped_dates"] = len(drop)
+    if dry_run or not drop:
+        stats["drop"] = [d.isoformat() for d in drop]
+        return stats
+
+    if archive:
+        from app.services.snapshot_io import export_snapshot
+
+    for record_date in drop:
+        if archive:
+            exported = export_snapshot(db, archive_dir, fmt="parquet", start=record_date, end=record_date)
+            stats["archived_rows"] += exported["rows"]
+        stats["deleted_rows"] += _delete_date(db, record_date, batch_size)
+        logger.info(f"Compacted {record_date}")
+
+    stats.update(reclaim_space(db, full_vacuum=full_vacuum))
+    invalidate_snapshot()
+    return stats
@@ -13,6 +13,7 @@ from sqlmodel import Session, select
 
 from app.models.company import Company
 from app.models.financial_data import FinancialData
+from app.services.write_scheduler import WriteScheduler
 
 # Approximate financial data for major US stocks (as of early 2026)
 # Format: (symbol, name, sector, industry, ask, market_cap, ebitda,
@@ -126,6 +127,7 @@ def seed_database(db: Session) -> dict:
     """
     today = datetime.date.today()
     stats = {"companies": 0, "financials": 0}
+    writer = WriteScheduler(db, name="seed_database")
 
     for row in SEED_COMPANIES:
         (symbol, name, sector, industry, ask, market_cap, ebitda,
@@ -136,8 +138,7 @@ def seed_database(db: Session) -> dict:
         if not company:
             company = Company(symbol=symbol, name=name, sector=sector, industry=industry)
             db.add(company)
-            db.commit()
-            db.refresh(company)
+            db.flush()
             stats["companies"] += 1
 
         # Check for existing financial data today
@@ -165,9 +166,10 @@ def seed_database(db: Session) -> dict:
         if fd.pe_ratio_ttm and fd.peg_ratio and fd.peg_ratio > 0:
             fd.garp_ratio = round(fd.pe_ratio_ttm / fd.peg_ratio, 2)
 
-        db.add(fd)
+        writer.add(fd)
         if not existing:
             stats["financials"] += 1
 
-    db.commit()
+    writer.checkpoint()
+    stats["writes"] = writer.metrics()
     return stats
@@ -0,0 +1,258 @@
+"""
+In-memory snapshot of the latest financial data and rankings.
+
+The snapshot holds one row per company in the published ranking generation
+(see ``app.models.ranking``) together with a symbol -> row offset index, so
+per-symbol lookups (e.g. the company profile endpoint) are O(1) dict hits
+instead of scans over the ranking lists.
+
+Snapshots are rebuilt lazily: ``invalidate_snapshot()`` is called after imports
+and ranking runs in this process. Cache hits don't query the database, so when
+another process (the CLI) publishes a generation, readers keep getting the
+previous one -- including the cached ``rankings_json`` bytes -- for up to
+``settings.snapshot_ttl_seconds``. The ranking and profile endpoints document
+that bound.
+"""
+
+import asyncio
+import datetime
+import threading
+import time
+from typing import Optional
+
+import orjson
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+from app.models.ranking import RankingGeneration, RankingRow
+from app.services.metrics import SNAPSHOT_BUILD, SNAPSHOT_READS
+from app.services.rankings import RANK_COLUMNS, STRATEGIES, current_generation_id
+from app.services.tracing import current_span, span
+
+# FinancialData columns exposed as metrics (everything except keys and the
+# legacy rank/score columns, which come from the ranking generation instead)
+SCORE_COLUMNS = ("magic_formula_trailing", "magic_formula_future")
+FINANCIAL_METRIC_COLUMNS = tuple(
+    name for name in FinancialData.__table__.columns.keys()
+    if name not in {"id", "company_id", "symbol", "record_date", *SCORE_COLUMNS}
+    and not name.startswith("rank_")
+)
+METRIC_COLUMNS = FINANCIAL_METRIC_COLUMNS + SCORE_COLUMNS
+COMPANY_COLUMNS = ("symbol", "name", "sector", "industry")
+COLUMNS = COMPANY_COLUMNS + METRIC_COLUMNS + RANK_COLUMNS
+
+# Metric fields included in each ranking entry (see RankingEntry)
+RANKING_FIELDS = ("pe_ratio_ttm", "pe_ratio_ftm", "garp_ratio", "peg_ratio", "return_on_assets")
+
+
+class Snapshot:
+    """Immutable view of the latest record date, indexed by symbol."""
+
+    def __init__(
+        self,
+        record_date: Optional[datetime.date],
+        rows: list[tuple],
+        generation_id: Optional[int] = None,
+        published_at: Optional[datetime.datetime] = None,
+    ):
+        self.record_date = record_date
+        self.rows = rows
+        self.generation_id = generation_id
+        self.published_at = published_at
+        self.built_at = time.monotonic()
+        self.offsets = {name: i for i, name in enumerate(COLUMNS)}
+        self.index = {row[0]: i for i, row in enumerate(rows)}
+        self.universe = {
+            strategy: sum(1 for row in rows if (row[self.offsets[f"rank_{strategy}"]] or 0) > 0)
+            for strategy in STRATEGIES
+        }
+        self._ranked: dict[str, list[int]] = {}
+        # Per strategy: each ranked entry encoded once, best first
+        self._encoded: dict[str, list[bytes]] = {}
+
+    def annotate(self, target) -> None:
+        """Record the freshness of this snapshot on a span."""
+        if self.generation_id is None:
+            return
+        attributes = {
+            "stocker.generation_id": self.generation_id,
+            "stocker.record_date": self.record_date.isoformat(),
+            "stocker.snapshot_age_seconds": round(time.monotonic() - self.built_at, 3),
+        }
+        if self.published_at is not None:
+            # published_at is naive UTC (see RankingGeneration)
+            age = datetime.datetime.utcnow() - self.published_at
+            attributes["stocker.publish_to_serve_seconds"] = round(age.total_seconds(), 3)
+        target.set_attributes(attributes)
+
+    def ranked_offsets(self, strategy: str) -> list[int]:
+        """Row offsets of ranked companies for a strategy, best first."""
+        offsets = self._ranked.get(strategy)
+        if offsets is None:
+            rank_i = self.offsets[f"rank_{strategy}"]
+            offsets = sorted(
+                (i for i, row in enumerate(self.rows) if (row[rank_i] or 0) > 0),
+                key=lambda i: self.rows[i][rank_i],
+            )
+            self._ranked[strategy] = offsets
+        return offsets
+
+    def rankings(self, strategy: str, limit: int = 100) -> list[dict]:
+        """Ranking entries for a strategy, shaped like ``get_rankings`` output."""
+        o = self.offsets
+        rank_i, score_i = o[f"rank_{strategy}"], o[strategy]
+        field_offsets = [(name, o[name]) for name in RANKING_FIELDS]
+        entries = []
+        for i in self.ranked_offsets(strategy)[:limit]:
+            row = self.rows[i]
+            entry = {
+                "symbol": row[0],
+                "name": row[1],
+                "score": row[score_i],
+                "rank": row[rank_i],
+            }
+            for name, j in field_offsets:
+                entry[name] = row[j]
+            entries.append(entry)
+        return entries
+
+    def rankings_json(self, strategy: str, limit: int = 100) -> bytes:
+        """JSON-encoded ``rankings()``.
+
+        Entries are encoded once per strategy and joined per call, so the cache
+        stays one encoding per ranked row whatever limits clients ask for.
+        """
+        encoded = self._encoded.get(strategy)
+        if encoded is None:
+            entries = self.rankings(strategy, len(self.ranked_offsets(strategy)))
+            encoded = self._encoded[strategy] = [orjson.dumps(entry) for entry in entries]
+        return b"[" + b",".join(encoded[:limit]) + b"]"
+
+    def get(self, symbol: str) -> Optional[tuple]:
+        i = self.index.get(symbol)
+        return self.rows[i] if i is not None else None
+
+    def profile(self, symbol: str) -> Optional[dict]:
+        """Build the cross-strategy profile for a symbol, or None if absent."""
+        row = self.get(symbol)
+        if row is None:
+            return None
+
+        o = self.offsets
+        rankings = {}
+        for strategy in STRATEGIES:
+            rank = row[o[f"rank_{strategy}"]]
+            universe = self.universe[strategy]
+            percentile = None
+            if rank and universe:
+                percentile = round(100.0 * (universe - rank + 1) / universe, 2)
+            rankings[strategy] = {
+                "rank": rank,
+                "percentile": percentile,
+                "universe": universe,
+            }
+
+        return {
+            "symbol": row[o["symbol"]],
+            "name": row[o["name"]],
+            "sector": row[o["sector"]],
+            "industry": row[o["industry"]],
+            "record_date": self.record_date,
+            "metrics": {name: row[o[name]] for name in METRIC_COLUMNS},
+            "rankings": rankings,
+        }
+
+
+def _snapshot_statement():
+    """Published generation joined with its company and financial rows."""
+    return (
+        select(
+            RankingGeneration.record_date,
+            RankingGeneration.id,
+            RankingGeneration.published_at,
+            *[getattr(Company, name) for name in COMPANY_COLUMNS],
+            *[getattr(FinancialData, name) for name in FINANCIAL_METRIC_COLUMNS],
+            *[getattr(RankingRow, name) for name in SCORE_COLUMNS + RANK_COLUMNS],
+        )
+        .join(RankingRow, RankingRow.generation_id == RankingGeneration.id)
+        .join(Company, Company.id == RankingRow.company_id)
+        .join(FinancialData, FinancialData.id == RankingRow.financial_data_id)
+        .where(RankingGeneration.id == current_generation_id())
+    )
+
+
+def build_snapshot(db: Session) -> Snapshot:
+    rows = db.exec(_snapshot_statement()).all()
+    if not rows:
+        return Snapshot(None, [])
+    record_date, generation_id, published_at = rows[0][:3]
+    return Snapshot(record_date, [tuple(r)[3:] for r in rows], generation_id, published_at)
+
+
+_snapshot: Optional[Snapshot] = None
+_lock = threading.Lock()
+
+
+def get_snapshot(db: Session) -> Snapshot:
+    """Return the current snapshot, rebuilding it if missing or expired."""
+    global _snapshot
+    snap = _snapshot
+    if _fresh(snap):
+        SNAPSHOT_READS.inc(1, "hit")
+        snap.annotate(current_span())
+        return snap
+
+    with _lock:
+        snap = _snapshot
+        if not _fresh(snap):
+            SNAPSHOT_READS.inc(1, "miss")
+            start = time.perf_counter()
+            with span("snapshot.rebuild") as rebuild_span:
+                snap = _snapshot = build_snapshot(db)
+                rebuild_span.set_attribute("stocker.rows", len(snap.rows))
+            SNAPSHOT_BUILD.observe(time.perf_counter() - start)
+        else:
+            SNAPSHOT_READS.inc(1, "hit")
+    snap.annotate(current_span())
+    return snap
+
+
+_async_lock: Optional[asyncio.Lock] = None
+
+
+def _fresh(snap: Optional[Snapshot]) -> bool:
+    return snap is not None and time.monotonic() - snap.built_at < settings.snapshot_ttl_seconds
+
+
+async def get_snapshot_async(db: AsyncSession) -> Snapshot:
+    """Async variant of ``get_snapshot``; the rebuild query runs on the async driver."""
+    global _snapshot, _async_lock
+    snap = _snapshot
+    if _fresh(snap):
+        SNAPSHOT_READS.inc(1, "hit")
+        snap.annotate(current_span())
+        return snap
+
+    if _async_lock is None:
+        _async_lock = asyncio.Lock()
+    async with _async_lock:
+        snap = _snapshot
+        if not _fresh(snap):
+            SNAPSHOT_READS.inc(1, "miss")
+            start = time.perf_counter()
+            with span("snapshot.rebuild") as rebuild_span:
+                snap = _snapshot = await db.run_sync(build_snapshot)
+                rebuild_span.set_attribute("stocker.rows", len(snap.rows))
+            SNAPSHOT_BUILD.observe(time.perf_counter() - start)
+        else:
+            SNAPSHOT_READS.inc(1, "hit")
+    snap.annotate(current_span())
+    return snap
+
+
+def invalidate_snapshot() -> None:
+    global _snapshot
+    _snapshot = None
@@ -0,0 +1,236 @@
+"""
+Columnar snapshot export/import of ``financial_data``.
+
+Snapshots are written as one file per record date, grouped by year::
+
+    <out_dir>/2026/2026-01-15.parquet
+    <out_dir>/2026/2026-01-16.parquet
+
+Each file carries the company columns (name, sector, industry) alongside the
+FinancialData metric columns, so a snapshot can be loaded into an empty
+database. The legacy ``rank_*`` columns are left out: ranks live in ranking
+generations and are recomputed after an import. On import, Arrow IPC files
+are memory-mapped and Parquet files are decoded batch by batch, so only one
+batch is held in memory; each batch is converted to Python values column by
+column for the bulk loader.
+
+Requires ``pyarrow`` (in requirements.txt; imported only when used).
+"""
+
+import datetime
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Date, Float, Integer, insert
+from sqlmodel import Session, select
+
+from app.models.company import Company
+from app.models.financial_data import FinancialData
+from app.config import settings
+from app.services.bulk_load import bulk_upsert_financials
+from app.services.metrics import record_job
+from app.services.partitions import financial_history, rotate_partitions
+from app.services.snapshot import invalidate_snapshot
+from app.services.write_scheduler import WriteScheduler
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+IMPORT_BATCH_SIZE = 50_000
+
+COMPANY_COLUMNS = ("name", "sector", "industry")
+FINANCIAL_COLUMNS = tuple(
+    name for name in FinancialData.__table__.columns.keys()
+    if name not in {"id", "company_id"} and not name.startswith("rank_")
+)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "pyarrow is required for snapshot export/import (pip install pyarrow)"
+        ) from e
+
+
+def _schema():
+    import pyarrow as pa
+
+    fields = [pa.field(c, pa.string()) for c in COMPANY_COLUMNS]
+    for name in FINANCIAL_COLUMNS:
+        column = FinancialData.__table__.columns[name]
+        if isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int32()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _write_date(out_dir: Path, fmt: str, record_date: datetime.date, rows: list[tuple], schema) -> Path:
+    import pyarrow as pa
+
+    path = out_dir / str(record_date.year) / f"{record_date.isoformat()}{SNAPSHOT_FORMATS[fmt]}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    columns = list(zip(*rows))
+    table = pa.Table.from_arrays(
+        [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression="zstd")
+    else:
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def export_snapshot(
+    db: Session,
+    out_dir: str | Path,
+    fmt: str = "parquet",
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> dict:
+    """Write financial_data to date-partitioned columnar files.
+
+    Returns stats dict.
+    """
+    _require_pyarrow()
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format '{fmt}'")
+
+    out_dir = Path(out_dir)
+    schema = _schema()
+    stats = {"files": 0, "rows": 0}
+
+    financials = financial_history()
+    statement = (
+        select(
+            *[getattr(Company, c) for c in COMPANY_COLUMNS],
+            *[getattr(financials, c) for c in FINANCIAL_COLUMNS],
+        )
+        .join(Company, financials.company_id == Company.id)
+        .where(financials.record_date.isnot(None))
+    )
+    if start is not None:
+        statement = statement.where(financials.record_date >= start)
+    if end is not None:
+        statement = statement.where(financials.record_date <= end)
+    statement = statement.order_by(financials.record_date, financials.symbol)
+
+    date_offset = len(COMPANY_COLUMNS) + FINANCIAL_COLUMNS.index("record_date")
+    current_date = None
+    rows: list[tuple] = []
+
+    result = db.exec(statement.execution_options(yield_per=IMPORT_BATCH_SIZE))
+    for row in result:
+        row = tuple(row)
+        if row[date_offset] != current_date and rows:
+            _write_date(out_dir, fmt, current_date, rows, schema)
+            stats["files"] += 1
+            rows = []
+        current_date = row[date_offset]
+        rows.append(row)
+        stats["rows"] += 1
+
+    if rows:
+        _write_date(out_dir, fmt, current_date, rows, schema)
+        stats["files"] += 1
+
+    return stats
+
+
+def _iter_batches(path: Path):
+    """Yield RecordBatches from a snapshot file."""
+    import pyarrow as pa
+
+    if path.suffix == SNAPSHOT_FORMATS["arrow"]:
+        with pa.memory_map(str(path), "r") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+    else:
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=IMPORT_BATCH_SIZE)
+
+
+def _snapshot_files(path: Path) -> list[Path]:
+    if path.is_file():
+        return [path]
+    suffixes = set(SNAPSHOT_FORMATS.values())
+    return sorted(p for p in path.rglob("*") if p.suffix in suffixes)
+
+
+def _ensure_companies(db: Session, batch, company_ids: dict[str, int], stats: dict) -> None:
+    symbols = batch.column("symbol").to_pylist()
+    missing = {}
+    for i, symbol in enumerate(symbols):
+        if symbol not in company_ids and symbol not in missing:
+            missing[symbol] = i
+    if not missing:
+        return
+
+    names, sectors, industries = (batch.column(c).to_pylist() for c in COMPANY_COLUMNS)
+    db.exec(insert(Company.__table__), params=[
+        {"symbol": s, "name": names[i], "sector": sectors[i], "industry": industries[i]}
+        for s, i in missing.items()
+    ])
+    for company_id, symbol in db.exec(
+        select(Company.id, Company.symbol).where(Company.symbol.in_(list(missing)))
+    ):
+        company_ids[symbol] = company_id
+    stats["companies"] += len(missing)
+
+
+def _iter_rows(db: Session, files: list[Path], company_ids: dict[str, int], stats: dict):
+    """Yield financial_data row dicts from snapshot files, creating companies as needed."""
+    for file in files:
+        for batch in _iter_batches(file):
+            if batch.num_rows == 0:
+                continue
+            _ensure_companies(db, batch, company_ids, stats)
+
+            columns = batch.select(list(FINANCIAL_COLUMNS)).to_pydict()
+            columns["company_id"] = [company_ids[symbol] for symbol in columns["symbol"]]
+            names = tuple(columns)
+            for values in zip(*columns.values()):
+                yield dict(zip(names, values))
+
+        stats["files"] += 1
+        logger.info(f"Loaded {file}")
+
+
+def import_snapshot(db: Session, path: str | Path) -> dict:
+    """Bulk-load snapshot files into companies/financial_data.
+
+    Rows replace any existing row for the same (company, record_date).
+    Returns stats dict.
+    """
+    _require_pyarrow()
+    start = time.perf_counter()
+    stats = {"files": 0, "companies": 0, "financials": 0}
+    company_ids = dict(db.exec(select(Company.symbol, Company.id)).all())
+
+    files = _snapshot_files(Path(path))
+    load = bulk_upsert_financials(db, _iter_rows(db, files, company_ids, stats), chunk_size=IMPORT_BATCH_SIZE)
+    stats["financials"] = load["rows"]
+    stats["load"] = load
+    record_job("import_snapshot", time.perf_counter() - start, load["rows"])
+    if settings.partitioning:
+        # Historical dates land in the hot table; move them to their partitions
+        stats["rotated"] = rotate_partitions(db)["rows"]
+
+    WriteScheduler(db, name="import_snapshot").checkpoint()
+    invalidate_snapshot()
+    return stats
@@ -0,0 +1,316 @@
+"""
+Deterministic synthetic universe for scale testing.
+
+``seed_synthetic(db, companies=20000, days=750, seed=42)`` creates
+``companies`` fictional listings (symbols ``SYN000000``, ...) spread over the
+sectors of ``SEED_COMPANIES`` and ``days`` business days of financial_data
+history ending today, bulk-loaded through ``bulk_upsert_financials``.
+
+Each company gets a latent profile drawn from its sector (valuation, margins,
+returns, dividend policy, volatility, share of loss makers). Prices follow a
+daily random walk and earnings are restated quarterly, so derived metrics (P/E,
+PEG, 52-week range) move consistently over time. Like real feeds the data has
+gaps: loss makers report negative or missing P/E, ROA and ROE, some companies
+have no dividend or analyst estimates, some list part-way through the history,
+and a small share of rows carries only a price.
+
+Values depend only on the arguments, not on the calendar: ``end`` just labels
+the history and defaults to today, so the same arguments reproduce the same
+rows only with a fixed ``end`` (``--end`` on the CLI). Re-running with the same
+``end`` is then an upsert; on a later day the history shifts to new dates.
+"""
+
+import datetime
+import logging
+import math
+import random
+import time
+from typing import Iterator, NamedTuple, Optional
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from app.config import settings
+from app.models.company import Company
+from app.services.bulk_load import BULK_CHUNK_SIZE, bulk_upsert_financials
+from app.services.metrics import record_job
+from app.services.partitions import rotate_partitions
+from app.services.snapshot import invalidate_snapshot
+from app.services.write_scheduler import WriteScheduler
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_PREFIX = "SYN"
+QUARTER_DAYS = 63  # business days between earnings restatements
+YEAR_DAYS = 252
+OUTAGE_RATE = 0.002  # rows with a price but no fundamentals
+
+
+class SectorProfile(NamedTuple):
+    weight: float  # share of the universe
+    industries: tuple[str, ...]
+    pe: float  # median trailing P/E of profitable companies
+    roa: float  # median return on assets, %
+    leverage: float  # ROE / ROA
+    ebitda_yield: float  # EBITDA / market cap
+    payer_rate: float  # share of dividend payers
+    dividend: float  # median yield of payers, %
+    loss_rate: float  # share of loss makers
+    volatility: float  # daily price volatility
+
+
+# Medians follow SEED_COMPANIES; loss rates and volatility reflect a broad
+# exchange universe (mostly small caps) rather than the mega caps seeded there
+SECTOR_PROFILES = {
+    "Technology": SectorProfile(
+        0.16, ("Software—Application", "Software—Infrastructure", "Semiconductors", "IT Services",
+               "Communication Equipment", "Consumer Electronics"),
+        32.0, 10.0, 2.2, 0.045, 0.35, 0.8, 0.30, 0.030),
+    "Healthcare": SectorProfile(
+        0.15, ("Biotechnology", "Drug Manufacturers", "Medical Devices", "Diagnostics & Research",
+               "Healthcare Plans"),
+        24.0, 7.0, 2.5, 0.07, 0.25, 2.0, 0.45, 0.035),
+    "Financial Services": SectorProfile(
+        0.14, ("Banks", "Insurance", "Asset Management", "Capital Markets", "Credit Services"),
+        13.0, 1.5, 9.0, 0.0, 0.70, 2.8, 0.08, 0.016),
+    "Industrials": SectorProfile(
+        0.11, ("Aerospace & Defense", "Railroads", "Integrated Freight", "Farm & Heavy Construction",
+               "Waste Management", "Diversified Industrials"),
+        21.0, 7.0, 2.8, 0.08, 0.60, 1.6, 0.12, 0.020),
+    "Consumer Cyclical": SectorProfile(
+        0.10, ("Internet Retail", "Restaurants", "Apparel Retail", "Travel Services",
+               "Footwear & Accessories", "Auto Manufacturers"),
+        22.0, 8.0, 2.5, 0.06, 0.45, 1.7, 0.18, 0.025),
+    "Communication Services": SectorProfile(
+        0.05, ("Internet Content & Information", "Telecom", "Entertainment"),
+        20.0, 5.0, 2.8, 0.07, 0.40, 1.5, 0.20, 0.024),
+    "Consumer Defensive": SectorProfile(
+        0.06, ("Beverages", "Household Products", "Discount Stores", "Packaged Foods"),
+        24.0, 8.0, 2.6, 0.057, 0.75, 2.4, 0.08, 0.012),
+    "Energy": SectorProfile(
+        0.06, ("Oil & Gas", "Oil & Gas Equipment", "Oil & Gas Midstream"),
+        12.0, 7.0, 2.0, 0.14, 0.65, 3.5, 0.15, 0.024),
+    "Basic Materials": SectorProfile(
+        0.05, ("Specialty Chemicals", "Steel", "Copper", "Gold"),
+        18.0, 6.0, 2.0, 0.08, 0.55, 2.0, 0.20, 0.024),
+    "Real Estate": SectorProfile(
+        0.07, ("REIT—Industrial", "REIT—Retail", "REIT—Residential", "REIT—Specialty"),
+        35.0, 3.0, 2.2, 0.064, 0.85, 4.0, 0.12, 0.016),
+    "Utilities": SectorProfile(
+        0.05, ("Utilities—Regulated Electric", "Utilities—Regulated Gas", "Utilities—Renewable"),
+        18.0, 3.0, 3.2, 0.11, 0.90, 3.3, 0.05, 0.011),
+}
+
+
+def synthetic_symbol(i: int) -> str:
+    return f"{SYMBOL_PREFIX}{i:06d}"
+
+
+def business_days(days: int, end: Optional[datetime.date] = None) -> list[datetime.date]:
+    """The last ``days`` weekdays up to and including ``end`` (default today)."""
+    d = end or datetime.date.today()
+    dates = []
+    while len(dates) < days:
+        if d.weekday() < 5:
+            dates.append(d)
+        d -= datetime.timedelta(days=1)
+    return dates[::-1]
+
+
+class _Company:
+    """Latent state of one synthetic company, advanced one business day at a time."""
+
+    __slots__ = (
+        "company_id", "symbol", "profile", "listed_from", "price", "shares", "eps", "growth",
+        "book", "roa", "leverage", "ebitda_ratio", "dps", "target", "low", "high",
+        "has_estimates", "negative_pe", "quarter_offset",
+    )
+
+    def __init__(self, company_id: int, symbol: str, profile: SectorProfile, days: int, rng: random.Random):
+        self.company_id = company_id
+        self.symbol = symbol
+        self.profile = profile
+        # Recent listings have no rows before their first day
+        self.listed_from = rng.randrange(days) if rng.random() < 0.08 else 0
+        self.quarter_offset = rng.randrange(QUARTER_DAYS)
+
+        market_cap = min(rng.lognormvariate(math.log(1.5e9), 1.8), 4e12)
+        self.price = round(min(max(rng.lognormvariate(math.log(40), 1.0), 1.0), 2000.0), 2)
+        self.shares = market_cap / self.price
+
+        pe = max(rng.lognormvariate(math.log(profile.pe), 0.45), 3.0)
+        loss_maker = rng.random() < profile.loss_rate
+        self.eps = (-1 if loss_maker else 1) * self.price / pe
+        self.growth = rng.gauss(0.08, 0.12)
+        self.roa = (-1 if loss_maker else 1) * rng.lognormvariate(math.log(max(profile.roa, 0.5)), 0.6)
+        self.leverage = max(rng.gauss(profile.leverage, profile.leverage * 0.3), 1.0)
+        self.book = self.price / max(rng.lognormvariate(math.log(3.0), 0.7), 0.2)
+        self.ebitda_ratio = rng.gauss(profile.ebitda_yield, profile.ebitda_yield * 0.4) * self.price
+
+        payer = not loss_maker and rng.random() < profile.payer_rate
+        self.dps = self.price * rng.lognormvariate(math.log(profile.dividend), 0.5) / 100 if payer else 0.0
+        self.target = rng.gauss(1.1, 0.15)
+        self.low = self.high = self.price
+        self.has_estimates = rng.random() > 0.12
+        self.negative_pe = rng.random() < 0.5
+
+    def step(self, day: int, rng: random.Random) -> None:
+        if (day + self.quarter_offset) % QUARTER_DAYS == 0:
+            self._restate(rng)
+        self.price = max(round(self.price * math.exp(rng.gauss(0.0002, self.profile.volatility)), 2), 0.01)
+        # Approximate 52-week range: extremes decay towards the price over a year
+        self.low = min(self.price, self.low + (self.price - self.low) / YEAR_DAYS)
+        self.high = max(self.price, self.high - (self.high - self.price) / YEAR_DAYS)
+
+    def _restate(self, rng: random.Random) -> None:
+        old = self.eps
+        surprise = rng.gauss(self.growth / 4, 0.08)
+        self.eps = old + abs(old) * surprise + rng.gauss(0, 0.01)
+        if old:
+            change = self.eps / old
+            self.roa *= change
+            self.ebitda_ratio *= max(change, 0.5)
+        # The market reacts to the surprise
+        self.price = max(round(self.price * min(max(1 + surprise / 2, 0.5), 2.0), 2), 0.01)
+        self.growth = 0.8 * self.growth + 0.2 * rng.gauss(0.08, 0.12)
+        self.target = rng.gauss(1.1, 0.15)
+        self.book *= 1 + rng.gauss(0.015, 0.02)
+
+    def row(self, record_date: datetime.date, outage: bool) -> dict:
+        price = self.price
+        row = {
+            "company_id": self.company_id,
+            "symbol": self.symbol,
+            "record_date": record_date,
+            "ask": price,
+            "market_cap": round(price * self.shares, -3),
+        }
+        if outage:
+            return row
+
+        eps = self.eps
+        eps_next = eps + abs(eps) * self.growth
+        pe_ttm = pe_ftm = peg = garp = None
+        if eps > 0 or self.negative_pe:
+            pe_ttm = round(price / eps, 2) if eps else None
+        if self.has_estimates and (eps_next > 0 or self.negative_pe) and eps_next:
+            pe_ftm = round(price / eps_next, 2)
+        if self.has_estimates and pe_ttm and pe_ttm > 0 and self.growth > 0.005:
+            peg = round(pe_ttm / (self.growth * 100), 2)
+            garp = round(pe_ttm / peg, 2)
+
+        net_income = eps * self.shares
+        row.update({
+            "book_value": round(self.book, 2),
+            "ebitda": round(self.ebitda_ratio * self.shares, -3),
+            "pe_ratio_ttm": pe_ttm,
+            "pe_ratio_ftm": pe_ftm,
+            "peg_ratio": peg,
+            "garp_ratio": garp,
+            "return_on_assets": round(self.roa, 2),
+            "return_on_equity": round(self.roa * self.leverage, 2),
+            "dividend_yield": round(self.dps / price * 100, 2) if self.dps else None,
+            "net_income": round(net_income, -3),
+            "total_assets": round(abs(net_income / self.roa) * 100, -3) if self.roa else None,
+            "change_year_low_per": round((price - self.low) / self.low * 100, 2),
+            "change_year_high_per": round((price - self.high) / self.high * 100, 2),
+            "one_yr_target_price": round(price * self.target, 2) if self.has_estimates else None,
+        })
+        if self.has_estimates:
+            row.update({
+                "eps_estimate_current_year": round(eps_next, 2),
+                "eps_estimate_next_year": round(eps_next + abs(eps_next) * self.growth, 2),
+                "eps_estimate_qtr": round(eps_next / 4, 3),
+                "eps_estimate_next_quarter": round(eps_next * (1 + self.growth / 4) / 4, 3),
+            })
+        return row
+
+
+def generate_companies(companies: int, seed: int = 42) -> list[dict]:
+    """Company rows (symbol, name, sector, industry) of the synthetic universe."""
+    rng = random.Random(f"{seed}-companies")
+    sectors = list(SECTOR_PROFILES)
+    weights = [p.weight for p in SECTOR_PROFILES.values()]
+    rows = []
+    for i in range(companies):
+        sector = rng.choices(sectors, weights)[0]
+        rows.append({
+            "symbol": synthetic_symbol(i),
+            "name": f"Synthetic Company {i}",
+            "sector": sector,
+            "industry": rng.choice(SECTOR_PROFILES[sector].industries),
+        })
+    return rows
+
+
+def generate_financials(
+    company_ids: list[tuple[int, str, str]],
+    dates: list[datetime.date],
+    seed: int = 42,
+) -> Iterator[dict]:
+    """Yield financial_data rows date by date for (company_id, symbol, sector) triples."""
+    rng = random.Random(f"{seed}-financials")
+    universe = [
+        _Company(company_id, symbol, SECTOR_PROFILES[sector], len(dates), rng)
+        for company_id, symbol, sector in company_ids
+    ]
+    for day, record_date in enumerate(dates):
+        for company in universe:
+            company.step(day, rng)
+            if day >= company.listed_from:
+                yield company.row(record_date, rng.random() < OUTAGE_RATE)
+
+
+def _ensure_companies(db: Session, rows: list[dict]) -> list[tuple[int, str, str]]:
+    existing = dict(db.exec(
+        select(Company.symbol, Company.id).where(Company.symbol.like(f"{SYMBOL_PREFIX}%"))
+    ).all())
+    missing = [row for row in rows if row["symbol"] not in existing]
+    if missing:
+        writer = WriteScheduler(db, chunk_size=BULK_CHUNK_SIZE, name="seed_synthetic")
+        writer.insert_many(Company.__table__, missing)
+        existing = dict(db.exec(
+            select(Company.symbol, Company.id).where(Company.symbol.like(f"{SYMBOL_PREFIX}%"))
+        ).all())
+    return [(existing[row["symbol"]], row["symbol"], row["sector"]) for row in rows]
+
+
+def seed_synthetic(
+    db: Session,
+    companies: int = 1000,
+    days: int = 1,
+    seed: int = 42,
+    end: Optional[datetime.date] = None,
+) -> dict:
+    """Create (or refresh) a synthetic universe with ``days`` of history.
+
+    Pass ``end`` for reproducible runs; it defaults to today. Returns stats dict.
+    """
+    if companies < 1 or days < 1:
+        raise ValueError("companies and days must be at least 1")
+
+    start = time.perf_counter()
+    company_rows = generate_companies(companies, seed)
+    company_ids = _ensure_companies(db, company_rows)
+    dates = business_days(days, end)
+    logger.info(
+        f"Generating {companies} companies x {days} days ({dates[0]} to {dates[-1]}, seed {seed})..."
+    )
+
+    load = bulk_upsert_financials(db, generate_financials(company_ids, dates, seed))
+    seconds = time.perf_counter() - start
+    stats = {
+        "companies": companies,
+        "dates": len(dates),
+        "financials": load["rows"],
+        "load": load,
+        "rows_per_second": round(load["rows"] / seconds) if seconds else None,
+    }
+    record_job("seed_synthetic", seconds, load["rows"])
+    if settings.partitioning:
+        # History lands in the hot table; move it to its partitions
+        stats["rotated"] = rotate_partitions(db)["rows"]
+
+    WriteScheduler(db, name="seed_synthetic").checkpoint()
+    invalidate_snapshot()
+    return stats
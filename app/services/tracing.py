@@ -0,0 +1,252 @@
+"""
+Lightweight span tracing for the import -> ranking -> serving pipeline.
+
+Spans follow the OpenTelemetry data model (W3C trace/span ids, parent ids,
+span kind, nanosecond timestamps, typed attributes). Each span is exported as
+one line holding an OTLP/JSON ``ExportTraceServiceRequest``
+(``resourceSpans`` -> ``scopeSpans`` -> ``spans``), the format a collector's
+``otlpjsonfile`` receiver reads. The OpenTelemetry SDK is not needed.
+
+``TRACE_EXPORTER``:
+
+- ``""`` (default): tracing off; ``span()`` returns a shared no-op,
+- ``console``: spans are logged,
+- ``file``: spans are appended to ``TRACE_FILE``.
+
+Freshness attributes (``stocker.*``) tie the stages together across
+processes: fetch spans carry ``stocker.fetched_at``, ranking spans the
+generation id and publish time, and request spans the age of the published
+generation (``stocker.publish_to_serve_seconds``) they were served from.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "stocker"
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+class Span:
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "_token",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict, kind: int = SPAN_KIND_INTERNAL):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        _export(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Returned when tracing is off; every operation is a no-op."""
+
+    trace_id = span_id = parent_id = None
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NOOP = _NoopSpan()
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class _RemoteParent:
+    """Parent taken from an incoming W3C ``traceparent`` header."""
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+def enabled() -> bool:
+    return bool(settings.trace_exporter)
+
+
+def span(name: str, parent=None, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Start a span as a context manager: ``with span("fetch", symbol=s) as sp:``."""
+    if not settings.trace_exporter:
+        return _NOOP
+    return Span(name, parent or _current.get(), attributes, kind)
+
+
+def traced(name: str):
+    """Decorator running the function inside a span; annotate it via ``current_span()``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """The active span, or a no-op span so callers can annotate unconditionally."""
+    return _current.get() or _NOOP
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[_RemoteParent]:
+    parts = (header or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return _RemoteParent(parts[1], parts[2])
+
+
+def _attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _export_request(span: Span) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest holding one span."""
+    resource = {"service.name": SERVICE_NAME, "process.pid": os.getpid()}
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute(k, v) for k, v in resource.items()]},
+        "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp()]}],
+    }]}
+
+
+# The trace file stays open (line buffered) instead of being reopened per span
+_file_lock = threading.Lock()
+_file = None
+
+
+def _write_line(line: str) -> None:
+    global _file
+    with _file_lock:
+        if _file is None or _file.name != settings.trace_file:
+            if _file is not None:
+                _file.close()
+            _file = open(settings.trace_file, "a", buffering=1)
+        _file.write(line + "\n")
+
+
+@atexit.register
+def _close_file() -> None:
+    global _file
+    with _file_lock:
+        if _file is not None:
+            _file.close()
+            _file = None
+
+
+def _export(span: Span) -> None:
+    line = json.dumps(_export_request(span), separators=(",", ":"))
+    if settings.trace_exporter == "file":
+        _write_line(line)
+    else:
+        duration_ms = (span.end_ns - span.start_ns) / 1e6
+        logger.info(f"span {span.name} {duration_ms:.2f}ms {line}")
+
+
+class TracingMiddleware:
+    """ASGI middleware: one server span per HTTP request.
+
+    Continues the caller's trace when a ``traceparent`` header is present and
+    returns the request span's ``traceparent`` in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.trace_exporter:
+            await self.app(scope, receive, send)
+            return
+
+        from app.services.metrics import MetricsMiddleware
+
+        headers = dict(scope["headers"])
+        remote = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        route = MetricsMiddleware._route(scope)
+
+        with span(
+            f"{scope['method']} {route}",
+            parent=remote,
+            kind=SPAN_KIND_SERVER,
+            **{"http.method": scope["method"], "http.route": route, "http.target": scope["path"]},
+        ) as request_span:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    request_span.set_attribute("http.status_code", message["status"])
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"traceparent", request_span.traceparent.encode())
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
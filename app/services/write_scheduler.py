@@ -0,0 +1,220 @@
+"""
+Bounded write transactions for imports.
+
+``WriteScheduler`` groups ORM adds and Core bulk inserts into transactions of at
+most ``settings.import_chunk_size`` rows or ``settings.import_chunk_seconds``
+seconds, whichever comes first. That avoids both an fsync per row and a single
+giant transaction that holds the SQLite write lock (and grows the WAL) for the
+whole import. ``checkpoint()`` truncates the WAL between import phases.
+
+The budget is only checked on writes, so a transaction must never stay open
+while the caller waits on something else (a network fetch and its retries):
+loops over a lazy source pull from it through ``batches()``, which commits
+before every pull.
+
+Every scheduler keeps metrics (commits, rows, lock wait, lock hold, WAL size)
+that callers log or return in their stats.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import insert, text
+from sqlmodel import Session
+
+from app.config import settings
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def wal_size(db: Session) -> Optional[int]:
+    """Size in bytes of the SQLite WAL file, or None if not applicable."""
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite" or not bind.url.database or bind.url.database == ":memory:":
+        return None
+    try:
+        return os.path.getsize(f"{bind.url.database}-wal")
+    except OSError:
+        return 0
+
+
+class WriteScheduler:
+    """Commit writes in chunks bounded by row count and elapsed time."""
+
+    def __init__(
+        self,
+        db: Session,
+        chunk_size: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        name: str = "import",
+    ):
+        self.db = db
+        self.chunk_size = chunk_size or settings.import_chunk_size
+        self.max_seconds = max_seconds if max_seconds is not None else settings.import_chunk_seconds
+        self.name = name
+
+        self.pending = 0
+        self._txn_started: Optional[float] = None
+
+        self.commits = 0
+        self.rows = 0
+        self.lock_wait_seconds = 0.0
+        self.max_lock_wait_seconds = 0.0
+        self.max_lock_hold_seconds = 0.0
+        self.checkpoints = 0
+        self.max_wal_bytes = 0
+
+    # -- transaction bookkeeping -------------------------------------------
+
+    def _begin_write(self) -> None:
+        """Called before the first write of a transaction.
+
+        Flushing takes the database write lock, so the time it takes is the
+        time spent waiting for other writers.
+        """
+        if self._txn_started is not None:
+            return
+        t0 = time.monotonic()
+        self.db.flush()
+        waited = time.monotonic() - t0
+        self.lock_wait_seconds += waited
+        self.max_lock_wait_seconds = max(self.max_lock_wait_seconds, waited)
+        self._txn_started = time.monotonic()
+
+    def _due(self) -> bool:
+        if self.pending >= self.chunk_size:
+            return True
+        return (
+            self._txn_started is not None
+            and time.monotonic() - self._txn_started >= self.max_seconds
+        )
+
+    def commit(self) -> None:
+        """Commit the current chunk, if anything is pending."""
+        if self.pending == 0 and self._txn_started is None:
+            return
+        with span("db.write", **{"stocker.writer": self.name, "db.rows": self.pending}):
+            self.db.commit()
+        if self._txn_started is not None:
+            held = time.monotonic() - self._txn_started
+            self.max_lock_hold_seconds = max(self.max_lock_hold_seconds, held)
+        self.commits += 1
+        self.rows += self.pending
+        self.pending = 0
+        self._txn_started = None
+
+        size = wal_size(self.db)
+        if size is not None:
+            self.max_wal_bytes = max(self.max_wal_bytes, size)
+
+    def rollback(self) -> int:
+        """Discard the current chunk. Returns the number of rows dropped."""
+        dropped = self.pending
+        self.db.rollback()
+        self.pending = 0
+        self._txn_started = None
+        return dropped
+
+    # -- writes --------------------------------------------------------------
+
+    @contextmanager
+    def savepoint(self):
+        """Run a block of ORM writes in a SAVEPOINT and flush them there.
+
+        If the block or its flush fails, only its own writes are undone; rows
+        already pending in the chunk stay. Follow with ``add`` to count the row.
+        """
+        bind = self.db.connection()
+        if bind.dialect.name == "sqlite" and not bind.connection.dbapi_connection.in_transaction:
+            # pysqlite only emits BEGIN before DML: a SAVEPOINT would open a
+            # transaction of its own, which its RELEASE then commits
+            bind.exec_driver_sql("BEGIN")
+        with self.db.begin_nested():
+            yield
+            self._begin_write()
+            self.db.flush()
+
+    def batches(self, items: Iterable) -> Iterator[list]:
+        """Pull ``items`` in lists of up to ``chunk_size``, committing before each pull.
+
+        A pull stops early once ``max_seconds`` have passed, so written rows
+        become visible at that pace even when the source is slow.
+        """
+        items = iter(items)
+        while True:
+            self.commit()
+            batch = []
+            deadline = time.monotonic() + self.max_seconds
+            for item in items:
+                batch.append(item)
+                if len(batch) >= self.chunk_size or time.monotonic() >= deadline:
+                    break
+            if not batch:
+                return
+            yield batch
+
+    def add(self, obj) -> None:
+        """Add an ORM object; commits when the chunk is full or over budget."""
+        self.db.add(obj)
+        self._begin_write()
+        self.pending += 1
+        if self._due():
+            self.commit()
+
+    def execute_many(self, statement, rows: list[dict]) -> None:
+        """Run a Core statement with executemany, one transaction per chunk."""
+        for i in range(0, len(rows), self.chunk_size):
+            chunk = rows[i:i + self.chunk_size]
+            self._begin_write()
+            self.db.exec(statement, params=chunk)
+            self.pending += len(chunk)
+            self.commit()
+
+    def insert_many(self, table, rows: list[dict]) -> None:
+        """Bulk-insert rows with Core executemany, one transaction per chunk."""
+        self.execute_many(insert(table), rows)
+
+    def insert_iter(self, table, rows: Iterable[dict]) -> None:
+        """Like ``insert_many`` but consumes ``rows`` lazily, one chunk at a time."""
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.insert_many(table, chunk)
+
+    # -- maintenance ---------------------------------------------------------
+
+    def checkpoint(self, mode: str = "TRUNCATE") -> Optional[tuple]:
+        """Commit, then checkpoint the SQLite WAL. No-op on other databases.
+
+        Returns the (busy, log_frames, checkpointed_frames) row from SQLite.
+        """
+        self.commit()
+        # Close any read transaction too; SQLite can't checkpoint inside one
+        self.db.commit()
+        if self.db.get_bind().dialect.name != "sqlite":
+            return None
+        before = wal_size(self.db)
+        result = tuple(self.db.exec(text(f"PRAGMA wal_checkpoint({mode})")).one())
+        self.db.commit()
+        self.checkpoints += 1
+        if before is not None:
+            self.max_wal_bytes = max(self.max_wal_bytes, before)
+        if result[0]:
+            logger.warning(f"{self.name}: WAL checkpoint could not complete (readers active)")
+        return result
+
+    def metrics(self) -> dict:
+        return {
+            "commits": self.commits,
+            "rows": self.rows,
+            "lock_wait_seconds": round(self.lock_wait_seconds, 4),
+            "max_lock_wait_seconds": round(self.max_lock_wait_seconds, 4),
+            "max_lock_hold_seconds": round(self.max_lock_hold_seconds, 4),
+            "checkpoints": self.checkpoints,
+            "max_wal_bytes": self.max_wal_bytes,
+            "wal_bytes": wal_size(self.db),
+        }
@@ -0,0 +1,112 @@
+"""
+Memory benchmark: peak allocations of compute_rankings per mode.
+
+Seeds a synthetic universe into a temporary SQLite file, then runs
+compute_rankings once per mode in a fresh interpreter so peak RSS is not
+shared between runs. Reports the tracemalloc peak (Python allocations made
+by the job) and the process peak RSS.
+
+Usage:
+    python -m benchmarks.bench_rankings_memory [--companies 50000] [--chunk-size 5000]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import SQLModel, Session, create_engine  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.models import Company  # noqa: E402
+from app.services.bulk_load import bulk_upsert_financials  # noqa: E402
+from app.services.data_import import RANK_CONFIGS, compute_rankings  # noqa: E402
+
+SECTORS = ("Technology", "Healthcare", "Industrials", "Energy", "Financial Services", "Utilities")
+
+
+def seed(path: str, companies: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(42)
+    today = datetime.date.today()
+    with Session(engine) as db:
+        db.exec(insert(Company), params=[
+            {"symbol": f"S{i:06d}", "name": f"Company {i}", "sector": SECTORS[i % len(SECTORS)]}
+            for i in range(companies)
+        ])
+        db.commit()
+        bulk_upsert_financials(db, (
+            {
+                "company_id": i + 1,
+                "symbol": f"S{i:06d}",
+                "record_date": today,
+                **{m: (rng.lognormvariate(2, 1) if rng.random() > 0.1 else None) for m, _, _ in RANK_CONFIGS},
+            }
+            for i in range(companies)
+        ))
+    engine.dispose()
+
+
+def measure(path: str, low_memory: bool, chunk_size: int) -> dict:
+    engine = create_engine(f"sqlite:///{path}")
+    settings.rankings_chunk_size = chunk_size
+    with Session(engine) as db:
+        tracemalloc.start()
+        start = time.perf_counter()
+        ranked = compute_rankings(db, low_memory=low_memory)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "ranked": ranked,
+        "seconds": round(seconds, 3),
+        "tracemalloc_peak_mb": round(peak / 2**20, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=["default", "low-memory"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.db, args.mode == "low-memory", args.chunk_size)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(path, args.companies)
+        print(f"compute_rankings over {args.companies} companies (chunk size {args.chunk_size}):")
+        print(f"  {'mode':<12} {'seconds':>8} {'tracemalloc peak MB':>20} {'peak RSS MB':>12}")
+        for mode in ("default", "low-memory"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_rankings_memory", "--db", path,
+                 "--mode", mode, "--chunk-size", str(args.chunk_size)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(
+                f"  {mode:<12} {result['seconds']:>8} {result['tracemalloc_peak_mb']:>20}"
+                f" {result['peak_rss_mb']:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
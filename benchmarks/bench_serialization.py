@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: serialization cost of a 500-row ranking response.
+
+Compares the old path (list of dicts re-validated into RankingEntry by
+FastAPI's response_model, then JSON-encoded) against orjson encoding of the
+same dicts and the pre-encoded bytes cached on the ranking snapshot.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 500] [--repeat 200]
+"""
+
+import argparse
+import datetime
+import os
+import timeit
+
+import orjson
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.routers.rankings import RankingEntry  # noqa: E402
+from app.services.snapshot import COLUMNS, Snapshot  # noqa: E402
+
+
+def make_snapshot(n: int) -> Snapshot:
+    rows = []
+    for i in range(n):
+        values = {name: float(i) for name in COLUMNS}
+        values.update(symbol=f"SYM{i}", name=f"Company {i}", sector="Technology", industry="Software")
+        values.update({name: i + 1 for name in COLUMNS if name.startswith("rank_")})
+        rows.append(tuple(values[name] for name in COLUMNS))
+    return Snapshot(datetime.date.today(), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    snapshot = make_snapshot(args.rows)
+    entries = snapshot.rankings("ebitda", args.rows)
+    adapter = TypeAdapter(list[RankingEntry])
+
+    def pydantic_path():
+        # Mirrors fastapi.routing.serialize_response for a pydantic v2 model
+        validated = adapter.validate_python(entries)
+        return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    def orjson_path():
+        return orjson.dumps(entries)
+
+    def snapshot_uncached():
+        snapshot._encoded.clear()
+        return snapshot.rankings_json("ebitda", args.rows)
+
+    def snapshot_cached():
+        return snapshot.rankings_json("ebitda", args.rows)
+
+    assert orjson.loads(pydantic_path()) == orjson.loads(snapshot_cached())
+
+    print(f"{args.rows}-row ranking, best of 5 x {args.repeat} runs (ms per response):")
+    for label, fn in [
+        ("response_model validation + json", pydantic_path),
+        ("orjson.dumps(list[dict])", orjson_path),
+        ("snapshot build entries + orjson", snapshot_uncached),
+        ("snapshot cached bytes", snapshot_cached),
+    ]:
+        best = min(timeit.repeat(fn, number=args.repeat, repeat=5)) / args.repeat
+        print(f"  {label:<36} {best * 1000:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
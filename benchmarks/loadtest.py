@@ -0,0 +1,373 @@
+"""
+HTTP load generator driven by scenario files.
+
+A scenario (``benchmarks/scenarios/*.json``) lists weighted request templates
+and the parameters substituted into them, plus run settings:
+
+    {
+      "duration": 30, "concurrency": 16, "users": 4,
+      "universe": {"companies": 5000, "days": 1, "seed": 42},
+      "write_load": {"job": "compute_rankings", "args": {}, "pause": 1.0},
+      "params": {"strategy": ["ebitda", ...], "search": ["SYN00", ...]},
+      "requests": [
+        {"name": "rankings", "weight": 5, "path": "/api/rankings/{strategy}?limit=100", "auth": true},
+        {"name": "login", "weight": 1, "method": "POST", "path": "/api/auth/login",
+         "json": {"email": "{email}", "password": "{password}"}}
+      ]
+    }
+
+``concurrency`` async httpx clients loop over randomly drawn requests for
+``duration`` seconds (closed loop, no think time). ``users`` accounts are
+registered first; authenticated requests use their bearer tokens and
+``{email}``/``{password}`` expand to one of them.
+
+With ``--start-server`` a synthetic database is generated in a temporary
+directory (``universe``) and served by uvicorn; otherwise ``--url`` is load
+tested as is. ``write_load`` runs a write job (``compute_rankings`` or
+``seed_synthetic`` with ``args``) back to back in a separate process against
+the same database for the whole run (``--start-server`` or
+``--database-url``), and every request is also reported by whether the job
+was in progress when it started.
+
+Usage:
+    python -m benchmarks.loadtest benchmarks/scenarios/read_mix.json --start-server
+    python -m benchmarks.loadtest benchmarks/scenarios/reads_under_ranking.json --start-server --workers 2
+    python -m benchmarks.loadtest benchmarks/scenarios/read_mix.json --url http://127.0.0.1:8000 --out run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+PASSWORD = "loadtest-password"
+
+
+def percentile(sorted_values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _fill(template, values: dict):
+    if isinstance(template, str):
+        return template.format(**values)
+    if isinstance(template, dict):
+        return {k: _fill(v, values) for k, v in template.items()}
+    if isinstance(template, list):
+        return [_fill(v, values) for v in template]
+    return template
+
+
+WRITE_JOBS = {
+    "compute_rankings": "app.services.data_import:compute_rankings",
+    "seed_synthetic": "app.services.synthetic:seed_synthetic",
+}
+
+
+def write_loop(job: str, kwargs: dict, pause: float) -> None:
+    """Run a write job back to back, printing wall-clock start/end lines (subprocess)."""
+    import importlib
+
+    from sqlmodel import Session
+
+    from app.database import create_db_and_tables, engine
+
+    module, name = WRITE_JOBS[job].split(":")
+    fn = getattr(importlib.import_module(module), name)
+    create_db_and_tables()
+    while True:
+        print(f"start {time.time()}", flush=True)
+        try:
+            with Session(engine) as db:
+                fn(db, **kwargs)
+        except Exception as e:
+            print(f"failed {e!r}", flush=True)
+        print(f"end {time.time()}", flush=True)
+        time.sleep(pause)
+
+
+class WriteLoad:
+    """Background write job in a separate process, recording when it was running."""
+
+    def __init__(self, config: dict, env: dict):
+        self.config = config
+        self.env = env
+        self.intervals: list[tuple[float, float]] = []
+        self.failures = 0
+        self._started: Optional[float] = None
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self.config["job"] not in WRITE_JOBS:
+            raise ValueError(f"Unknown write job {self.config['job']!r}; use one of {sorted(WRITE_JOBS)}")
+        self._proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.loadtest", "_write_loop", self.config["job"],
+            "--job-args", json.dumps(self.config.get("args", {})),
+            "--pause", str(self.config.get("pause", 0.0)),
+            env=self.env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        self._reader = asyncio.create_task(self._read())
+        # Don't start measuring before the job process has imported the app
+        while self._started is None and not self.intervals and self._proc.returncode is None:
+            await asyncio.sleep(0.05)
+        if self._proc.returncode is not None:
+            raise RuntimeError(f"Write job {self.config['job']} exited with {self._proc.returncode}")
+
+    async def _read(self) -> None:
+        async for line in self._proc.stdout:
+            kind, _, value = line.decode().strip().partition(" ")
+            if kind == "start":
+                self._started = float(value)
+            elif kind == "end" and self._started is not None:
+                self.intervals.append((self._started, float(value)))
+                self._started = None
+            elif kind == "failed":
+                self.failures += 1
+
+    async def stop(self) -> None:
+        if self._proc.returncode is None:
+            self._proc.terminate()
+        await self._proc.wait()
+        await self._reader
+        if self._started is not None:
+            self.intervals.append((self._started, time.time()))
+
+    def busy_at(self, t: float) -> bool:
+        return any(start <= t < end for start, end in self.intervals)
+
+
+async def _login_users(client: httpx.AsyncClient, count: int) -> list[dict]:
+    users = []
+    for i in range(count):
+        creds = {"email": f"loadtest{i}@example.com", "password": PASSWORD}
+        response = await client.post("/api/auth/register", json=creds)
+        if response.status_code == 409:
+            response = await client.post("/api/auth/login", json=creds)
+        response.raise_for_status()
+        users.append({**creds, "token": response.json()["access_token"]})
+    return users
+
+
+async def run_scenario(scenario: dict, url: str, write_env: Optional[dict], seed: int) -> dict:
+    duration = scenario.get("duration", 30)
+    concurrency = scenario.get("concurrency", 8)
+    templates = scenario["requests"]
+    weights = [t.get("weight", 1) for t in templates]
+    params = scenario.get("params", {})
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        users = await _login_users(client, max(scenario.get("users", 1), 1))
+
+        write_load = None
+        if scenario.get("write_load") and write_env is not None:
+            write_load = WriteLoad(scenario["write_load"], write_env)
+            await write_load.start()
+
+        samples: list[tuple[str, float, float, int]] = []  # (name, wall-clock start, seconds, status)
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def worker(worker_id: int) -> None:
+            rng = random.Random(seed * 1000 + worker_id)
+            while time.perf_counter() < deadline:
+                template = rng.choices(templates, weights)[0]
+                user = rng.choice(users)
+                values = {name: rng.choice(options) for name, options in params.items()}
+                values.update(email=user["email"], password=user["password"])
+                headers = {"Authorization": f"Bearer {user['token']}"} if template.get("auth") else {}
+                wall, t0 = time.time(), time.perf_counter()
+                try:
+                    response = await client.request(
+                        template.get("method", "GET"),
+                        _fill(template["path"], values),
+                        json=_fill(template.get("json"), values),
+                        headers=headers,
+                    )
+                    status = response.status_code
+                except httpx.HTTPError:
+                    status = 0
+                samples.append((template["name"], wall, time.perf_counter() - t0, status))
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        if write_load:
+            await write_load.stop()
+
+    return summarize(scenario, samples, elapsed, write_load)
+
+
+def _route_stats(samples: list[tuple], elapsed: float) -> dict:
+    latencies = sorted(s[2] * 1000 for s in samples)
+    errors = sum(1 for s in samples if not 200 <= s[3] < 400)
+
+    def ms(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1) if elapsed else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+    }
+
+
+def summarize(scenario: dict, samples: list[tuple], elapsed: float, write_load: Optional[WriteLoad]) -> dict:
+    by_route: dict[str, list] = {}
+    for sample in samples:
+        by_route.setdefault(sample[0], []).append(sample)
+
+    report = {
+        "scenario": scenario.get("description", ""),
+        "duration_s": round(elapsed, 2),
+        "concurrency": scenario.get("concurrency", 8),
+        "total": _route_stats(samples, elapsed),
+        "routes": {name: _route_stats(s, elapsed) for name, s in sorted(by_route.items())},
+    }
+    if write_load is not None:
+        busy = [s for s in samples if write_load.busy_at(s[1])]
+        idle = [s for s in samples if not write_load.busy_at(s[1])]
+        report["write_load"] = {
+            "runs": len(write_load.intervals),
+            "failures": write_load.failures,
+            "busy_s": round(sum(end - start for start, end in write_load.intervals), 2),
+        }
+        # Rates here are relative to the whole run, so compare latencies only
+        report["during_writes"] = {
+            name: _route_stats([s for s in busy if s[0] == name], elapsed) for name in sorted(by_route)
+        }
+        report["without_writes"] = {
+            name: _route_stats([s for s in idle if s[0] == name], elapsed) for name in sorted(by_route)
+        }
+    return report
+
+
+def print_report(report: dict) -> None:
+    header = f"{'route':<24} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+
+    def table(title: str, routes: dict) -> None:
+        print(f"\n{title}")
+        print(header)
+        for name, r in routes.items():
+            print(
+                f"{name:<24} {r['requests']:>9} {r['errors']:>7} {r['rps'] or 0:>8} "
+                f"{r['p50_ms'] or 0:>9} {r['p95_ms'] or 0:>9} {r['p99_ms'] or 0:>9}"
+            )
+
+    print(f"{report['scenario']} ({report['duration_s']}s, concurrency {report['concurrency']})")
+    table("All requests", {**report["routes"], "TOTAL": report["total"]})
+    if "write_load" in report:
+        w = report["write_load"]
+        print(f"\nWrite load: {w['runs']} runs ({w['failures']} failed), busy {w['busy_s']}s")
+        table("Started while a write job ran", report["during_writes"])
+        table("Started with no write job running", report["without_writes"])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def local_server(universe: dict, workers: int, env: dict):
+    """Seed a synthetic database and serve it with uvicorn for the duration of the block."""
+    subprocess.run(
+        [sys.executable, "-m", "app.cli", "seed-synthetic",
+         "--companies", str(universe.get("companies", 1000)),
+         "--days", str(universe.get("days", 1)),
+         "--seed", str(universe.get("seed", 42))],
+        env=env, check=True,
+    )
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(300):
+            try:
+                if httpx.get(f"{url}/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            time.sleep(0.1)
+        else:
+            raise RuntimeError("uvicorn did not become healthy")
+        yield url
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    if sys.argv[1:2] == ["_write_loop"]:
+        job_parser = argparse.ArgumentParser()
+        job_parser.add_argument("job", choices=sorted(WRITE_JOBS))
+        job_parser.add_argument("--job-args", type=json.loads, default={})
+        job_parser.add_argument("--pause", type=float, default=0.0)
+        job = job_parser.parse_args(sys.argv[2:])
+        write_loop(job.job, job.job_args, job.pause)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("scenario", help="Scenario JSON file")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Target server (without --start-server)")
+    parser.add_argument("--start-server", action="store_true", help="Serve a fresh synthetic database with uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers with --start-server")
+    parser.add_argument("--database-url", help="Database of the target server, for write load with --url")
+    parser.add_argument("--duration", type=float, help="Override the scenario duration (seconds)")
+    parser.add_argument("--concurrency", type=int, help="Override the scenario concurrency")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="Also write the report as JSON here")
+    args = parser.parse_args()
+
+    scenario = json.loads(Path(args.scenario).read_text())
+    if args.duration is not None:
+        scenario["duration"] = args.duration
+    if args.concurrency is not None:
+        scenario["concurrency"] = args.concurrency
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.start_server:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{tmp}/loadtest.db",
+                "DATABASE_READ_URL": "",
+                "METRICS_DIR": f"{tmp}/metrics",
+            }
+            with local_server(scenario.get("universe", {}), args.workers, env) as url:
+                report = asyncio.run(run_scenario(scenario, url, env, args.seed))
+        else:
+            env = {**os.environ, "DATABASE_URL": args.database_url} if args.database_url else None
+            report = asyncio.run(run_scenario(scenario, args.url, env, args.seed))
+
+    print_report(report)
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Benchmark suite: import, ranking and read hot paths at several universe sizes.
+
+Each size runs in a fresh interpreter against its own temporary SQLite
+database, seeded with ``app.services.synthetic``. Cases:
+
+- ``fetch_and_store``: import of every symbol from an in-memory replay source,
+- ``seed_database``: the bundled sample data,
+- ``compute_rankings`` / ``compute_rankings_low_memory``,
+- ``get_rankings[<strategy>]``: top 100 of each strategy, in SQL,
+- ``build_snapshot``: rebuild of the in-memory ranking snapshot,
+- ``snapshot_rankings_json[<strategy>]``: top 100 as served by the API, from
+  the snapshot's cached row encodings; ``snapshot_rankings_json_cold`` is the
+  first request after a rebuild (sort and encode every ranked row),
+- ``list_companies_search``: ``GET /api/companies/?search=...``,
+- ``verify_token``: bearer token verification and user lookup,
+- ``home_page``: ``GET /`` rendered.
+
+Results (median and min seconds per call) are written as JSON. ``compare``
+exits non-zero when a case is slower than the baseline by more than
+``--threshold``.
+
+Timings only compare on the same machine, so there is no shared baseline:
+
+- ``compare --ref origin/main`` runs the suite on a checkout of the ref and
+  then on the working tree, in the same job (the option for CI runners),
+- ``run --save`` without a path records a baseline for this machine under
+  ``benchmarks/baselines/<machine id>.json``, which ``compare`` without a
+  baseline argument reads. A baseline recorded on another machine is refused
+  unless ``--any-machine`` is given.
+
+Usage:
+    python -m benchmarks.suite run [--sizes 100,1000,5000] [--repeat 5] [--save [PATH]]
+    python -m benchmarks.suite compare --ref origin/main [--threshold 0.25]
+    python -m benchmarks.suite compare [BASELINE.json] [--threshold 0.25]
+    python -m benchmarks.suite compare OLD.json NEW.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_SIZES = (100, 1000, 5000)
+DEFAULT_THRESHOLD = 0.25
+
+# Cases shorter than this are timed in loops so timer resolution doesn't dominate
+MIN_SAMPLE_SECONDS = 0.05
+
+
+def _timeit(fn, repeat: int) -> dict:
+    fn()  # warm caches, compile statements
+    number = 1
+    t0 = time.perf_counter()
+    fn()
+    once = time.perf_counter() - t0
+    if once < MIN_SAMPLE_SECONDS:
+        number = max(1, int(MIN_SAMPLE_SECONDS / max(once, 1e-6)))
+
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return {"median": statistics.median(samples), "min": min(samples), "calls": number * repeat}
+
+
+def _cold_rankings_json(snap, strategy: str) -> bytes:
+    snap._ranked.pop(strategy, None)
+    snap._encoded.pop(strategy, None)
+    return snap.rankings_json(strategy, limit=100)
+
+
+def _ok(response):
+    response.raise_for_status()
+    return response
+
+
+def run_size(size: int, repeat: int) -> dict:
+    """Run every case against a universe of ``size`` companies (worker process)."""
+    from fastapi.security import HTTPAuthorizationCredentials
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session
+
+    from app.database import create_db_and_tables, engine, read_engine
+    from app.main import app
+    from app.models import User
+    from app.services import data_import
+    from app.services.auth import create_access_token, get_current_user
+    from app.services.data_sources.replay import ReplaySource
+    from app.services.rankings import STRATEGIES, get_rankings
+    from app.services.seed_data import seed_database
+    from app.services.snapshot import build_snapshot
+    from app.services.synthetic import seed_synthetic
+
+    create_db_and_tables()
+    with Session(engine) as db:
+        seed_synthetic(db, companies=size, days=1)
+        data_import.compute_rankings(db)
+        user = User(email="bench@example.com", password_hash="-")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        token = create_access_token(user)
+
+    source = ReplaySource.synthetic(size)
+    symbols = list(source.infos)
+    results = {}
+
+    def case(name: str, fn) -> None:
+        results[f"{name}[{size}]"] = _timeit(fn, repeat)
+
+    with Session(engine) as db:
+        case("fetch_and_store", lambda: data_import.fetch_and_store(db, symbols, source))
+        case("seed_database", lambda: seed_database(db))
+        case("compute_rankings", lambda: data_import.compute_rankings(db, low_memory=False))
+        case("compute_rankings_low_memory", lambda: data_import.compute_rankings(db, low_memory=True))
+
+    with Session(read_engine) as db:
+        for strategy in STRATEGIES:
+            case(f"get_rankings[{strategy}]", lambda s=strategy: get_rankings(db, s, limit=100))
+        case("build_snapshot", lambda: build_snapshot(db))
+        snap = build_snapshot(db)
+        for strategy in STRATEGIES:
+            case(f"snapshot_rankings_json[{strategy}]", lambda s=strategy: snap.rankings_json(s, limit=100))
+            case(f"snapshot_rankings_json_cold[{strategy}]", lambda s=strategy: _cold_rankings_json(snap, s))
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        case("verify_token", lambda: get_current_user(credentials, db))
+
+    with TestClient(app) as client:
+        headers = {"Authorization": f"Bearer {token}"}
+        case("list_companies_search", lambda: _ok(client.get("/api/companies/?search=SYN0001", headers=headers)))
+        case("home_page", lambda: _ok(client.get("/")))
+    return results
+
+
+def machine_id() -> str:
+    """Identifies where timings were taken: host, CPU architecture and Python."""
+    raw = f"{platform.node()}-{platform.machine()}-py{platform.python_version()}"
+    return re.sub(r"[^A-Za-z0-9.]+", "-", raw).strip("-").lower()
+
+
+def run(sizes, repeat: int, cwd: Path | None = None) -> dict:
+    """Run the suite; ``cwd`` is the source tree to benchmark (default: this one)."""
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{tmp}/bench.db",
+                "DATABASE_READ_URL": "",
+                "METRICS_DIR": "",
+                "TRACE_EXPORTER": "",
+            }
+            print(f"Running {size} companies...", file=sys.stderr)
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.suite", "_worker", "--size", str(size), "--repeat", str(repeat)],
+                env=env, check=True, capture_output=True, text=True, cwd=cwd,
+            ).stdout
+            results.update(json.loads(out.strip().splitlines()[-1]))
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()} {platform.node()}",
+            "machine_id": machine_id(),
+            "commit": _git_commit(cwd),
+            "sizes": list(sizes),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def _git_commit(cwd: Path | None = None):
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True, cwd=cwd,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_ref(ref: str, sizes, repeat: int) -> dict:
+    """Run the suite on a temporary git worktree of ``ref``."""
+    tmp = Path(tempfile.mkdtemp(prefix="stocker-bench-"))
+    tree = tmp / "tree"
+    subprocess.run(["git", "worktree", "add", "--detach", str(tree), ref], check=True, capture_output=True)
+    try:
+        print(f"Baseline: {ref}", file=sys.stderr)
+        return run(sizes, repeat, cwd=tree)
+    finally:
+        subprocess.run(["git", "worktree", "remove", "--force", str(tree)], capture_output=True)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Print a comparison table; return the cases slower than ``threshold``."""
+    regressions = []
+    print(f"{'case':<60} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            continue
+        change = now["median"] / base["median"] - 1 if base["median"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<60} {base['median'] * 1000:>12.3f} {now['median'] * 1000:>12.3f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    print(f"{'case':<60} {'median ms':>12} {'min ms':>12}")
+    for name, r in results["results"].items():
+        print(f"{name:<60} {r['median'] * 1000:>12.3f} {r['min'] * 1000:>12.3f}")
+
+
+def _sizes(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the suite and print (and optionally save) results")
+    p_run.add_argument("--sizes", type=_sizes, default=list(DEFAULT_SIZES))
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--save", metavar="PATH", nargs="?", const="",
+                       help="Write results JSON here (default: this machine's baseline)")
+
+    p_cmp = sub.add_parser("compare", help="Compare against a baseline; exit 1 on regressions")
+    p_cmp.add_argument("baseline", nargs="?", help="Baseline results file (default: this machine's baseline)")
+    p_cmp.add_argument("current", nargs="?", help="Results file (default: run the suite now)")
+    p_cmp.add_argument("--ref", help="Instead of a file, benchmark this git ref first in the same job")
+    p_cmp.add_argument("--sizes", type=_sizes, help="Sizes to run with --ref (default: 100,1000,5000)")
+    p_cmp.add_argument("--any-machine", action="store_true",
+                       help="Compare against a baseline recorded on another machine")
+    p_cmp.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help="Allowed slowdown of the median, as a fraction (default: 0.25)")
+    p_cmp.add_argument("--repeat", type=int, default=5)
+    p_cmp.add_argument("--save", metavar="PATH", help="Write the new results JSON here")
+
+    p_worker = sub.add_parser("_worker")
+    p_worker.add_argument("--size", type=int, required=True)
+    p_worker.add_argument("--repeat", type=int, required=True)
+
+    args = parser.parse_args()
+
+    if args.command == "_worker":
+        print(json.dumps(run_size(args.size, args.repeat)))
+        return
+
+    if args.command == "run":
+        results = run(args.sizes, args.repeat)
+        print_results(results)
+    elif args.ref:
+        sizes = args.sizes or list(DEFAULT_SIZES)
+        baseline = run_ref(args.ref, sizes, args.repeat)
+        results = run(sizes, args.repeat)
+        regressions = compare(baseline, results, args.threshold)
+    else:
+        path = Path(args.baseline) if args.baseline else BASELINE_DIR / f"{machine_id()}.json"
+        if not path.exists():
+            parser.error(f"No baseline at {path}: record one with 'run --save' or use --ref")
+        baseline = json.loads(path.read_text())
+        if args.current:
+            results = json.loads(Path(args.current).read_text())
+        else:
+            recorded_on = baseline["meta"].get("machine_id")
+            if recorded_on != machine_id() and not args.any_machine:
+                parser.error(
+                    f"{path} was recorded on {recorded_on or baseline['meta'].get('machine')}, not "
+                    f"{machine_id()}; timings don't compare across machines (use --ref or --any-machine)"
+                )
+            results = run(baseline["meta"]["sizes"], args.repeat)
+        regressions = compare(baseline, results, args.threshold)
+
+    if args.save == "":
+        args.save = str(BASELINE_DIR / f"{machine_id()}.json")
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved {args.save}", file=sys.stderr)
+
+    if args.command == "compare" and regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Baseline schema: companies, financial data, users and ranking generations
+
+Revision ID: 2b5e8d0c4f17
+Revises: None
+Create Date: 2026-10-19 10:00:00
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '2b5e8d0c4f17'
+down_revision = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Tables as they were before the first schema migration. Databases created by
+# create_db_and_tables() already have some or all of them, so each one is
+# only created when missing (ranking_* predate migrations on older databases).
+
+def _companies():
+    op.create_table(
+        'companies',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('sector', sa.String(length=100), nullable=True),
+        sa.Column('industry', sa.String(length=100), nullable=True),
+    )
+    op.create_index('ix_companies_symbol', 'companies', ['symbol'], unique=True)
+
+
+def _financial_data():
+    floats = (
+        'ask', 'book_value', 'market_cap', 'ebitda', 'pe_ratio_ttm', 'pe_ratio_ftm',
+        'eps_estimate_qtr', 'eps_estimate_current_year', 'eps_estimate_next_year',
+        'eps_estimate_next_quarter', 'peg_ratio', 'garp_ratio', 'magic_formula_trailing',
+        'magic_formula_future', 'return_on_assets', 'return_on_equity', 'dividend_yield',
+        'net_income', 'total_assets', 'change_year_low_per', 'change_year_high_per',
+        'one_yr_target_price',
+    )
+    ranks = (
+        'ebitda', 'pe_ratio_ttm', 'pe_ratio_ftm', 'eps_estimate_qtr', 'peg_ratio', 'garp_ratio',
+        'return_on_assets', 'return_on_equity', 'dividend_yield', 'change_year_low_per',
+        'change_year_high_per', 'magic_formula_trailing', 'magic_formula_future',
+    )
+    op.create_table(
+        'financial_data',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('record_date', sa.Date(), nullable=True),
+        *[sa.Column(name, sa.Float(), nullable=True) for name in floats],
+        *[sa.Column(f'rank_{name}', sa.Integer(), nullable=True) for name in ranks],
+        sqlite_autoincrement=True,
+    )
+    op.create_index('ix_financial_data_symbol', 'financial_data', ['symbol'])
+    op.create_index('ix_financial_data_record_date', 'financial_data', ['record_date'])
+
+
+def _users():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+
+def _ranking_generations():
+    op.create_table(
+        'ranking_generations',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('record_date', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_ranking_generations_record_date', 'ranking_generations', ['record_date'])
+
+
+def _ranking_state():
+    op.create_table(
+        'ranking_state',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('generation_id', sa.Integer(), sa.ForeignKey('ranking_generations.id'), nullable=True),
+    )
+
+
+def _ranking_rows():
+    ranks = (
+        'magic_formula_trailing', 'magic_formula_future', 'ebitda', 'pe_ratio_ttm', 'pe_ratio_ftm',
+        'garp_ratio', 'return_on_assets', 'return_on_equity', 'dividend_yield',
+    )
+    op.create_table(
+        'ranking_rows',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('generation_id', sa.Integer(), sa.ForeignKey('ranking_generations.id'), nullable=False),
+        # No FK: the row may be rotated into an archive partition
+        sa.Column('financial_data_id', sa.Integer(), nullable=False),
+        sa.Column('company_id', sa.Integer(), sa.ForeignKey('companies.id'), nullable=False),
+        sa.Column('symbol', sa.String(length=20), nullable=False),
+        sa.Column('magic_formula_trailing', sa.Float(), nullable=True),
+        sa.Column('magic_formula_future', sa.Float(), nullable=True),
+        *[sa.Column(f'rank_{name}', sa.Integer(), nullable=True) for name in ranks],
+    )
+    op.create_index('ix_ranking_rows_generation_id', 'ranking_rows', ['generation_id'])
+
+
+# In dependency order
+_TABLES = (
+    ('companies', _companies),
+    ('financial_data', _financial_data),
+    ('users', _users),
+    ('ranking_generations', _ranking_generations),
+    ('ranking_state', _ranking_state),
+    ('ranking_rows', _ranking_rows),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, create in _TABLES:
+        if not inspector.has_table(name):
+            create()
+
+
+def downgrade():
+    # Dropping the baseline would drop all data: leave the tables in place
+    pass
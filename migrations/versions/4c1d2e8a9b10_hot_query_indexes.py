@@ -0,0 +1,73 @@
+"""One financial_data row per company and day; indexes for hot queries
+
+Revision ID: 4c1d2e8a9b10
+Revises: 2b5e8d0c4f17
+Create Date: 2026-10-19 10:30:00
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4c1d2e8a9b10'
+down_revision = '2b5e8d0c4f17'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# Duplicates are repointed and deleted this many at a time
+BATCH_SIZE = 5000
+
+
+def upgrade():
+    # ranking_rows are repointed by financial_data_id below
+    op.create_index(
+        'ix_ranking_rows_financial_data_id', 'ranking_rows', ['financial_data_id'],
+        if_not_exists=True,
+    )
+
+    # Keep the newest row of each duplicated (company, day) and point ranking
+    # rows at it before the unique index is created
+    op.execute(
+        "CREATE TEMPORARY TABLE fd_keep AS "
+        "SELECT company_id, record_date, max(id) AS keep_id FROM financial_data "
+        "WHERE record_date IS NOT NULL "
+        "GROUP BY company_id, record_date HAVING count(*) > 1"
+    )
+    op.execute(
+        "CREATE TEMPORARY TABLE fd_dup AS "
+        "SELECT f.id AS id, k.keep_id AS keep_id FROM financial_data f "
+        "JOIN fd_keep k ON k.company_id = f.company_id AND k.record_date = f.record_date "
+        "WHERE f.id <> k.keep_id"
+    )
+    bind = op.get_bind()
+    after = 0
+    while True:
+        batch = bind.execute(
+            sa.text("SELECT id, keep_id FROM fd_dup WHERE id > :after ORDER BY id LIMIT :n"),
+            {"after": after, "n": BATCH_SIZE},
+        ).all()
+        if not batch:
+            break
+        bind.execute(
+            sa.text("UPDATE ranking_rows SET financial_data_id = :keep_id WHERE financial_data_id = :id"),
+            [{"id": id_, "keep_id": keep_id} for id_, keep_id in batch],
+        )
+        bind.execute(
+            sa.text("DELETE FROM financial_data WHERE id IN (SELECT id FROM fd_dup WHERE id > :after AND id <= :last)"),
+            {"after": after, "last": batch[-1][0]},
+        )
+        after = batch[-1][0]
+    op.execute("DROP TABLE fd_dup")
+    op.execute("DROP TABLE fd_keep")
+
+    op.create_index(
+        'uq_financial_data_company_date', 'financial_data', ['company_id', 'record_date'],
+        unique=True, if_not_exists=True,
+    )
+    op.create_index('ix_companies_sector', 'companies', ['sector'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_companies_sector', table_name='companies', if_exists=True)
+    op.drop_index('ix_ranking_rows_financial_data_id', table_name='ranking_rows', if_exists=True)
+    op.drop_index('uq_financial_data_company_date', table_name='financial_data', if_exists=True)
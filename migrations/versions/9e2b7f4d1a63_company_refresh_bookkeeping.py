@@ -0,0 +1,41 @@
+"""Tiered refresh bookkeeping on companies
+
+Revision ID: 9e2b7f4d1a63
+Revises: 4c1d2e8a9b10
+Create Date: 2026-10-19 14:00:00
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '9e2b7f4d1a63'
+down_revision = '4c1d2e8a9b10'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+_COLUMNS = (
+    ('fundamentals_fetched_at', sa.DateTime()),
+    ('next_earnings_date', sa.Date()),
+)
+
+
+def _existing():
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns('companies')}
+
+
+def upgrade():
+    # Databases created by create_db_and_tables() already have the columns
+    existing = _existing()
+    with op.batch_alter_table('companies') as batch_op:
+        for name, type_ in _COLUMNS:
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, type_, nullable=True))
+
+
+def downgrade():
+    existing = _existing()
+    with op.batch_alter_table('companies') as batch_op:
+        for name, _ in reversed(_COLUMNS):
+            if name in existing:
+                batch_op.drop_column(name)
@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# app.database builds its engines at import time from DATABASE_URL, so point
+# it at a throwaway SQLite file before any app module is imported.
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='stocker-test-'), 'test.db')}",
+)
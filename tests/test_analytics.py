@@ -0,0 +1,105 @@
+import datetime
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.config import settings
+from app.models import Company, FinancialData
+from app.services import analytics
+
+HAS_DUCKDB = importlib.util.find_spec("duckdb") is not None
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+LATEST = datetime.date(2026, 3, 31)
+
+
+def sqlite_extension_installed() -> bool:
+    if not HAS_DUCKDB:
+        return False
+    import duckdb
+
+    with duckdb.connect() as con:
+        return bool(con.execute(
+            "SELECT installed FROM duckdb_extensions() WHERE extension_name = 'sqlite_scanner'"
+        ).fetchone()[0])
+
+
+@unittest.skipUnless(HAS_DUCKDB, "duckdb not installed")
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.url = f"sqlite:///{os.path.join(self.tmp.name, 'analytics.db')}"
+        engine = create_engine(self.url)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as db:
+            for symbol, sector, pe in (("AAA", "Tech", 10.0), ("BBB", "Tech", 30.0), ("CCC", "Energy", 8.0)):
+                company = Company(symbol=symbol, name=symbol, sector=sector)
+                db.add(company)
+                db.commit()
+                for days in (0, 1):
+                    db.add(FinancialData(
+                        company_id=company.id, symbol=symbol, record_date=LATEST - datetime.timedelta(days=days),
+                        pe_ratio_ttm=pe, market_cap=1e9,
+                    ))
+            db.commit()
+        engine.dispose()
+        analytics.reset()
+        self.addCleanup(analytics.reset)
+
+    def check_sector_summary(self):
+        sectors = {row["sector"]: row for row in analytics.sector_summary()}
+        self.assertEqual(sectors["Tech"]["companies"], 2)
+        self.assertEqual(sectors["Tech"]["median_pe_ratio_ttm"], 20.0)
+        self.assertEqual(sectors["Energy"]["total_market_cap"], 1e9)
+        dist = analytics.metric_distribution("pe_ratio_ttm")
+        self.assertEqual([row["record_date"] for row in dist], [LATEST - datetime.timedelta(days=1), LATEST])
+
+    @unittest.skipUnless(sqlite_extension_installed(), "DuckDB sqlite extension not installed")
+    def test_sqlite_database(self):
+        with mock.patch.object(settings, "database_url", self.url):
+            self.check_sector_summary()
+            self.assertEqual(analytics.rank_history("AAA", "magic_formula_trailing"), [])
+
+    @unittest.skipIf(sqlite_extension_installed(), "DuckDB sqlite extension installed")
+    def test_missing_extension_is_not_downloaded(self):
+        with mock.patch.object(settings, "database_url", self.url):
+            with self.assertRaises(analytics.AnalyticsUnavailable):
+                analytics.sector_summary()
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_parquet_snapshots(self):
+        from app.services.snapshot_io import export_snapshot
+
+        out = os.path.join(self.tmp.name, "exports")
+        engine = create_engine(self.url)
+        with Session(engine) as db:
+            export_snapshot(db, out, "parquet")
+        engine.dispose()
+        with mock.patch.object(settings, "analytics_source", "parquet"), \
+                mock.patch.object(settings, "analytics_parquet_dir", out):
+            self.check_sector_summary()
+
+
+class TestReportCommand(unittest.TestCase):
+    def test_name_required(self):
+        from app import cli
+
+        for kind in ("metric", "rank-history"):
+            with self.subTest(kind=kind), \
+                    mock.patch("sys.argv", ["app.cli", "report", kind]), \
+                    mock.patch("sys.stderr"), \
+                    mock.patch.object(analytics, "metric_distribution") as metric, \
+                    mock.patch.object(analytics, "rank_history") as history:
+                with self.assertRaises(SystemExit) as cm:
+                    cli.main()
+                self.assertEqual(cm.exception.code, 2)
+                metric.assert_not_called()
+                history.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
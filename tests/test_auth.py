@@ -0,0 +1,49 @@
+import traceback
+import unittest
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.models import User
+from app.services.auth import create_access_token, get_current_user
+
+
+class TestGetCurrentUser(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        self.addCleanup(self.db.close)
+
+    def credentials(self, token: str) -> HTTPAuthorizationCredentials:
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def test_valid_token(self):
+        user = User(email="a@example.com", password_hash="-")
+        self.db.add(user)
+        self.db.commit()
+        self.db.refresh(user)
+        self.assertEqual(get_current_user(self.credentials(create_access_token(user)), self.db).id, user.id)
+
+    def test_bad_tokens_raise_fresh_exceptions(self):
+        raised = []
+        for _ in range(5):
+            with self.assertRaises(HTTPException) as ctx:
+                get_current_user(self.credentials("not-a-token"), self.db)
+            raised.append(ctx.exception)
+        self.assertEqual(len({id(e) for e in raised}), 5)
+        self.assertTrue(all(e.status_code == 401 for e in raised))
+        # Tracebacks don't accumulate frames across failed logins
+        depths = {len(traceback.extract_tb(e.__traceback__)) for e in raised}
+        self.assertEqual(len(depths), 1)
+
+    def test_unknown_user(self):
+        token = create_access_token(User(id=999, email="ghost@example.com", password_hash="-"))
+        with self.assertRaises(HTTPException) as ctx:
+            get_current_user(self.credentials(token), self.db)
+        self.assertEqual(ctx.exception.headers, {"WWW-Authenticate": "Bearer"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import datetime
+import os
+import unittest
+
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.models import Company, FinancialData
+from app.services.bulk_load import bulk_upsert_financials
+
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+class BulkLoadMixin:
+    url = None
+
+    def setUp(self):
+        self.engine = create_engine(self.url)
+        SQLModel.metadata.drop_all(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        self.company = Company(symbol="AAPL", name="Apple Inc.")
+        self.db.add(self.company)
+        self.db.commit()
+        self.db.refresh(self.company)
+
+    def tearDown(self):
+        self.db.close()
+        SQLModel.metadata.drop_all(self.engine)
+        self.engine.dispose()
+
+    def rows(self, days, pe):
+        start = datetime.date(2025, 1, 1)
+        return [
+            {
+                "company_id": self.company.id,
+                "symbol": "AAPL",
+                "record_date": start + datetime.timedelta(days=i),
+                "pe_ratio_ttm": pe,
+            }
+            for i in range(days)
+        ]
+
+    def test_insert_then_replace_keeps_one_row_per_day(self):
+        stats = bulk_upsert_financials(self.db, self.rows(10, 20.0), chunk_size=4)
+        self.assertEqual(stats["rows"], 10)
+        self.assertEqual(stats["inserted"], 10)
+
+        ids_before = set(self.db.exec(select(FinancialData.id)).all())
+        stats = bulk_upsert_financials(self.db, self.rows(12, 25.0), chunk_size=4)
+        self.assertEqual(stats["updated"], 10)
+        self.assertEqual(stats["inserted"], 2)
+
+        rows = self.db.exec(select(FinancialData)).all()
+        self.assertEqual(len(rows), 12)
+        self.assertTrue(all(r.pe_ratio_ttm == 25.0 for r in rows))
+        # Replaced rows keep their ids (ranking_rows reference them)
+        self.assertTrue(ids_before <= {r.id for r in rows})
+
+    def test_duplicate_keys_in_a_chunk_keep_the_last_row(self):
+        rows = self.rows(3, 20.0) + self.rows(2, 30.0)
+        stats = bulk_upsert_financials(self.db, rows, chunk_size=10)
+        self.assertEqual(stats["rows"], 5)
+        self.assertEqual(stats["inserted"], 3)
+
+        stored = self.db.exec(select(FinancialData).order_by(FinancialData.record_date)).all()
+        self.assertEqual([r.pe_ratio_ttm for r in stored], [30.0, 30.0, 20.0])
+
+
+class TestBulkLoadSQLite(BulkLoadMixin, unittest.TestCase):
+    url = "sqlite://"
+
+
+@unittest.skipUnless(TEST_POSTGRES_URL, "set TEST_POSTGRES_URL to run against PostgreSQL")
+class TestBulkLoadPostgres(BulkLoadMixin, unittest.TestCase):
+    url = (TEST_POSTGRES_URL or "").replace("postgresql://", "postgresql+psycopg://", 1)
@@ -0,0 +1,222 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.config import settings
+from app.models import Company, FinancialData
+from app.services.data_import import fetch_and_store
+from app.services.data_sources import (
+    QUOTE_KEYS,
+    DataSourceError,
+    ThrottledError,
+    TransientError,
+    fetch_infos,
+    fetch_quotes,
+    get_source,
+)
+from app.services.data_sources.base import DataSource, with_retries
+from app.services.data_sources.http_source import HTTPSource
+from app.services.data_sources.replay import RecordingSource, ReplaySource, synthetic_infos
+from app.services.data_sources.stub_server import StubQuoteServer
+
+
+class TestReplaySource(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+
+    def test_fetch_and_store_from_replay(self):
+        source = ReplaySource.synthetic(5)
+        symbols = list(source.infos) + ["UNKNOWN"]
+        with Session(self.engine) as db:
+            stats = fetch_and_store(db, symbols, source)
+            self.assertEqual(stats["succeeded"], 5)
+            self.assertEqual(stats["skipped"], 1)
+            self.assertEqual(stats["source"]["source"], "replay")
+            self.assertEqual(stats["source"]["requests"], 6)
+            self.assertEqual(len(db.exec(select(Company)).all()), 5)
+            self.assertEqual(len(db.exec(select(FinancialData)).all()), 5)
+
+    def test_failed_symbol_keeps_earlier_rows(self):
+        source = ReplaySource.synthetic(4)
+        symbols = list(source.infos)
+        # Not bindable: fails when this symbol's row is flushed
+        source.infos[symbols[2]]["marketCap"] = {"raw": 1}
+        with Session(self.engine) as db:
+            stats = fetch_and_store(db, symbols, source)
+            self.assertEqual((stats["succeeded"], stats["failed"]), (3, 1))
+        with Session(self.engine) as db:
+            stored = db.exec(select(FinancialData.symbol).order_by(FinancialData.symbol)).all()
+        self.assertEqual(stored, [symbols[0], symbols[1], symbols[3]])
+
+    def test_no_write_lock_held_while_fetching(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'import.db')}"
+            engine = create_engine(url)
+            SQLModel.metadata.create_all(engine)
+            # A second writer that fails at once if the import holds the lock
+            probe = create_engine(url, connect_args={"timeout": 0})
+            with probe.begin() as conn:
+                conn.exec_driver_sql("CREATE TABLE probe (x INTEGER)")
+            blocked = []
+
+            class Probing(ReplaySource):
+                def _fetch_info(self, symbol):
+                    try:
+                        with probe.begin() as conn:
+                            conn.exec_driver_sql("INSERT INTO probe VALUES (1)")
+                    except OperationalError:
+                        blocked.append(symbol)
+                    return super()._fetch_info(symbol)
+
+            source = Probing(ReplaySource.synthetic(30).infos)
+            with mock.patch.object(settings, "import_chunk_size", 10):
+                with Session(engine) as db:
+                    stats = fetch_and_store(db, list(source.infos), source)
+            probe.dispose()
+            engine.dispose()
+        self.assertEqual(stats["succeeded"], 30)
+        self.assertEqual(blocked, [])
+
+    def test_percent_columns_round_trip(self):
+        info = next(iter(synthetic_infos(3).values()))
+        source = ReplaySource({info["symbol"]: info})
+        with Session(self.engine) as db:
+            fetch_and_store(db, [info["symbol"]], source)
+            row = db.exec(select(FinancialData)).one()
+        if info["returnOnAssets"] is not None:
+            self.assertAlmostEqual(row.return_on_assets, info["returnOnAssets"] * 100)
+
+    def test_record_and_replay_file(self):
+        recording = RecordingSource(ReplaySource.synthetic(3))
+        symbols = list(recording.inner.infos)
+        for _ in fetch_infos(recording, symbols, concurrency=1):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fixtures.json")
+            recording.save(path)
+            with mock.patch.object(settings, "data_source_fixtures", path):
+                replay = get_source("replay")
+            self.assertEqual(sorted(replay.infos), sorted(symbols))
+            with open(path) as f:
+                self.assertEqual(json.load(f)[symbols[0]]["symbol"], symbols[0])
+
+    def test_replay_requires_fixtures(self):
+        with mock.patch.object(settings, "data_source_fixtures", ""):
+            with self.assertRaises(ValueError):
+                get_source("replay")
+
+
+class _Flaky(DataSource):
+    name = "flaky"
+
+    def __init__(self, failures: int, error=TransientError):
+        super().__init__()
+        self.failures = failures
+        self.error = error
+
+    def _fetch_info(self, symbol):
+        if self.failures:
+            self.failures -= 1
+            raise self.error("down", 0.0)
+        return {"symbol": symbol}
+
+
+class TestRetries(unittest.TestCase):
+    def test_transient_errors_are_retried(self):
+        source = _Flaky(2)
+        info = with_retries(source, lambda: source.fetch_info("A"), retries=2, backoff=0)
+        self.assertEqual(info, {"symbol": "A"})
+        self.assertEqual(source.retries, 2)
+
+    def test_gives_up_after_retries(self):
+        source = _Flaky(5, ThrottledError)
+        with self.assertRaises(ThrottledError):
+            with_retries(source, lambda: source.fetch_info("A"), retries=1, backoff=0)
+        self.assertEqual(source.throttled, 2)
+
+    def test_permanent_errors_are_not_retried(self):
+        class Broken(DataSource):
+            def _fetch_info(self, symbol):
+                raise DataSourceError("bad symbol")
+
+        source = Broken()
+        with self.assertRaises(DataSourceError):
+            with_retries(source, lambda: source.fetch_info("A"), retries=3, backoff=0)
+        self.assertEqual(source.requests, 1)
+
+    def test_concurrent_fetch_preserves_order(self):
+        source = ReplaySource({f"S{i}": {"symbol": f"S{i}"} for i in range(50)})
+        symbols = [f"S{i}" for i in range(50)]
+        results = list(fetch_infos(source, symbols, concurrency=4))
+        self.assertEqual([s for s, _, _ in results], symbols)
+        self.assertTrue(all(info["symbol"] == s for s, info, _ in results))
+
+
+class TestQuotes(unittest.TestCase):
+    def test_batches_by_source_limit(self):
+        source = ReplaySource.synthetic(250)
+        symbols = list(source.infos) + ["UNKNOWN"]
+        results = list(fetch_quotes(source, symbols, batch_size=500, concurrency=1))
+        self.assertEqual([s for s, _, _ in results], symbols)
+        self.assertEqual(source.requests, 3)
+        symbol, quote, error = results[0]
+        self.assertIsNone(error)
+        self.assertEqual(set(quote), set(QUOTE_KEYS) | {"symbol"})
+        self.assertEqual(quote["regularMarketPrice"], source.infos[symbol]["regularMarketPrice"])
+        self.assertIsNone(results[-1][1])
+
+    def test_fallback_is_per_symbol(self):
+        source = _Flaky(0)
+        results = list(fetch_quotes(source, ["A", "B", "C"], concurrency=2))
+        self.assertEqual([quote["symbol"] for _, quote, _ in results], ["A", "B", "C"])
+        self.assertEqual(source.requests, 3)
+
+
+class TestHTTPSource(unittest.TestCase):
+    infos = {"AAA": {"symbol": "AAA", "trailingPE": 12.5}}
+
+    def test_info_and_unknown_symbol(self):
+        with StubQuoteServer(self.infos) as server, HTTPSource(server.url) as source:
+            self.assertEqual(source.fetch_info("AAA")["trailingPE"], 12.5)
+            self.assertIsNone(source.fetch_info("ZZZ"))
+            self.assertEqual(server.stats["not_found"], 1)
+
+    def test_bulk_quotes(self):
+        infos = synthetic_infos(150)
+        with StubQuoteServer(infos) as server, HTTPSource(server.url) as source:
+            results = dict((s, q) for s, q, _ in fetch_quotes(source, list(infos) + ["ZZZ"]))
+            self.assertEqual(server.stats["requests"], 2)
+        self.assertIsNone(results.pop("ZZZ"))
+        self.assertEqual(len(results), 150)
+        self.assertTrue(all(q["marketCap"] == infos[s]["marketCap"] for s, q in results.items()))
+
+    def test_failed_quote_batch_fails_its_symbols(self):
+        with mock.patch.object(settings, "fetch_retries", 0):
+            with StubQuoteServer(self.infos, error_rate=1.0) as server, HTTPSource(server.url) as source:
+                results = list(fetch_quotes(source, ["AAA", "BBB"]))
+        self.assertTrue(all(isinstance(error, TransientError) for _, _, error in results))
+
+    def test_rate_limit_is_retried(self):
+        with StubQuoteServer(self.infos, rate_limit=20, burst=1) as server, HTTPSource(server.url) as source:
+            results = list(fetch_infos(source, ["AAA"] * 4, concurrency=1))
+            self.assertTrue(all(info is not None and error is None for _, info, error in results))
+            self.assertGreater(server.stats["throttled"], 0)
+            self.assertEqual(source.throttled, server.stats["throttled"])
+
+    def test_server_errors_fail_after_retries(self):
+        with mock.patch.object(settings, "fetch_backoff_seconds", 0.0):
+            with StubQuoteServer(self.infos, error_rate=1.0) as server, HTTPSource(server.url) as source:
+                [(_, info, error)] = fetch_infos(source, ["AAA"], concurrency=1)
+                self.assertIsNone(info)
+                self.assertIsInstance(error, TransientError)
+                self.assertEqual(server.stats["errors"], settings.fetch_retries + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import database
+from app.models import Company
+
+UPDATE = text("UPDATE companies SET name = 'changed' WHERE symbol = 'RO'")
+
+
+class TestReadOnlyEngines(unittest.TestCase):
+    """Read engines built like app.database's, against a file of their own."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "readonly.db")
+        writer = create_engine(f"sqlite:///{self.path}")
+        SQLModel.metadata.create_all(writer)
+        with Session(writer) as db:
+            db.add(Company(symbol="RO", name="Read Only"))
+            db.commit()
+        writer.dispose()
+        self.read_url = database.sqlite_read_url(self.path)
+
+    def test_app_read_engines_use_read_only_url(self):
+        if not database.is_sqlite:
+            self.skipTest("SQLite only")
+        self.assertIn("mode=ro", str(database.read_engine.url))
+        self.assertIn("mode=ro", str(database.async_engine.url))
+
+    def test_sync_engine(self):
+        engine = create_engine(self.read_url, connect_args={"check_same_thread": False})
+        self.addCleanup(engine.dispose)
+        with Session(engine) as db:
+            self.assertEqual(db.exec(select(Company.name).where(Company.symbol == "RO")).one(), "Read Only")
+            with self.assertRaises(OperationalError):
+                db.exec(UPDATE)
+
+    def test_async_engine(self):
+        url = database._async_url(self.read_url)
+        self.assertTrue(url.startswith("sqlite+aiosqlite:///file:"))
+
+        async def run():
+            engine = create_async_engine(url)
+            try:
+                async with AsyncSession(engine) as db:
+                    name = (await db.exec(select(Company.name).where(Company.symbol == "RO"))).one()
+                    try:
+                        await db.exec(UPDATE)
+                    except OperationalError as e:
+                        return name, e
+                    return name, None
+            finally:
+                await engine.dispose()
+
+        name, error = asyncio.run(run())
+        self.assertEqual(name, "Read Only")
+        self.assertIn("readonly", str(error).replace(" ", "").lower())
+
+
+if __name__ == "__main__":
+    unittest.main()
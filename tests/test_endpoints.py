@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models import User
+from app.services import export
+from app.services.auth import create_access_token
+
+
+class APITestCase(unittest.TestCase):
+    """Runs against the app's own (auto-seeded) test database as a signed-in user."""
+
+    @classmethod
+    def setUpClass(cls):
+        from app.main import app
+
+        cls.client = TestClient(app)
+        cls.client.__enter__()
+        with Session(engine) as db:
+            user = db.exec(select(User).where(User.email == "api@example.com")).first()
+            if user is None:
+                user = User(email="api@example.com", password_hash="-")
+                db.add(user)
+                db.commit()
+                db.refresh(user)
+            cls.headers = {"Authorization": f"Bearer {create_access_token(user)}"}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def get(self, url, **kwargs):
+        return self.client.get(url, headers=self.headers, **kwargs)
+
+
+class TestBatchEndpoints(APITestCase):
+    def test_company_batch_follows_request_order(self):
+        response = self.client.post(
+            "/api/companies/batch", headers=self.headers, json={"symbols": ["msft", "NOPE", "AAPL", "MSFT"]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["symbol"] for c in response.json()], ["MSFT", "AAPL"])
+
+    def test_company_batch_size_limit(self):
+        response = self.client.post("/api/companies/batch", headers=self.headers, json={"symbols": ["A"] * 201})
+        self.assertEqual(response.status_code, 422)
+
+    def test_rankings_for_several_strategies(self):
+        response = self.get("/api/rankings", params={"strategies": "ebitda,pe_ratio_ttm", "limit": 3})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(list(body), ["ebitda", "pe_ratio_ttm"])
+        self.assertEqual([e["rank"] for e in body["ebitda"]], [1, 2, 3])
+        self.assertEqual(self.get("/api/rankings", params={"strategies": "nope"}).status_code, 404)
+
+
+class TestProfileEndpoint(APITestCase):
+    def test_profile_ranks_every_strategy(self):
+        from app.services.rankings import STRATEGIES
+
+        response = self.get("/api/companies/aapl/profile")
+        self.assertEqual(response.status_code, 200)
+        profile = response.json()
+        self.assertEqual((profile["symbol"], profile["name"]), ("AAPL", "Apple Inc."))
+        self.assertEqual(set(profile["rankings"]), set(STRATEGIES))
+        ebitda = profile["rankings"]["ebitda"]
+        self.assertGreaterEqual(ebitda["universe"], ebitda["rank"])
+        self.assertGreater(profile["metrics"]["market_cap"], 0)
+
+    def test_unknown_symbol(self):
+        self.assertEqual(self.get("/api/companies/NOPE/profile").status_code, 404)
+
+
+class TestStreamingExport(APITestCase):
+    def test_financials_ndjson(self):
+        response = self.get("/api/export/financials", params={"symbols": "aapl,msft"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        self.assertIn('filename="financials.ndjson"', response.headers["content-disposition"])
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual({row["symbol"] for row in rows}, {"AAPL", "MSFT"})
+        self.assertEqual(tuple(rows[0]), export.FINANCIAL_COLUMNS)
+        legacy = [c for c in rows[0] if c.startswith(("rank_", "magic_formula_"))]
+        self.assertEqual(legacy, [])
+
+    def test_rankings_csv(self):
+        response = self.get("/api/export/rankings/ebitda", params={"format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        header, *rows = list(csv.reader(io.StringIO(response.text)))
+        self.assertEqual(tuple(header), export.RANKING_COLUMNS)
+        self.assertEqual(rows[0][header.index("rank")], "1")
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.get("/api/export/rankings/nope").status_code, 404)
+        params = {"as_of": "2026-01-02", "start": "2026-01-01"}
+        self.assertEqual(self.get("/api/export/financials", params=params).status_code, 422)
+
+    def test_encoders_yield_batches(self):
+        rows = [(i, f"S{i}") for i in range(5)]
+        with mock.patch.object(export, "EXPORT_BATCH_SIZE", 2):
+            ndjson = list(export.encode("ndjson", ("id", "symbol"), iter(rows)))
+            csv_chunks = list(export.encode("csv", ("id", "symbol"), iter(rows)))
+        self.assertEqual(len(ndjson), 3)
+        self.assertEqual(json.loads(ndjson[-1]), {"id": 4, "symbol": "S4"})
+        self.assertEqual(b"".join(csv_chunks).decode().splitlines(), ["id,symbol"] + [f"{i},S{i}" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services import metrics
+
+
+class TestRender(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        hist = metrics.Histogram("test_latency_seconds", "test", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            hist.observe(value, "/x")
+        text = metrics.render({hist.name: hist._dump()})
+
+        self.assertIn('test_latency_seconds_bucket{route="/x",le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{route="/x",le="1"} 3', text)
+        self.assertIn('test_latency_seconds_bucket{route="/x",le="+Inf"} 4', text)
+        self.assertIn('test_latency_seconds_count{route="/x"} 4', text)
+
+    def test_infinite_values(self):
+        gauge = metrics.Gauge("test_ratio", "test")
+        gauge.set(float("inf"))
+        self.assertIn("test_ratio +Inf", metrics.render({gauge.name: gauge._dump()}))
+        self.assertEqual(metrics._number(float("-inf")), "-Inf")
+        self.assertEqual(metrics._number(float("nan")), "NaN")
+
+
+class TestMultiprocess(unittest.TestCase):
+    def write(self, directory, pid, dump):
+        Path(directory, f"{pid}.json").write_text(json.dumps({"pid": pid, "metrics": dump}))
+
+    def test_files_are_merged_per_metric_type(self):
+        requests = metrics.Counter("test_requests_total", "test", ("route",))
+        in_flight = metrics.Gauge("test_in_flight", "test")
+        job = metrics.Gauge("test_job_rows", "test", mode="last")
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(settings, "metrics_dir", tmp):
+            with mock.patch.dict(metrics._registry, clear=True):
+                # An exited worker: its counter stays, its gauges are dropped
+                requests.inc(2, "/a")
+                in_flight.inc(3)
+                job.set(10)
+                self.write(tmp, 999_999_999, {m.name: m._dump() for m in (requests, in_flight, job)})
+
+                for metric in (requests, in_flight, job):
+                    metrics._register(metric)
+                    metric._values.clear()
+                requests.inc(1, "/a")
+                in_flight.inc(1)
+                job.set(20)
+
+                merged = metrics.collect()
+
+        self.assertEqual(merged["test_requests_total"]["samples"]["/a"], 3)
+        self.assertEqual(merged["test_in_flight"]["samples"][""], 1)
+        self.assertEqual(merged["test_job_rows"]["samples"][""][0], 20)
+
+
+    def test_dead_process_files_are_retired(self):
+        requests = metrics.Counter("test_requests_total", "test", ("route",))
+        job = metrics.Gauge("test_job_rows", "test", mode="last")
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(settings, "metrics_dir", tmp):
+            with mock.patch.dict(metrics._registry, clear=True):
+                requests.inc(2, "/a")
+                job.set(10)
+                self.write(tmp, 999_999_999, {m.name: m._dump() for m in (requests, job)})
+
+                self.assertEqual(metrics.prune(), 1)
+                self.assertEqual(sorted(p.name for p in Path(tmp).glob("*.json")), [metrics.LAST_FILE])
+
+                for metric in (requests, job):
+                    metrics._register(metric)
+                    metric._values.clear()
+                requests.inc(1, "/a")
+                merged = metrics.collect()
+                self.assertEqual(merged["test_requests_total"]["samples"]["/a"], 1)
+                self.assertEqual(merged["test_job_rows"]["samples"][""][0], 10)
+
+                # Exiting keeps the newest "last" gauges and removes this process's file
+                metrics.flush()
+                job.set(20)
+                metrics.retire()
+                self.assertEqual(sorted(p.name for p in Path(tmp).glob("*.json")), [metrics.LAST_FILE])
+                last = json.loads(Path(tmp, metrics.LAST_FILE).read_text())["metrics"]
+        self.assertEqual(list(last), ["test_job_rows"])
+        self.assertEqual(last["test_job_rows"]["samples"][""][0], 20)
+
+
+class TestEndpoint(unittest.TestCase):
+    def test_metrics_endpoint_labels_routes_by_template(self):
+        from app.main import app
+
+        with TestClient(app) as client:
+            client.get("/api/rankings/strategies")
+            client.get("/api/companies/AAPL")
+            text = client.get("/metrics").text
+
+        self.assertIn('http_requests_total{method="GET",route="/api/companies/{symbol}"', text)
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="/api/rankings/strategies"', text)
+        self.assertIn("job_last_rows", text)
+        self.assertIn("financial_data_latest_record_age_seconds", text)
+        self.assertIn('db_pool_connections{engine="writer"', text)
+        self.assertIn('db_pool_connections{engine="async"', text)
+
+    def test_route_match_is_cached(self):
+        from app.main import app
+
+        metrics._match_route.cache_clear()
+        with TestClient(app) as client:
+            for _ in range(3):
+                client.get("/api/companies/AAPL")
+        info = metrics._match_route.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertGreaterEqual(info.hits, 2)
@@ -0,0 +1,96 @@
+import datetime
+import unittest
+from unittest import mock
+
+from sqlalchemy import func, inspect
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.config import settings
+from app.models import Company, FinancialData, RankingGeneration, RankingRow
+from app.services.bulk_load import bulk_upsert_financials
+from app.services.export import iter_financials, iter_rankings
+from app.services.partitions import financial_history, rotate_partitions
+
+LATEST = datetime.date(2026, 3, 31)
+
+
+class TestPartitionsSQLite(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(settings, "partitioning", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        self.company = Company(symbol="AAPL", name="Apple Inc.")
+        self.db.add(self.company)
+        self.db.commit()
+        self.db.refresh(self.company)
+        self.load(900, pe=20.0)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def load(self, days, pe, start=0):
+        bulk_upsert_financials(self.db, [
+            {
+                "company_id": self.company.id,
+                "symbol": "AAPL",
+                "record_date": LATEST - datetime.timedelta(days=i),
+                "pe_ratio_ttm": pe,
+            }
+            for i in range(start, days)
+        ])
+
+    def test_rotation_moves_old_dates_into_yearly_tables(self):
+        stats = rotate_partitions(self.db, hot_days=100)
+
+        self.assertEqual(stats["rows"], 900 - 101)
+        self.assertEqual(stats["partitions"], [2023, 2024, 2025])
+        self.assertIn("financial_data_y2024", inspect(self.engine).get_table_names())
+
+        hot = self.db.exec(select(func.count()).select_from(FinancialData)).one()
+        self.assertEqual(hot, 101)
+        self.assertEqual(self.db.exec(select(func.max(FinancialData.record_date))).one(), LATEST)
+
+        history = financial_history()
+        self.assertEqual(self.db.exec(select(func.count(history.id))).one(), 900)
+        self.assertEqual(len(list(iter_financials(self.db))), 900)
+
+    def test_reimported_dates_replace_archived_rows(self):
+        rotate_partitions(self.db, hot_days=100)
+        self.load(300, pe=30.0, start=200)
+        rotate_partitions(self.db, hot_days=100)
+
+        history = financial_history()
+        rows = self.db.exec(select(history.record_date, history.pe_ratio_ttm)).all()
+        self.assertEqual(len(rows), 900)
+        replaced = [pe for d, pe in rows if (LATEST - d).days in range(200, 300)]
+        self.assertEqual(set(replaced), {30.0})
+
+    def test_historical_rankings_follow_rotated_rows(self):
+        old = self.db.exec(
+            select(FinancialData).where(FinancialData.record_date == datetime.date(2024, 6, 3))
+        ).one()
+        gen = RankingGeneration(record_date=old.record_date, row_count=1, published_at=datetime.datetime.utcnow())
+        self.db.add(gen)
+        self.db.commit()
+        self.db.add(RankingRow(
+            generation_id=gen.id, financial_data_id=old.id, company_id=self.company.id,
+            symbol="AAPL", rank_pe_ratio_ttm=1,
+        ))
+        self.db.commit()
+
+        record_date = old.record_date
+        rotate_partitions(self.db, hot_days=100)
+        rows = list(iter_rankings(self.db, "pe_ratio_ttm", as_of=record_date))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][0], record_date)
+        self.assertEqual(rows[0][4], 20.0)
+
+    def test_rotation_requires_partitioning(self):
+        with mock.patch.object(settings, "partitioning", False):
+            with self.assertRaises(RuntimeError):
+                rotate_partitions(self.db)
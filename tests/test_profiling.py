@@ -0,0 +1,71 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services.profiling import StackSampler, cprofile
+
+
+class TestStackSampler(unittest.TestCase):
+    def test_samples_busy_threads(self):
+        sampler = StackSampler(interval=0.001).start()
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        sampler.stop()
+        self.assertIn("test_samples_busy_threads", sampler.folded())
+
+    def test_cprofile_writes_pstats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.prof")
+            with cprofile(path):
+                sum(range(1000))
+            self.assertTrue(os.path.getsize(path) > 0)
+
+
+class TestProfilingMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        for name, value in (("profiling_token", "secret"), ("profile_dir", self.tmp.name)):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_only_requests_with_token_are_profiled(self):
+        from app.main import app
+
+        with TestClient(app) as client:
+            plain = client.get("/health")
+            self.assertNotIn("X-Profile-Artifact", plain.headers)
+            wrong = client.get("/health", headers={"X-Profile-Token": "nope"})
+            self.assertNotIn("X-Profile-Artifact", wrong.headers)
+
+            profiled = client.get("/health", headers={"X-Profile-Token": "secret"})
+            self.assertEqual(profiled.status_code, 200)
+            name = profiled.headers["X-Profile-Artifact"]
+            self.assertTrue(os.path.isfile(os.path.join(self.tmp.name, name)))
+
+            url = f"/api/debug/profiles/{name}"
+            self.assertEqual(client.get(url).status_code, 404)
+            self.assertEqual(client.get(url, headers={"X-Profile-Token": "secret"}).status_code, 200)
+            self.assertEqual(
+                client.get("/api/debug/profiles/..%2Fetc", headers={"X-Profile-Token": "secret"}).status_code,
+                404,
+            )
+
+    def test_artifact_names_are_unique(self):
+        from app.main import app
+
+        with TestClient(app) as client:
+            names = {
+                client.get("/health", headers={"X-Profile-Token": "secret"}).headers["X-Profile-Artifact"]
+                for _ in range(3)
+            }
+        self.assertEqual(len(names), 3)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 3)
+        self.assertTrue(all(f"-{os.getpid()}-" in name for name in names))
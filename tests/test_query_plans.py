@@ -0,0 +1,194 @@
+"""
+Query plan audit for the hot queries in app/services and app/routers.
+
+Each statement is compiled for SQLite and run through EXPLAIN QUERY PLAN
+against a freshly created schema; a plain ``SCAN <table>`` (full table scan
+without an index) fails the test. Add new hot queries to ``HOT_QUERIES``.
+"""
+
+import datetime
+import logging
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, func, inspect
+from sqlmodel import SQLModel, select
+
+from app.models import Company, FinancialData, RankingRow, RankingState, User
+from app.services import bulk_load, companies, data_import, export, rankings, snapshot
+
+DAY = datetime.date(2026, 1, 2)
+TABLE_SCAN = re.compile(r"^SCAN (TABLE )?(\w+)$")
+MIGRATIONS_INI = os.path.join(os.path.dirname(__file__), os.pardir, "migrations", "alembic.ini")
+
+
+def _hot_queries():
+    all_strategies = {s: rankings._ranking_columns(s) for s in rankings.STRATEGIES}
+    return {
+        # data_import.fetch_and_store / seed_data.seed_database
+        "existing financial row": select(FinancialData).where(
+            FinancialData.company_id == 1, FinancialData.record_date == DAY
+        ),
+        "company by symbol": select(Company).where(Company.symbol == "AAPL"),
+        # compute_rankings, pages.home
+        "latest record date": select(func.max(FinancialData.record_date)),
+        "ranking inputs": data_import._ranking_inputs(DAY),
+        "ranking inputs chunk": data_import._ranking_inputs(DAY).where(FinancialData.id > 100).limit(500),
+        "prune generations": data_import._stale_generations_statement(5),
+        # bulk_load._existing_ids
+        "existing ids for chunk": bulk_load._existing_statement(DAY, [1, 2, 3]),
+        # rankings / snapshot
+        "rankings": rankings._rankings_statement("magic_formula_trailing", 100),
+        "rankings multi": rankings._rankings_multi_statement(all_strategies, 25),
+        "snapshot": snapshot._snapshot_statement(),
+        "current generation": select(RankingState.generation_id).where(RankingState.id == 1),
+        # retention / partitions
+        "ranking rows for financial rows": select(RankingRow.id).where(
+            RankingRow.financial_data_id.in_([1, 2, 3])
+        ),
+        "financial rows for date": select(FinancialData.id).where(FinancialData.record_date == DAY),
+        # export.iter_financials
+        "financials as of": export._financials_statement(DAY, None, None, None),
+        "financials range": export._financials_statement(None, DAY, DAY, ["AAPL"]),
+        # companies
+        "companies by sector": companies._list_statement("Technology", None, 0, 50),
+        "companies page": companies._list_statement(None, None, 0, 50),
+        "companies batch": companies._symbol_statement(["AAPL", "MSFT"]),
+        # auth
+        "user by email": select(User).where(User.email == "a@example.com"),
+        "user by id": select(User).where(User.id == 1),
+    }
+
+
+class TestQueryPlans(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def plan(self, statement) -> list[str]:
+        sql = str(statement.compile(self.engine, compile_kwargs={"literal_binds": True}))
+        with self.engine.connect() as conn:
+            return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+    def test_hot_queries_use_indexes(self):
+        for name, statement in _hot_queries().items():
+            with self.subTest(name):
+                plan = self.plan(statement)
+                scans = [m.group(2) for m in map(TABLE_SCAN.match, plan) if m]
+                self.assertEqual(scans, [], f"{name} regressed to a table scan: {plan}")
+
+
+class TestIndexMigration(unittest.TestCase):
+    def upgrade(self, url):
+        config = Config(MIGRATIONS_INI)
+        config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+        command.upgrade(config, "head")
+
+    def test_upgrade_dedupes_and_creates_unique_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'legacy.db')}"
+            engine = create_engine(url)
+            SQLModel.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.exec_driver_sql("DROP INDEX uq_financial_data_company_date")
+                conn.exec_driver_sql("INSERT INTO companies (id, symbol) VALUES (1, 'AAPL')")
+                for fd_id in (1, 2, 3):
+                    conn.exec_driver_sql(
+                        "INSERT INTO financial_data (id, company_id, symbol, record_date) "
+                        f"VALUES ({fd_id}, 1, 'AAPL', '2026-01-02')"
+                    )
+                conn.exec_driver_sql(
+                    "INSERT INTO ranking_generations (id, record_date, created_at, row_count) "
+                    "VALUES (1, '2026-01-02', '2026-01-02', 1)"
+                )
+                conn.exec_driver_sql(
+                    "INSERT INTO ranking_rows (generation_id, financial_data_id, company_id, symbol) "
+                    "VALUES (1, 1, 1, 'AAPL')"
+                )
+
+            self.upgrade(url)
+
+            with engine.connect() as conn:
+                self.assertEqual(conn.exec_driver_sql("SELECT id FROM financial_data").all(), [(3,)])
+                self.assertEqual(conn.exec_driver_sql("SELECT financial_data_id FROM ranking_rows").all(), [(3,)])
+            indexes = {i["name"]: i for i in inspect(engine).get_indexes("financial_data")}
+            self.assertTrue(indexes["uq_financial_data_company_date"]["unique"])
+            engine.dispose()
+
+
+    def test_upgrade_empty_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'empty.db')}"
+            self.upgrade(url)
+            engine = create_engine(url)
+            tables = set(inspect(engine).get_table_names())
+            engine.dispose()
+        self.assertLessEqual(
+            {"companies", "financial_data", "users", "ranking_generations", "ranking_rows", "ranking_state"},
+            tables,
+        )
+
+    def test_upgrade_database_without_ranking_tables(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'pre_rankings.db')}"
+            engine = create_engine(url)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(
+                    "CREATE TABLE companies (id INTEGER PRIMARY KEY, symbol VARCHAR(20) NOT NULL, "
+                    "name VARCHAR(255), sector VARCHAR(100), industry VARCHAR(100))"
+                )
+                conn.exec_driver_sql(
+                    "CREATE TABLE financial_data (id INTEGER PRIMARY KEY, company_id INTEGER NOT NULL, "
+                    "symbol VARCHAR(20) NOT NULL, record_date DATE, ask FLOAT)"
+                )
+                conn.exec_driver_sql("INSERT INTO companies (id, symbol) VALUES (1, 'AAPL')")
+                for fd_id in (1, 2):
+                    conn.exec_driver_sql(
+                        "INSERT INTO financial_data (id, company_id, symbol, record_date) "
+                        f"VALUES ({fd_id}, 1, 'AAPL', '2026-01-02')"
+                    )
+
+            self.upgrade(url)
+
+            with engine.connect() as conn:
+                self.assertEqual(conn.exec_driver_sql("SELECT id FROM financial_data").all(), [(2,)])
+                self.assertEqual(conn.exec_driver_sql("SELECT count(*) FROM ranking_rows").scalar(), 0)
+            self.assertIn("next_earnings_date", {c["name"] for c in inspect(engine).get_columns("companies")})
+            engine.dispose()
+
+    def test_startup_migrations_add_company_columns(self):
+        from sqlmodel import Session
+
+        from app import database
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # "%" in the URL must survive alembic's ConfigParser interpolation
+            url = f"sqlite:///{os.path.join(tmp, 'before_refresh%40.db')}"
+            engine = create_engine(url)
+            SQLModel.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.exec_driver_sql("ALTER TABLE companies DROP COLUMN next_earnings_date")
+                conn.exec_driver_sql("ALTER TABLE companies DROP COLUMN fundamentals_fetched_at")
+                conn.exec_driver_sql("INSERT INTO companies (id, symbol) VALUES (1, 'AAPL')")
+
+            root = logging.getLogger()
+            self.addCleanup(root.setLevel, root.level)
+            root.setLevel(logging.INFO)
+            with mock.patch.object(database, "database_url", url):
+                database.run_migrations()
+                database.run_migrations()  # already at head
+            # alembic.ini's logging config (root at WARN) isn't applied
+            self.assertEqual(root.level, logging.INFO)
+
+            with Session(engine) as db:
+                company = db.exec(select(Company)).one()
+            self.assertIsNone(company.next_earnings_date)
+            engine.dispose()
@@ -0,0 +1,67 @@
+import datetime
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.config import settings
+from app.models import Company, FinancialData
+from app.services.data_import import compute_rankings
+from app.services.query_stats import NPlusOneDetected, instrument, track_queries
+from app.services.rankings import STRATEGIES, get_rankings_multi
+
+
+class TestQueryStats(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        instrument(self.engine)
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        today = datetime.date(2026, 1, 2)
+        for i in range(20):
+            company = Company(symbol=f"SYM{i}", name=f"Company {i}", sector="Technology")
+            self.db.add(company)
+            self.db.flush()
+            self.db.add(FinancialData(
+                company_id=company.id, symbol=company.symbol, record_date=today,
+                pe_ratio_ttm=10.0 + i, return_on_assets=5.0 + i, ebitda=1e9 * (i + 1),
+            ))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_counts_and_times_statements(self):
+        with track_queries() as stats:
+            self.db.exec(select(Company)).all()
+            self.db.exec(select(FinancialData)).all()
+        self.assertEqual(stats.count, 2)
+        self.assertGreater(stats.seconds, 0)
+        self.assertEqual(len(stats.slowest), 2)
+
+    def test_detects_repeated_statements(self):
+        with self.assertRaises(NPlusOneDetected):
+            with track_queries(fail_on_repeats=True, threshold=5):
+                for i in range(20):
+                    self.db.exec(select(Company).where(Company.symbol == f"SYM{i}")).first()
+
+    def test_ranking_paths_have_no_n_plus_one(self):
+        with track_queries(fail_on_repeats=True, threshold=5):
+            compute_rankings(self.db)
+            get_rankings_multi(self.db, list(STRATEGIES), limit=10)
+
+
+class TestDebugHeaders(unittest.TestCase):
+    def test_headers_only_in_debug_mode(self):
+        from app.main import app
+
+        with TestClient(app) as client:
+            self.assertNotIn("X-DB-Query-Count", client.get("/").headers)
+            with mock.patch.object(settings, "debug", True):
+                response = client.get("/")
+                self.assertGreater(int(response.headers["X-DB-Query-Count"]), 0)
+                self.assertEqual(response.headers["X-DB-Repeated"], "0")
+                self.assertGreater(client.get("/api/debug/queries").json()["queries"], 0)
+            self.assertEqual(client.get("/api/debug/queries").status_code, 404)
@@ -0,0 +1,72 @@
+import datetime
+import unittest
+from unittest import mock
+
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.config import settings
+from app.models import Company, FinancialData, RankingRow
+from app.services import data_import
+from app.services.data_import import compute_rankings
+from app.services.rankings import RANK_COLUMNS
+
+SECTORS = ("Technology", "Energy", "Healthcare", "Financial Services", None)
+
+
+class TestLowMemoryRankings(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        today = datetime.date(2026, 1, 2)
+        for i in range(23):
+            company = Company(symbol=f"SYM{i}", name=f"Company {i}", sector=SECTORS[i % len(SECTORS)])
+            self.db.add(company)
+            self.db.flush()
+            self.db.add(FinancialData(
+                company_id=company.id, symbol=company.symbol, record_date=today,
+                # Ties, missing and non-positive values exercise every branch
+                pe_ratio_ttm=None if i % 7 == 0 else float(i % 5),
+                pe_ratio_ftm=float(i % 4) - 1,
+                return_on_assets=None if i % 6 == 0 else 1.0 + i % 3,
+                ebitda=1e9 * (i % 9),
+                dividend_yield=0.01 * i,
+            ))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def ranking_rows(self) -> dict:
+        columns = ("symbol", "financial_data_id", "magic_formula_trailing", "magic_formula_future") + RANK_COLUMNS
+        rows = self.db.exec(select(RankingRow)).all()
+        return {row.symbol: {c: getattr(row, c) for c in columns} for row in rows}
+
+    def test_low_memory_mode_matches_default(self):
+        self.assertEqual(compute_rankings(self.db, low_memory=False), 23)
+        expected = self.ranking_rows()
+
+        with mock.patch.object(settings, "rankings_chunk_size", 4):
+            self.assertEqual(compute_rankings(self.db, low_memory=True), 23)
+        self.assertEqual(self.ranking_rows(), expected)
+        self.assertIsNotNone(expected["SYM2"]["rank_magic_formula_trailing"])
+        self.assertIsNone(expected["SYM1"]["rank_magic_formula_trailing"])  # Energy
+
+    def test_setting_selects_mode(self):
+        with mock.patch.object(settings, "rankings_low_memory", True), \
+                mock.patch.object(data_import, "_load_rank_columns", wraps=data_import._load_rank_columns) as load:
+            self.assertEqual(compute_rankings(self.db), 23)
+        load.assert_called_once()
+
+
+class TestRankConfigs(unittest.TestCase):
+    def test_every_rank_is_stored(self):
+        columns = set(RankingRow.__table__.columns.keys())
+        for _, rank_attr, _ in data_import.RANK_CONFIGS:
+            self.assertIn(rank_attr, columns)
+        self.assertTrue(set(RANK_COLUMNS) <= columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
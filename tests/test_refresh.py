@@ -0,0 +1,136 @@
+import datetime
+import unittest
+from unittest import mock
+
+from sqlalchemy import update
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.models import Company, FinancialData
+from app.services.data_sources.replay import ReplaySource
+from app.services.refresh import fundamentals_due, refresh, reprice
+
+TODAY = datetime.date.today()
+NOW = datetime.datetime.now()
+
+
+class TestFundamentalsDue(unittest.TestCase):
+    def test_never_fetched(self):
+        self.assertTrue(fundamentals_due(None, None, TODAY, 7))
+
+    def test_max_age(self):
+        self.assertFalse(fundamentals_due(NOW - datetime.timedelta(days=6), None, TODAY, 7))
+        self.assertTrue(fundamentals_due(NOW - datetime.timedelta(days=7), None, TODAY, 7))
+
+    def test_earnings_passed_since_fetch(self):
+        fetched = NOW - datetime.timedelta(days=3)
+        yesterday = TODAY - datetime.timedelta(days=1)
+        self.assertTrue(fundamentals_due(fetched, yesterday, TODAY, 30))
+        # Not before the results are out, nor again once fetched afterwards
+        self.assertFalse(fundamentals_due(fetched, TODAY, TODAY, 30))
+        self.assertFalse(fundamentals_due(NOW, yesterday, TODAY, 30))
+
+
+class TestReprice(unittest.TestCase):
+    def row(self, **values):
+        defaults = dict(
+            company_id=1, symbol="AAA", record_date=TODAY, ask=100.0, market_cap=1e9,
+            pe_ratio_ttm=20.0, pe_ratio_ftm=16.0, eps_estimate_next_year=6.25, peg_ratio=2.0,
+            garp_ratio=10.0, dividend_yield=2.0, change_year_low_per=25.0, change_year_high_per=-20.0,
+        )
+        return FinancialData(**{**defaults, **values})
+
+    def test_ratios_follow_price(self):
+        values = reprice(self.row(), {"regularMarketPrice": 125.0, "fiftyTwoWeekLow": 50.0, "fiftyTwoWeekHigh": 250.0})
+        self.assertEqual(values["ask"], 125.0)
+        self.assertAlmostEqual(values["pe_ratio_ftm"], 20.0)  # 125 / 6.25
+        self.assertAlmostEqual(values["pe_ratio_ttm"], 25.0)
+        self.assertAlmostEqual(values["peg_ratio"], 2.5)
+        self.assertAlmostEqual(values["market_cap"], 1.25e9)
+        self.assertEqual(values["dividend_yield"], 1.6)
+        self.assertEqual(values["change_year_low_per"], 150.0)
+        self.assertEqual(values["change_year_high_per"], -50.0)
+        self.assertNotIn("garp_ratio", values)
+
+    def test_quote_market_cap_and_stored_range(self):
+        values = reprice(self.row(), {"regularMarketPrice": 130.0, "marketCap": 2e9})
+        self.assertEqual(values["market_cap"], 2e9)
+        # Stored range: low 80, high 125 -> widened to 130
+        self.assertEqual(values["change_year_low_per"], 62.5)
+        self.assertEqual(values["change_year_high_per"], 0.0)
+
+
+class TestRefresh(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+        self.source = ReplaySource.synthetic(150)
+        self.symbols = list(self.source.infos)
+
+    def test_tiers(self):
+        with Session(self.engine) as db:
+            stats = refresh(db, self.symbols, self.source)
+            self.assertEqual(stats["fundamentals"]["succeeded"], 150)
+            self.assertEqual(stats["prices"]["updated"], 0)
+            self.assertEqual(self.source.requests, 150)
+
+            # Fundamentals are fresh: two bulk quote requests update today's rows in place
+            stats = refresh(db, None, self.source)
+            self.assertEqual(stats["prices"]["updated"], 150)
+            self.assertEqual(stats["fundamentals"]["total"], 0)
+            self.assertEqual(self.source.requests, 152)
+            self.assertEqual(len(db.exec(select(FinancialData)).all()), 150)
+
+    def test_closes_its_own_source_on_failure(self):
+        closed = []
+
+        class Closing(ReplaySource):
+            def close(self):
+                closed.append(True)
+
+        source = Closing(self.source.infos)
+        source._fetch_quote_batch = mock.Mock(side_effect=KeyboardInterrupt)
+        with Session(self.engine) as db:
+            refresh(db, self.symbols, self.source)
+            with mock.patch("app.services.refresh.get_source", return_value=source):
+                with self.assertRaises(KeyboardInterrupt):
+                    refresh(db)
+        self.assertEqual(closed, [True])
+
+    def test_carries_rows_forward(self):
+        yesterday = TODAY - datetime.timedelta(days=1)
+        symbol = self.symbols[0]
+        with Session(self.engine) as db:
+            refresh(db, self.symbols, self.source)
+            db.exec(update(FinancialData).values(record_date=yesterday, rank_pe_ratio_ttm=1))
+            db.exec(update(Company).where(Company.symbol == symbol).values(next_earnings_date=yesterday))
+            db.exec(update(Company).values(fundamentals_fetched_at=NOW - datetime.timedelta(days=2)))
+            db.commit()
+            old = db.exec(select(FinancialData).where(FinancialData.symbol == symbol)).one()
+            old_ask, old_ebitda = old.ask, old.ebitda
+            for info in self.source.infos.values():
+                info["regularMarketPrice"] = info["currentPrice"] = info["regularMarketPrice"] * 2
+
+            stats = refresh(db, self.symbols, self.source)
+            self.assertEqual(stats["prices"]["updated"], 149)
+            self.assertEqual(stats["fundamentals"]["succeeded"], 1)
+
+            other = self.symbols[1]
+            rows = db.exec(
+                select(FinancialData).where(FinancialData.symbol == other).order_by(FinancialData.record_date)
+            ).all()
+            self.assertEqual([r.record_date for r in rows], [yesterday, TODAY])
+            self.assertAlmostEqual(rows[1].ask, rows[0].ask * 2)
+            self.assertEqual(rows[1].ebitda, rows[0].ebitda)
+            self.assertIsNone(rows[1].rank_pe_ratio_ttm)
+            if rows[0].pe_ratio_ttm is not None:
+                self.assertAlmostEqual(rows[1].pe_ratio_ttm, rows[0].pe_ratio_ttm * 2)
+
+            fresh = db.exec(
+                select(FinancialData).where(FinancialData.symbol == symbol, FinancialData.record_date == TODAY)
+            ).one()
+            self.assertAlmostEqual(fresh.ask, old_ask * 2)
+            self.assertEqual(fresh.ebitda, old_ebitda)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import datetime
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import delete
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.config import settings
+from app.models import Company, FinancialData, RankingGeneration, RankingRow
+from app.services.bulk_load import bulk_upsert_financials
+from app.services.partitions import financial_history, rotate_partitions
+from app.services.retention import compact, dates_to_drop
+
+TODAY = datetime.date(2026, 6, 30)
+
+
+def daily(days):
+    return [TODAY - datetime.timedelta(days=i) for i in range(days)]
+
+
+class TestRetentionPolicy(unittest.TestCase):
+    def test_recent_dates_are_kept(self):
+        self.assertEqual(dates_to_drop(daily(30), TODAY, daily_days=30, weekly_days=365), [])
+
+    def test_older_dates_thin_to_weekly_then_monthly(self):
+        dates = daily(400)
+        drop = set(dates_to_drop(dates, TODAY, daily_days=30, weekly_days=365))
+        kept = [d for d in dates if d not in drop]
+
+        weekly = [d for d in kept if 30 <= (TODAY - d).days < 365]
+        self.assertEqual(len({d.isocalendar()[:2] for d in weekly}), len(weekly))
+        monthly = [d for d in kept if (TODAY - d).days >= 365]
+        self.assertEqual(len({(d.year, d.month) for d in monthly}), len(monthly))
+
+
+class TestCompact(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        company = Company(symbol="AAPL", name="Apple Inc.")
+        self.db.add(company)
+        self.db.commit()
+        self.db.refresh(company)
+        bulk_upsert_financials(
+            self.db,
+            [
+                {"company_id": company.id, "symbol": "AAPL", "record_date": d, "pe_ratio_ttm": 20.0}
+                for d in daily(60)
+            ],
+        )
+        # An old generation referencing a row that will be dropped
+        old = self.db.exec(select(FinancialData).where(FinancialData.record_date == TODAY - datetime.timedelta(days=50))).one()
+        gen = RankingGeneration(record_date=old.record_date, row_count=1)
+        self.db.add(gen)
+        self.db.commit()
+        self.db.add(RankingRow(generation_id=gen.id, financial_data_id=old.id, company_id=company.id, symbol="AAPL"))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_compact_archives_and_deletes(self):
+        with tempfile.TemporaryDirectory() as out:
+            stats = compact(self.db, daily_days=10, weekly_days=365, archive_dir=out)
+            archived = list(Path(out).rglob("*.parquet"))
+
+        self.assertGreater(stats["dropped_dates"], 0)
+        self.assertEqual(stats["archived_rows"], stats["deleted_rows"])
+        self.assertEqual(len(archived), stats["dropped_dates"])
+
+        remaining = self.db.exec(select(FinancialData.record_date)).all()
+        self.assertEqual(len(remaining), 60 - stats["dropped_dates"])
+        self.assertIn(TODAY, remaining)
+        self.assertEqual(self.db.exec(select(RankingRow)).all(), [])
+        self.assertEqual(self.db.exec(select(RankingGeneration)).all(), [])
+
+    def test_dry_run_changes_nothing(self):
+        stats = compact(self.db, daily_days=10, weekly_days=365, dry_run=True)
+        self.assertEqual(len(stats["drop"]), stats["dropped_dates"])
+        self.assertEqual(len(self.db.exec(select(FinancialData.id)).all()), 60)
+
+    def test_hot_table_empty(self):
+        with mock.patch.object(settings, "partitioning", True):
+            rotate_partitions(self.db, hot_days=1)
+            self.db.exec(delete(RankingRow))
+            self.db.exec(delete(FinancialData))
+            self.db.commit()
+
+            stats = compact(self.db, daily_days=10, weekly_days=365, dry_run=True)
+            history = financial_history()
+            self.assertEqual(len(self.db.exec(select(history.id)).all()), 58)
+        # Retention is relative to the newest archived date, TODAY - 2
+        self.assertEqual(stats["dates"], 58)
+        self.assertNotIn((TODAY - datetime.timedelta(days=11)).isoformat(), stats["drop"])
+        self.assertGreater(stats["dropped_dates"], 0)
+
@@ -0,0 +1,38 @@
+import unittest
+
+import orjson
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.services.data_import import compute_rankings
+from app.services.rankings import STRATEGIES
+from app.services.snapshot import build_snapshot
+from app.services.synthetic import seed_synthetic
+
+
+class TestRankingsJson(unittest.TestCase):
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as db:
+            seed_synthetic(db, companies=30)
+            compute_rankings(db)
+            self.snapshot = build_snapshot(db)
+
+    def test_matches_rankings_for_any_limit(self):
+        for limit in (1, 7, 100, 500):
+            self.assertEqual(
+                orjson.loads(self.snapshot.rankings_json("ebitda", limit)),
+                orjson.loads(orjson.dumps(self.snapshot.rankings("ebitda", limit))),
+            )
+
+    def test_cache_is_one_encoding_per_ranked_row(self):
+        for strategy in STRATEGIES:
+            for limit in range(1, 50):
+                self.snapshot.rankings_json(strategy, limit)
+        self.assertEqual(set(self.snapshot._encoded), set(STRATEGIES))
+        for strategy, encoded in self.snapshot._encoded.items():
+            self.assertEqual(len(encoded), len(self.snapshot.ranked_offsets(strategy)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import datetime
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlmodel import SQLModel, Session, create_engine, select
+
+from app.models import Company, FinancialData
+from app.services.snapshot_io import FINANCIAL_COLUMNS, export_snapshot, import_snapshot
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+class TestSnapshotRoundTrip(unittest.TestCase):
+    def setUp(self):
+        self.source = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.source)
+        with Session(self.source) as db:
+            company = Company(symbol="AAPL", name="Apple Inc.", sector="Technology")
+            db.add(company)
+            db.commit()
+            for day, pe in ((2, 30.0), (3, 31.5)):
+                db.add(FinancialData(
+                    company_id=company.id, symbol="AAPL", record_date=datetime.date(2026, 1, day),
+                    ask=190.0 + day, pe_ratio_ttm=pe, rank_pe_ratio_ttm=1,
+                ))
+            db.commit()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_legacy_rank_columns_not_exported(self):
+        self.assertFalse([c for c in FINANCIAL_COLUMNS if c.startswith("rank_")])
+
+    def round_trip(self, fmt: str):
+        with Session(self.source) as db:
+            exported = export_snapshot(db, self.tmp.name, fmt)
+        self.assertEqual(exported, {"files": 2, "rows": 2})
+        self.assertTrue((Path(self.tmp.name) / "2026" / f"2026-01-02.{fmt}").exists())
+
+        target = create_engine("sqlite://")
+        SQLModel.metadata.create_all(target)
+        with Session(target) as db:
+            stats = import_snapshot(db, self.tmp.name)
+            self.assertEqual((stats["files"], stats["companies"], stats["financials"]), (2, 1, 2))
+            rows = db.exec(select(FinancialData).order_by(FinancialData.record_date)).all()
+            company = db.exec(select(Company)).one()
+        self.assertEqual(company.name, "Apple Inc.")
+        self.assertEqual([r.pe_ratio_ttm for r in rows], [30.0, 31.5])
+        self.assertEqual({r.company_id for r in rows}, {company.id})
+        self.assertIsNone(rows[0].rank_pe_ratio_ttm)
+
+    def test_parquet(self):
+        self.round_trip("parquet")
+
+    def test_arrow(self):
+        self.round_trip("arrow")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import datetime
+import unittest
+
+from sqlmodel import SQLModel, Session, create_engine, func, select
+
+from app.models import Company, FinancialData
+from app.services.synthetic import (
+    SECTOR_PROFILES, business_days, generate_companies, generate_financials, seed_synthetic,
+)
+
+END = datetime.date(2026, 3, 6)  # a Friday
+
+
+def _rows(seed):
+    companies = generate_companies(200, seed)
+    ids = [(i + 1, c["symbol"], c["sector"]) for i, c in enumerate(companies)]
+    return list(generate_financials(ids, business_days(30, END), seed))
+
+
+class TestGenerator(unittest.TestCase):
+    def test_is_deterministic_per_seed(self):
+        self.assertEqual(_rows(7), _rows(7))
+        self.assertNotEqual(_rows(7), _rows(8))
+
+    def test_business_days(self):
+        dates = business_days(6, END)
+        self.assertEqual(dates[0], datetime.date(2026, 2, 27))
+        self.assertEqual(dates[-1], END)
+        self.assertTrue(all(d.weekday() < 5 for d in dates))
+
+    def test_distributions_include_gaps_and_losses(self):
+        rows = _rows(42)
+        self.assertTrue({c["sector"] for c in generate_companies(200)} <= set(SECTOR_PROFILES))
+        for column in ("pe_ratio_ttm", "return_on_assets"):
+            values = [row.get(column) for row in rows]
+            self.assertIn(None, values, column)
+            self.assertTrue(any(v is not None and v < 0 for v in values), column)
+            self.assertTrue(any(v is not None and v > 0 for v in values), column)
+        self.assertIn(None, [row.get("dividend_yield") for row in rows])
+
+
+class TestSeedSynthetic(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_loads_and_reloads_idempotently(self):
+        stats = seed_synthetic(self.db, companies=50, days=10, seed=1, end=END)
+        count = self.db.exec(select(func.count()).select_from(FinancialData)).one()
+        self.assertEqual(count, stats["financials"])
+        self.assertEqual(self.db.exec(select(func.count()).select_from(Company)).one(), 50)
+        self.assertEqual(self.db.exec(select(func.max(FinancialData.record_date))).one(), END)
+
+        again = seed_synthetic(self.db, companies=50, days=10, seed=1, end=END)
+        self.assertEqual(again["load"]["updated"], count)
+        self.assertEqual(self.db.exec(select(func.count()).select_from(FinancialData)).one(), count)
+
+    def test_rejects_empty_universe(self):
+        with self.assertRaises(ValueError):
+            seed_synthetic(self.db, companies=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
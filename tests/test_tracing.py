@@ -0,0 +1,147 @@
+import datetime
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel, Session, create_engine
+
+from app.config import settings
+from app.models import Company
+from app.services import snapshot, tracing
+from app.services.bulk_load import bulk_upsert_financials
+from app.services.data_import import RANK_CONFIGS, compute_rankings
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "traces.jsonl")
+        for name, value in (("trace_exporter", "file"), ("trace_file", self.path)):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def span_list(self) -> list:
+        if not os.path.exists(self.path):
+            return []
+        spans = []
+        with open(self.path) as f:
+            for request in map(json.loads, f):
+                for resource_spans in request["resourceSpans"]:
+                    for scope_spans in resource_spans["scopeSpans"]:
+                        spans.extend(scope_spans["spans"])
+        return spans
+
+    def spans(self) -> dict:
+        return {s["name"]: s for s in self.span_list()}
+
+
+class TestSpans(TracingTestCase):
+    def test_nested_spans_share_trace(self):
+        with tracing.span("outer", **{"stocker.symbol": "AAPL"}):
+            with tracing.span("inner") as inner:
+                inner.set_attribute("db.rows", 3)
+
+        spans = self.spans()
+        outer, inner = spans["outer"], spans["inner"]
+        self.assertEqual(inner["traceId"], outer["traceId"])
+        self.assertEqual(inner["parentSpanId"], outer["spanId"])
+        self.assertNotIn("parentSpanId", outer)
+        self.assertIn({"key": "db.rows", "value": {"intValue": "3"}}, inner["attributes"])
+        self.assertIn({"key": "stocker.symbol", "value": {"stringValue": "AAPL"}}, outer["attributes"])
+
+    def test_lines_are_otlp_export_requests(self):
+        with tracing.span("outer"):
+            pass
+        with open(self.path) as f:
+            request = json.loads(f.readline())
+        [resource_spans] = request["resourceSpans"]
+        self.assertIn(
+            {"key": "service.name", "value": {"stringValue": "stocker"}},
+            resource_spans["resource"]["attributes"],
+        )
+        [scope_spans] = resource_spans["scopeSpans"]
+        self.assertEqual(scope_spans["scope"], {"name": "stocker"})
+        self.assertEqual(scope_spans["spans"][0]["kind"], tracing.SPAN_KIND_INTERNAL)
+
+    def test_errors_set_status(self):
+        with self.assertRaises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("boom")
+        self.assertEqual(self.spans()["failing"]["status"], {"code": 2, "message": "ValueError: boom"})
+
+    def test_disabled_is_noop(self):
+        with mock.patch.object(settings, "trace_exporter", ""):
+            with tracing.span("ignored") as sp:
+                sp.set_attribute("x", 1)
+                tracing.current_span().set_attributes({"y": 2})
+        self.assertEqual(self.spans(), {})
+
+
+class TestPipelineSpans(TracingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.engine = create_engine("sqlite://")
+        SQLModel.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        companies = [Company(symbol=s, name=s, sector="Technology") for s in ("AAA", "BBB")]
+        self.db.add_all(companies)
+        self.db.commit()
+        bulk_upsert_financials(self.db, [
+            {
+                "company_id": c.id,
+                "symbol": c.symbol,
+                "record_date": datetime.date(2026, 3, 31),
+                "pe_ratio_ttm": pe,
+                "return_on_assets": 0.1,
+            }
+            for c, pe in zip(companies, (10.0, 20.0))
+        ])
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.db.close)
+        self.addCleanup(snapshot.invalidate_snapshot)
+
+    def test_rankings_and_rebuild_carry_freshness(self):
+        with tracing.span("job") as job:
+            compute_rankings(self.db)
+        snapshot.invalidate_snapshot()
+        with tracing.span("request") as request:
+            snapshot.get_snapshot(self.db)
+
+        spans = self.span_list()
+        by_name = {s["name"]: s for s in spans}
+        ranking = by_name["compute_rankings"]
+        self.assertEqual(ranking["parentSpanId"], job.span_id)
+        metric_spans = [s for s in spans if s["name"] == "rank_metric"]
+        self.assertEqual(len(metric_spans), len(RANK_CONFIGS) + 2)
+        self.assertTrue(all(s["parentSpanId"] == ranking["spanId"] for s in metric_spans))
+        self.assertIn("db.write", by_name)
+        self.assertIn("stocker.published_at", {a["key"] for a in ranking["attributes"]})
+
+        self.assertEqual(by_name["snapshot.rebuild"]["parentSpanId"], request.span_id)
+        keys = {a["key"] for a in by_name["request"]["attributes"]}
+        self.assertTrue({"stocker.generation_id", "stocker.publish_to_serve_seconds"} <= keys)
+
+
+class TestTracingMiddleware(TracingTestCase):
+    def test_request_continues_incoming_trace(self):
+        from app.main import app
+
+        trace_id, parent_id = "ab" * 16, "cd" * 8
+        with TestClient(app) as client:
+            response = client.get("/health", headers={"traceparent": f"00-{trace_id}-{parent_id}-01"})
+
+        self.assertEqual(response.status_code, 200)
+        request_span = self.spans()["GET /health"]
+        self.assertEqual(request_span["traceId"], trace_id)
+        self.assertEqual(request_span["parentSpanId"], parent_id)
+        self.assertEqual(request_span["kind"], tracing.SPAN_KIND_SERVER)
+        self.assertEqual(response.headers["traceparent"], f"00-{trace_id}-{request_span['spanId']}-01")
+
+
+if __name__ == "__main__":
+    unittest.main()